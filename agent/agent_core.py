@@ -1,209 +1,248 @@
+import asyncio
+import json
 import os
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
-# Database Integration (Supabase/PostgreSQL)
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from agent.db import AgentLog, AgentMemory, Base, Database
+from agent.integrations import IntegrationRegistry
+from agent.mcp import MCPBatchError, MCPExecutor, MCPTool
 
-# Sentry Integration
-import sentry_sdk
+# Heavy client libraries (SQLAlchemy engine, Sentry, transformers, OpenAI,
+# Gemini, Google APIs, Notion) are imported inside the initializers below so
+# that importing this module stays cheap. Each integration is initialized on
+# first use, or at startup in parallel when listed in AGENT_EAGER_INTEGRATIONS.
+registry = IntegrationRegistry()
 
-# Hugging Face and External AI APIs Integration
-from transformers import pipeline
-from openai import OpenAI
-import google.generativeai as genai
-# from elevenlabs import set_api_key, generate, play
-# from perplexity_ai import PerplexityAI
 
-# Google API imports for Gmail and Calendar
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await registry.init_all(registry.eager_names())
+    yield
+    mcp_executor.shutdown()
+    await registry.aclose_all()
 
-# Notion Integration
-from notion_client import Client
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # --- Database Integration (Supabase/PostgreSQL) ---
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-Base = declarative_base()
-
-class AgentLog(Base):
-    __tablename__ = "agent_logs"
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    level = Column(String)
-    message = Column(Text)
-
-class AgentMemory(Base):
-    __tablename__ = "agent_memory"
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    key = Column(String, unique=True, index=True)
-    value = Column(Text)
-
-engine = None
-SessionLocal = None
-
-if DATABASE_URL:
+async def _close_database(database: Database):
+    await database.dispose()
+
+@registry.integration("database", "Supabase/PostgreSQL", env=("DATABASE_URL",), eager=True, close=_close_database)
+async def _init_database():
+    # One pooled async engine (see agent/db.py for the DB_POOL_* settings)
+    # shared by every endpoint and the agent; sqlite:/// URLs use aiosqlite.
+    database = Database(os.getenv("DATABASE_URL"))
+    await database.create_all()
+    print("Supabase/PostgreSQL integration initialized.")
+
+    # Example usage: Log an event and remember the startup time
+    await database.log("INFO", "Agent started and connected to Supabase.")
+    await database.save_memory("last_startup", datetime.utcnow().isoformat())
+    return database
+
+async def _close_log_sink(sink):
+    await sink.close()
+
+@registry.integration("log_sink", "Agent log sink", env=("DATABASE_URL",), eager=True, close=_close_log_sink)
+async def _init_log_sink():
+    from agent.log_sink import LogSink
+
+    # AgentLog rows are buffered and written in bulk; see agent/log_sink.py
+    # for the AGENT_LOG_* settings.
+    database = await registry.aget("database")
+    if not database:
+        return None
+    return LogSink.from_env(database).start()
+
+async def log_to_db(level: str, message: str):
+    sink = await registry.aget("log_sink")
+    if sink:
+        await sink.put(level, message)
+
+@registry.integration("memory_store", "Agent memory store", env=("DATABASE_URL",))
+async def _init_memory_store():
+    from agent.memory_store import MemoryStore
+
+    # Upserts plus a write-through TTL/LRU cache; see agent/memory_store.py
+    # for the AGENT_MEMORY_* settings.
+    database = await registry.aget("database")
+    if not database:
+        return None
+    return MemoryStore.from_env(database)
+
+@registry.integration("task_queue", "Durable task queue", env=("DATABASE_URL",))
+async def _init_task_queue():
+    from agent.task_queue import TaskQueue
+
+    # Leased, prioritized tasks shared by every worker process on the same
+    # database; see agent/task_queue.py for the AGENT_TASK_* settings.
+    database = await registry.aget("database")
+    if not database:
+        return None
+    return await TaskQueue.from_env(database).create()
+
+def _save_memory_index(index):
+    if index.path:
+        index.close()
+
+def _embedding_function():
+    import importlib
+
+    # AGENT_EMBEDDING_FUNCTION ("module:function", texts -> array of shape
+    # (n, AGENT_EMBEDDING_DIM)) swaps the local hashing stand-in for a real
+    # embedding model.
+    if not os.getenv("AGENT_EMBEDDING_FUNCTION"):
+        return None
+    module_name, _, attr = os.getenv("AGENT_EMBEDDING_FUNCTION").partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+@registry.integration("memory_index", "Agent memory index", close=_save_memory_index)
+def _init_memory_index():
+    from agent.vector_index import IndexLockedError, VectorIndex
+
+    # Semantic recall over memory values. The on-disk index has a single writer:
+    # with several uvicorn workers, the first one owns AGENT_MEMORY_INDEX_PATH and
+    # the others keep a process-local, in-memory index.
+    options = dict(dim=int(os.getenv("AGENT_EMBEDDING_DIM", "256")), embed=_embedding_function(),
+                   ivf_threshold=int(os.getenv("AGENT_MEMORY_INDEX_IVF_THRESHOLD", "50000")))
+    path = os.path.abspath(os.getenv("AGENT_MEMORY_INDEX_PATH", "agent_memory_index"))
     try:
-        engine = create_engine(DATABASE_URL)
-        Base.metadata.create_all(bind=engine)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        print("Supabase/PostgreSQL integration initialized.")
-
-        # Example usage: Log an event
-        def log_to_db(level: str, message: str):
-            if SessionLocal:
-                db = SessionLocal()
-                try:
-                    log_entry = AgentLog(level=level, message=message)
-                    db.add(log_entry)
-                    db.commit()
-                    db.refresh(log_entry)
-                finally:
-                    db.close()
-
-        # Example usage: Save/Load memory
-        def save_memory_to_db(key: str, value: str):
-            if SessionLocal:
-                db = SessionLocal()
-                try:
-                    memory_entry = db.query(AgentMemory).filter(AgentMemory.key == key).first()
-                    if memory_entry:
-                        memory_entry.value = value
-                    else:
-                        memory_entry = AgentMemory(key=key, value=value)
-                        db.add(memory_entry)
-                    db.commit()
-                    db.refresh(memory_entry)
-                finally:
-                    db.close()
-
-        def load_memory_from_db(key: str) -> str | None:
-            if SessionLocal:
-                db = SessionLocal()
-                try:
-                    memory_entry = db.query(AgentMemory).filter(AgentMemory.key == key).first()
-                    return memory_entry.value if memory_entry else None
-                finally:
-                    db.close()
-            return None
-
-        log_to_db("INFO", "Agent started and connected to Supabase.")
-        save_memory_to_db("last_startup", datetime.utcnow().isoformat())
-
-    except Exception as e:
-        print(f"Error initializing Supabase/PostgreSQL: {e}")
-        engine = None
-        SessionLocal = None
-else:
-    print("DATABASE_URL not set. Supabase/PostgreSQL integration skipped.")
+        return VectorIndex(path=path, **options)
+    except IndexLockedError:
+        print(f"Memory index at {path} is owned by another worker; using an in-memory index in process {os.getpid()}.")
+        return VectorIndex(**options)
+
+async def _index_memories(items: dict[str, str]):
+    index = await registry.aget("memory_index")
+    if index is not None:
+        await asyncio.to_thread(index.add_many, list(items), list(items.values()))
+
+async def search_memory(query: str, k: int = 10) -> list[tuple[str, float]]:
+    index = await registry.aget("memory_index")
+    if index is None:
+        return []
+    return await asyncio.to_thread(index.search, query, k)
+
+async def save_memory_to_db(key: str, value: str):
+    store = await registry.aget("memory_store")
+    if store:
+        await store.set(key, value)
+        await _index_memories({key: value})
+
+async def load_memory_from_db(key: str) -> str | None:
+    store = await registry.aget("memory_store")
+    if store:
+        return await store.get(key)
+    return None
+
+async def save_memories_to_db(items: dict[str, str]):
+    store = await registry.aget("memory_store")
+    if store:
+        await store.set_many(items)
+        await _index_memories(items)
+
+async def load_memories_from_db(keys: list[str]) -> dict[str, str]:
+    store = await registry.aget("memory_store")
+    if store:
+        return await store.get_many(keys)
+    return {}
 
 # --- Sentry Integration ---
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
-if SENTRY_DSN:
+@registry.integration("sentry", "Sentry", env=("SENTRY_DSN",), eager=True)
+def _init_sentry():
+    import sentry_sdk
+
     sentry_sdk.init(
-        dsn=SENTRY_DSN,
+        dsn=os.getenv("SENTRY_DSN"),
         traces_sample_rate=1.0,
         profiles_sample_rate=1.0,
     )
     print("Sentry integration initialized.")
-else:
-    print("SENTRY_DSN not set. Sentry integration skipped.")
+    return sentry_sdk
 
 # --- Hugging Face and External AI APIs Integration ---
 
-# Hugging Face
-hf_pipeline = None
-HUGGING_FACE_API_KEY = os.getenv("HUGGING_FACE_API_KEY")
-
-if HUGGING_FACE_API_KEY:
-    try:
-        # Example: sentiment-analysis pipeline
-        # hf_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-        print("Hugging Face integration configured (pipeline not loaded by default).")
-    except Exception as e:
-        print(f"Error initializing Hugging Face: {e}")
-else:
-    print("HUGGING_FACE_API_KEY not set. Hugging Face integration skipped.")
+# Hugging Face: the pipeline (HF_TASK / HF_MODEL) is loaded on the first
+# prediction and serves concurrent requests in micro-batches (see
+# agent/inference.py for HF_MAX_BATCH_SIZE, HF_MAX_WAIT_MS, HF_NUM_THREADS).
+def _close_hugging_face(service):
+    service.close()
+
+@registry.integration("hugging_face", "Hugging Face", env=("HUGGING_FACE_API_KEY",), close=_close_hugging_face)
+def _init_hugging_face():
+    from agent.inference import InferenceService
+
+    service = InferenceService.from_env()
+    print(f"Hugging Face integration configured ({service.task} with {service.model}, loaded on first use).")
+    return service
+
+# LLM gateway: one pooled async client for OpenAI and Gemini with shared
+# concurrency/TPM limits, request coalescing and provider fallback (see
+# agent/llm_gateway.py for the OPENAI_*, GEMINI_* and LLM_* settings), with
+# the persistent response cache from agent/llm_cache.py (LLM_CACHE_*).
+async def _close_llm(gateway):
+    await gateway.aclose()
+
+@registry.integration("llm", "LLM gateway", close=_close_llm)
+async def _init_llm():
+    from agent.llm_cache import LLMCache
+    from agent.llm_gateway import LLMGateway
+
+    if not (os.getenv("OPENAI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")):
+        print("OPENAI_API_KEY and GOOGLE_GEMINI_API_KEY not set. LLM gateway skipped.")
+        return None
+    cache = await asyncio.to_thread(LLMCache.from_env, _embedding_function())
+    gateway = LLMGateway.from_env(cache=cache)
+    print(f"LLM gateway initialized (providers: {', '.join(gateway.providers)}).")
+    return gateway
 
 # OpenAI (ChatGPT)
-openai_client = None
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-if OPENAI_API_KEY:
-    try:
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
+@registry.integration("openai", "OpenAI", env=("OPENAI_API_KEY",))
+async def _init_openai():
+    gateway = await registry.aget("llm")
+    provider = gateway.providers.get("openai") if gateway else None
+    if provider:
         print("OpenAI (ChatGPT) integration initialized.")
-    except Exception as e:
-        print(f"Error initializing OpenAI: {e}")
-else:
-    print("OPENAI_API_KEY not set. OpenAI integration skipped.")
+    return provider
 
 # Google Gemini
-gemini_model = None
-GOOGLE_GEMINI_API_KEY = os.getenv("GOOGLE_GEMINI_API_KEY")
-
-if GOOGLE_GEMINI_API_KEY:
-    try:
-        genai.configure(api_key=GOOGLE_GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel("gemini-pro")
+@registry.integration("gemini", "Google Gemini", env=("GOOGLE_GEMINI_API_KEY",))
+async def _init_gemini():
+    gateway = await registry.aget("llm")
+    provider = gateway.providers.get("gemini") if gateway else None
+    if provider:
         print("Google Gemini integration initialized.")
-    except Exception as e:
-        print(f"Error initializing Google Gemini: {e}")
-else:
-    print("GOOGLE_GEMINI_API_KEY not set. Google Gemini integration skipped.")
+    return provider
 
 # ElevenLabs
-ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-
-if ELEVENLABS_API_KEY:
-    try:
-        # set_api_key(ELEVENLABS_API_KEY)
-        print("ElevenLabs integration configured (API key set).")
-    except Exception as e:
-        print(f"Error initializing ElevenLabs: {e}")
-else:
-    print("ELEVENLABS_API_KEY not set. ElevenLabs integration skipped.")
+@registry.integration("elevenlabs", "ElevenLabs", env=("ELEVENLABS_API_KEY",))
+def _init_elevenlabs():
+    # from elevenlabs import set_api_key
+    # set_api_key(os.getenv("ELEVENLABS_API_KEY"))
+    print("ElevenLabs integration configured (API key set).")
+    return os.getenv("ELEVENLABS_API_KEY")
 
 # Perplexity AI
-PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
-
-if PERPLEXITY_API_KEY:
-    try:
-        # perplexity_client = PerplexityAI(api_key=PERPLEXITY_API_KEY)
-        print("Perplexity AI integration configured (API key set).")
-    except Exception as e:
-        print(f"Error initializing Perplexity AI: {e}")
-else:
-    print("PERPLEXITY_API_KEY not set. Perplexity AI integration skipped.")
-
-print("External AI APIs integration setup complete.")
+@registry.integration("perplexity", "Perplexity AI", env=("PERPLEXITY_API_KEY",))
+def _init_perplexity():
+    # from perplexity_ai import PerplexityAI
+    # return PerplexityAI(api_key=os.getenv("PERPLEXITY_API_KEY"))
+    print("Perplexity AI integration configured (API key set).")
+    return os.getenv("PERPLEXITY_API_KEY")
 
 # --- MCP Personalizado (Model Context Protocol) Integration - Conceptual Framework ---
 
-class MCPTool:
-    """Representa uma ferramenta ou capacidade exposta por um servidor MCP."""
-    def __init__(self, name: str, description: str, func):
-        self.name = name
-        self.description = description
-        self.func = func
-
-    def execute(self, *args, **kwargs):
-        print(f"Executing MCP Tool: {self.name} with args: {args}, kwargs: {kwargs}")
-        return self.func(*args, **kwargs)
-
 # Exemplo de função que poderia ser exposta via MCP
 def analyze_code_mcp(code: str) -> str:
     """Simula a análise de código por um subagente MCP."""
@@ -218,128 +257,159 @@ def send_email_mcp(recipient: str, subject: str, body: str) -> str:
     return f"Email to {recipient} sent by MCP subagent."
 
 mcp_tools = {
-    "analyze_code": MCPTool("analyze_code", "Analisa um trecho de código para bugs e melhorias.", analyze_code_mcp),
-    "send_email": MCPTool("send_email", "Envia um e-mail para um destinatário específico.", send_email_mcp),
+    "analyze_code": MCPTool("analyze_code", "Analisa um trecho de código para bugs e melhorias.", analyze_code_mcp,
+                            cacheable=True, version="1", cache_ttl=3600),
+    "send_email": MCPTool("send_email", "Envia um e-mail para um destinatário específico.", send_email_mcp,
+                          max_concurrency=4, timeout=30),
 }
 
+# Runs tools off the event loop (thread/process pools, or natively for async
+# tools) with per-tool concurrency limits and timeouts.
+mcp_executor = MCPExecutor.from_env(mcp_tools)
+
 print("MCP Personalizado conceptual framework initialized.")
 
 # --- Gmail Integration ---
 
 SCOPES_GMAIL = ["https://www.googleapis.com/auth/gmail.modify"]
-GMAIL_CLIENT_ID = os.getenv("GMAIL_CLIENT_ID")
-GMAIL_CLIENT_SECRET = os.getenv("GMAIL_CLIENT_SECRET")
-GMAIL_REDIRECT_URI = os.getenv("GMAIL_REDIRECT_URI")
 
-gmail_service = None
-
-if GMAIL_CLIENT_ID and GMAIL_CLIENT_SECRET and GMAIL_REDIRECT_URI:
-    try:
-        creds = None
-        # The file token.pickle stores the user's access and refresh tokens, and is
-        # created automatically when the authorization flow completes for the first
-        # time.
-        if os.path.exists('token.pickle'):
-            with open('token.pickle', 'rb') as token:
-                creds = Credentials.from_authorized_user_file('token.pickle', SCOPES_GMAIL)
-        # If there are no (valid) credentials available, let the user log in.
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    'credentials.json', SCOPES_GMAIL, redirect_uri=GMAIL_REDIRECT_URI)
-                # This part would typically involve a browser interaction
-                # For a headless environment, you might need to use a different flow
-                # or have the user manually paste the URL and then the code.
-                # print(f"Please go to this URL: {flow.authorization_url}")
-                # code = input('Enter the authorization code: ')
-                # flow.fetch_token(code=code)
-                # creds = flow.credentials
-                print("Gmail: Manual OAuth flow required. Please generate token.pickle manually.")
-                creds = None # Ensure creds is None if manual step is needed
-
-            # Save the credentials for the next run
-            if creds and creds.valid:
-                with open('token.pickle', 'wb') as token:
-                    pickle.dump(creds, token)
-
-        if creds and creds.valid:
-            gmail_service = build('gmail', 'v1', credentials=creds)
-            print("Gmail integration initialized.")
+@registry.integration("gmail", "Gmail", env=("GMAIL_CLIENT_ID", "GMAIL_CLIENT_SECRET", "GMAIL_REDIRECT_URI"))
+def _init_gmail():
+    import pickle
+
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
+    creds = None
+    # The file token.pickle stores the user's access and refresh tokens, and is
+    # created automatically when the authorization flow completes for the first
+    # time.
+    if os.path.exists('token.pickle'):
+        with open('token.pickle', 'rb') as token:
+            creds = Credentials.from_authorized_user_file('token.pickle', SCOPES_GMAIL)
+    # If there are no (valid) credentials available, let the user log in.
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
         else:
-            print("Gmail integration requires manual token generation. Skipping service initialization.")
+            flow = InstalledAppFlow.from_client_secrets_file(
+                'credentials.json', SCOPES_GMAIL, redirect_uri=os.getenv("GMAIL_REDIRECT_URI"))
+            # This part would typically involve a browser interaction
+            # For a headless environment, you might need to use a different flow
+            # or have the user manually paste the URL and then the code.
+            # print(f"Please go to this URL: {flow.authorization_url}")
+            # code = input('Enter the authorization code: ')
+            # flow.fetch_token(code=code)
+            # creds = flow.credentials
+            print("Gmail: Manual OAuth flow required. Please generate token.pickle manually.")
+            creds = None # Ensure creds is None if manual step is needed
+
+        # Save the credentials for the next run
+        if creds and creds.valid:
+            with open('token.pickle', 'wb') as token:
+                pickle.dump(creds, token)
 
-    except Exception as e:
-        print(f"Error initializing Gmail integration: {e}")
-        gmail_service = None
-else:
-    print("GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET, or GMAIL_REDIRECT_URI not set. Gmail integration skipped.")
+    if creds and creds.valid:
+        service = build('gmail', 'v1', credentials=creds)
+        print("Gmail integration initialized.")
+        return service
+    print("Gmail integration requires manual token generation. Skipping service initialization.")
+    return None
 
 # --- Google Calendar Integration ---
 
 SCOPES_CALENDAR = ["https://www.googleapis.com/auth/calendar.events"]
-GOOGLE_CALENDAR_CLIENT_ID = os.getenv("GOOGLE_CALENDAR_CLIENT_ID")
-GOOGLE_CALENDAR_CLIENT_SECRET = os.getenv("GOOGLE_CALENDAR_CLIENT_SECRET")
-GOOGLE_CALENDAR_REDIRECT_URI = os.getenv("GOOGLE_CALENDAR_REDIRECT_URI")
 
-google_calendar_service = None
+@registry.integration("google_calendar", "Google Calendar",
+                      env=("GOOGLE_CALENDAR_CLIENT_ID", "GOOGLE_CALENDAR_CLIENT_SECRET", "GOOGLE_CALENDAR_REDIRECT_URI"))
+def _init_google_calendar():
+    import pickle
 
-if GOOGLE_CALENDAR_CLIENT_ID and GOOGLE_CALENDAR_CLIENT_SECRET and GOOGLE_CALENDAR_REDIRECT_URI:
-    try:
-        creds_calendar = None
-        if os.path.exists('calendar_token.pickle'):
-            with open('calendar_token.pickle', 'rb') as token:
-                creds_calendar = Credentials.from_authorized_user_file('calendar_token.pickle', SCOPES_CALENDAR)
-
-        if not creds_calendar or not creds_calendar.valid:
-            if creds_calendar and creds_calendar.expired and creds_calendar.refresh_token:
-                creds_calendar.refresh(Request())
-            else:
-                flow_calendar = InstalledAppFlow.from_client_secrets_file(
-                    'calendar_credentials.json', SCOPES_CALENDAR, redirect_uri=GOOGLE_CALENDAR_REDIRECT_URI)
-                print("Google Calendar: Manual OAuth flow required. Please generate calendar_token.pickle manually.")
-                creds_calendar = None
-
-            if creds_calendar and creds_calendar.valid:
-                with open('calendar_token.pickle', 'wb') as token:
-                    pickle.dump(creds_calendar, token)
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
 
-        if creds_calendar and creds_calendar.valid:
-            google_calendar_service = build('calendar', 'v3', credentials=creds_calendar)
-            print("Google Calendar integration initialized.")
+    creds_calendar = None
+    if os.path.exists('calendar_token.pickle'):
+        with open('calendar_token.pickle', 'rb') as token:
+            creds_calendar = Credentials.from_authorized_user_file('calendar_token.pickle', SCOPES_CALENDAR)
+
+    if not creds_calendar or not creds_calendar.valid:
+        if creds_calendar and creds_calendar.expired and creds_calendar.refresh_token:
+            creds_calendar.refresh(Request())
         else:
-            print("Google Calendar integration requires manual token generation. Skipping service initialization.")
+            flow_calendar = InstalledAppFlow.from_client_secrets_file(
+                'calendar_credentials.json', SCOPES_CALENDAR, redirect_uri=os.getenv("GOOGLE_CALENDAR_REDIRECT_URI"))
+            print("Google Calendar: Manual OAuth flow required. Please generate calendar_token.pickle manually.")
+            creds_calendar = None
 
-    except Exception as e:
-        print(f"Error initializing Google Calendar integration: {e}")
-        google_calendar_service = None
-else:
-    print("GOOGLE_CALENDAR_CLIENT_ID, GOOGLE_CALENDAR_CLIENT_SECRET, or GOOGLE_CALENDAR_REDIRECT_URI not set. Google Calendar integration skipped.")
+        if creds_calendar and creds_calendar.valid:
+            with open('calendar_token.pickle', 'wb') as token:
+                pickle.dump(creds_calendar, token)
+
+    if creds_calendar and creds_calendar.valid:
+        service = build('calendar', 'v3', credentials=creds_calendar)
+        print("Google Calendar integration initialized.")
+        return service
+    print("Google Calendar integration requires manual token generation. Skipping service initialization.")
+    return None
 
 # --- Notion Integration ---
-NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-notion_client = None
+@registry.integration("notion", "Notion", env=("NOTION_API_KEY",))
+def _init_notion():
+    from notion_client import Client
 
-if NOTION_API_KEY:
-    try:
-        notion_client = Client(auth=NOTION_API_KEY)
-        print("Notion integration initialized.")
-    except Exception as e:
-        print(f"Error initializing Notion integration: {e}")
-        notion_client = None
-else:
-    print("NOTION_API_KEY not set. Notion integration skipped.")
+    client = Client(auth=os.getenv("NOTION_API_KEY"))
+    print("Notion integration initialized.")
+    return client
 
 # --- Zapier Integration ---
 ZAPIER_WEBHOOK_URL = os.getenv("ZAPIER_WEBHOOK_URL")
 
 # This integration is primarily via webhooks, so no client initialization here.
 # Functions to send data to Zapier would be implemented as needed.
-if ZAPIER_WEBHOOK_URL:
+@registry.integration("zapier", "Zapier", env=("ZAPIER_WEBHOOK_URL",))
+def _init_zapier():
     print("Zapier integration configured (webhook URL set).")
-else:
-    print("ZAPIER_WEBHOOK_URL not set. Zapier integration skipped.")
+    return os.getenv("ZAPIER_WEBHOOK_URL")
+
+# --- Social Webhooks (Graph API webhooks, YouTube WebSub) ---
+# Platform change feeds pushed to /webhooks/{source}; events are fanned out to
+# in-process consumers (see agent/webhooks.py for the *_SECRET and WEBHOOK_*
+# settings).
+async def _close_webhooks(hub):
+    await hub.close()
+
+@registry.integration("webhooks", "Social webhooks", close=_close_webhooks)
+async def _init_webhooks():
+    from agent.webhooks import WebhookHub
+
+    hub = WebhookHub.from_env().start()
+    enabled = [source for source, ready in hub.stats()["sources"].items() if ready]
+    print(f"Social webhooks receiver initialized (sources: {', '.join(enabled) or 'none'}).")
+    return hub
+
+# Module level names kept for callers that still read the old globals; each
+# access resolves (and, if needed, initializes) the matching integration.
+_LEGACY_INTEGRATIONS = {
+    "openai_client": lambda: registry["openai"].value,
+    "gemini_model": lambda: registry["gemini"].value,
+    "llm_gateway": lambda: registry["llm"].value,
+    "hf_pipeline": lambda: registry.get("hugging_face"),
+    "gmail_service": lambda: registry.get("gmail"),
+    "google_calendar_service": lambda: registry.get("google_calendar"),
+    "notion_client": lambda: registry.get("notion"),
+    "database": lambda: registry["database"].value,
+    "engine": lambda: registry["database"].value.engine if registry["database"].value else None,
+}
+
+def __getattr__(name):
+    if name in _LEGACY_INTEGRATIONS:
+        return _LEGACY_INTEGRATIONS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @app.get("/")
@@ -348,32 +418,292 @@ async def read_root():
 
 @app.get("/status")
 async def get_status():
+    # Reports each integration as it is: one not used yet shows up as "pending" in
+    # "integrations" rather than being initialized by the health check.
     status = {
-        "database_connected": engine is not None,
-        "sentry_initialized": SENTRY_DSN is not None,
-        "openai_connected": openai_client is not None,
-        "gemini_connected": gemini_model is not None,
-        "gmail_connected": gmail_service is not None,
-        "google_calendar_connected": google_calendar_service is not None,
-        "notion_connected": notion_client is not None,
+        "database_connected": registry["database"].state == "ready",
+        "sentry_initialized": registry["sentry"].state == "ready",
+        "openai_connected": registry["openai"].state == "ready",
+        "gemini_connected": registry["gemini"].state == "ready",
+        "gmail_connected": registry["gmail"].state == "ready",
+        "google_calendar_connected": registry["google_calendar"].state == "ready",
+        "notion_connected": registry["notion"].state == "ready",
         "zapier_webhook_configured": ZAPIER_WEBHOOK_URL is not None,
-        "mcp_tools_available": len(mcp_tools) > 0
+        "mcp_tools_available": len(mcp_tools) > 0,
+        "mcp": mcp_executor.stats(),
+        "llm": registry["llm"].value.stats() if registry["llm"].value else None,
+        "inference": registry["hugging_face"].value.stats() if registry["hugging_face"].value else None,
+        "webhooks": registry["webhooks"].value.stats() if registry["webhooks"].value else None,
+        "task_queue": registry["task_queue"].value.stats() if registry["task_queue"].value else None,
+        "integrations": registry.snapshot(),
+        "log_sink": registry["log_sink"].value.stats() if registry["log_sink"].value else None,
+        "memory_cache": registry["memory_store"].value.stats() if registry["memory_store"].value else None,
     }
     return status
 
+class MemoryItem(BaseModel):
+    value: str
+
+class MemoryKeys(BaseModel):
+    keys: list[str]
+
+class MemoryItems(BaseModel):
+    items: dict[str, str]
+
+@app.post("/memory/get_many")
+async def read_memories(request: MemoryKeys):
+    if not await registry.aget("database"):
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    return {"items": await load_memories_from_db(request.keys)}
+
+class MemoryQuery(BaseModel):
+    query: str
+    k: int = 10
+
+@app.post("/memory/search")
+async def search_memories(request: MemoryQuery):
+    if not await registry.aget("database"):
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    matches = await search_memory(request.query, request.k)
+    values = await load_memories_from_db([key for key, _ in matches])
+    return {"results": [{"key": key, "score": score, "value": values.get(key)} for key, score in matches]}
+
+@app.put("/memory")
+async def write_memories(request: MemoryItems):
+    if not await registry.aget("database"):
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    await save_memories_to_db(request.items)
+    return {"saved": len(request.items)}
+
+@app.get("/memory/{key}")
+async def read_memory(key: str):
+    if not await registry.aget("database"):
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    value = await load_memory_from_db(key)
+    if value is None:
+        raise HTTPException(status_code=404, detail="Memory key not found")
+    return {"key": key, "value": value}
+
+@app.put("/memory/{key}")
+async def write_memory(key: str, item: MemoryItem):
+    if not await registry.aget("database"):
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    await save_memory_to_db(key, item.value)
+    return {"key": key, "value": item.value}
+
+class LLMCompletion(BaseModel):
+    prompt: str
+    system: str | None = None
+    model: str | None = None
+    provider: str | None = None
+    temperature: float = 0.7
+    max_tokens: int = 512
+    stream: bool = False
+    cache: bool = True
+
+@app.post("/llm/complete")
+async def llm_complete(request: LLMCompletion):
+    from agent.llm_gateway import LLMError, LLMRequest
+
+    gateway = await registry.aget("llm")
+    if not gateway:
+        raise HTTPException(status_code=500, detail="LLM gateway not initialized")
+    llm_request = LLMRequest(prompt=request.prompt, system=request.system, model=request.model,
+                             temperature=request.temperature, max_tokens=request.max_tokens)
+    if request.stream:
+        chunks = gateway.stream(llm_request, provider=request.provider)
+        try:
+            # Read the first chunk before answering: an unknown provider or every
+            # provider failing is a 502 here, not a stream broken after the 200.
+            first = await anext(chunks, None)
+        except LLMError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+
+        async def body():
+            try:
+                if first is not None:
+                    yield first
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+
+        return StreamingResponse(body(), media_type="text/plain")
+    try:
+        response = await gateway.complete(llm_request, provider=request.provider, cache=request.cache)
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return response.to_dict()
+
+@app.delete("/llm/cache")
+async def clear_llm_cache():
+    gateway = await registry.aget("llm")
+    if not gateway or gateway.cache is None:
+        raise HTTPException(status_code=404, detail="LLM cache not enabled")
+    return {"removed": await asyncio.to_thread(gateway.cache.clear)}
+
+class InferenceInputs(BaseModel):
+    inputs: list[str]
+
+@app.post("/hf/predict")
+async def hf_predict(request: InferenceInputs):
+    service = await registry.aget("hugging_face")
+    if not service:
+        raise HTTPException(status_code=500, detail="Hugging Face integration not initialized")
+    try:
+        return {"outputs": await service.predict_many(request.inputs)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
+
+class TaskRequest(BaseModel):
+    name: str
+    payload: dict = Field(default_factory=dict)
+    priority: int = 0
+    delay: float = 0
+    deadline: float | None = None
+    max_attempts: int | None = None
+
+@app.post("/tasks")
+async def enqueue_task(request: TaskRequest):
+    queue = await registry.aget("task_queue")
+    if not queue:
+        raise HTTPException(status_code=500, detail="Task queue not initialized")
+    task_id = await queue.enqueue(request.name, request.payload, priority=request.priority, delay=request.delay,
+                                  deadline=request.deadline, max_attempts=request.max_attempts)
+    return {"id": task_id}
+
+@app.get("/tasks")
+async def task_queue_status():
+    queue = await registry.aget("task_queue")
+    if not queue:
+        raise HTTPException(status_code=500, detail="Task queue not initialized")
+    return {"counts": await queue.counts(), **queue.stats()}
+
+@app.get("/tasks/{task_id}")
+async def read_task(task_id: int):
+    queue = await registry.aget("task_queue")
+    if not queue:
+        raise HTTPException(status_code=500, detail="Task queue not initialized")
+    task = await queue.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+# Consumers follow the webhook events as SSE; ?sources=facebook,youtube
+# narrows the stream. Each connection gets its own bounded queue that keeps
+# the newest events when the client falls behind.
+@app.get("/webhooks/stream")
+async def stream_webhook_events(sources: str | None = None, max_queue: int = 1000):
+    hub = await registry.aget("webhooks")
+    subscription = hub.subscribe(f"sse-{id(object())}", max_queue=max_queue,
+                                 sources=sources.split(",") if sources else None)
+
+    async def stream():
+        try:
+            async for event in subscription:
+                yield f"event: {event.source}\ndata: {json.dumps(event.to_dict(), default=str)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+# Subscription verification handshake (hub.mode / hub.verify_token / hub.challenge).
+@app.get("/webhooks/{source}")
+async def verify_webhook(source: str, request: Request):
+    from agent.webhooks import WebhookError
+
+    hub = await registry.aget("webhooks")
+    try:
+        return PlainTextResponse(hub.verify(source, request.query_params))
+    except WebhookError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+
+# Deliveries are acknowledged as soon as they are verified and queued; a 503
+# (queue full) makes the platform redeliver later.
+@app.post("/webhooks/{source}")
+async def receive_webhook(source: str, request: Request):
+    from agent.webhooks import WebhookError
+
+    hub = await registry.aget("webhooks")
+    try:
+        accepted = hub.receive(source, await request.body(), request.headers)
+    except WebhookError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    return {"source": source, "accepted": accepted}
+
 # Example endpoint for MCP tool execution
 @app.post("/mcp/execute/{tool_name}")
-async def execute_mcp_tool(tool_name: str, payload: dict):
-    if tool_name in mcp_tools:
-        tool = mcp_tools[tool_name]
-        result = tool.execute(**payload)
-        return {"tool": tool_name, "result": result}
-    raise HTTPException(status_code=404, detail="MCP Tool not found")
+async def execute_mcp_tool(tool_name: str, payload: dict, timeout: float | None = None):
+    if tool_name not in mcp_tools:
+        raise HTTPException(status_code=404, detail="MCP Tool not found")
+    invocation = mcp_executor.submit(tool_name, payload, timeout=timeout)
+    try:
+        result = await invocation.task
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"MCP Tool {tool_name} timed out")
+    except asyncio.CancelledError:
+        if not invocation.task.cancelled():
+            raise
+        raise HTTPException(status_code=409, detail=f"MCP Tool invocation {invocation.id} was cancelled")
+    return {"tool": tool_name, "invocation_id": invocation.id, "result": result}
+
+class MCPBatchInvocation(BaseModel):
+    id: str
+    tool: str
+    args: dict = Field(default_factory=dict)
+    depends_on: list[str] = Field(default_factory=list)
+    timeout: float | None = None
+
+class MCPBatchRequest(BaseModel):
+    invocations: list[MCPBatchInvocation]
+    timeout: float | None = None
+
+# Runs many tool invocations in one request. Arguments can embed
+# {"$ref": "<id>"} or {"$ref": "<id>.field"} to consume another invocation's
+# result; independent invocations run concurrently and every result is
+# streamed back as soon as it finishes, as NDJSON (default) or SSE
+# (?format=sse).
+@app.post("/mcp/batch")
+async def execute_mcp_batch(request: MCPBatchRequest, format: str = "ndjson"):
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    invocations = [invocation.model_dump() for invocation in request.invocations]
+    try:
+        mcp_executor.plan_batch(invocations)
+    except MCPBatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        async for event in mcp_executor.run_batch(invocations, timeout=request.timeout):
+            line = json.dumps(event, default=str)
+            yield f"event: result\ndata: {line}\n\n" if format == "sse" else line + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+@app.delete("/mcp/invocations/{invocation_id}")
+async def cancel_mcp_invocation(invocation_id: int):
+    if not mcp_executor.cancel(invocation_id):
+        raise HTTPException(status_code=404, detail="MCP invocation not found or already finished")
+    return {"invocation_id": invocation_id, "status": "cancelled"}
+
+@app.delete("/mcp/cache")
+async def invalidate_mcp_cache(tool_name: str | None = None):
+    if mcp_executor.cache is None:
+        raise HTTPException(status_code=500, detail="MCP result cache not configured")
+    if tool_name is not None and tool_name not in mcp_tools:
+        raise HTTPException(status_code=404, detail="MCP Tool not found")
+    removed = await asyncio.to_thread(mcp_executor.cache.invalidate, tool_name)
+    return {"tool": tool_name, "invalidated": removed}
+
+@app.get("/mcp/status")
+async def get_mcp_status():
+    return mcp_executor.stats()
 
 # Example endpoint for Gmail operations (conceptual)
 @app.post("/gmail/send")
 async def send_gmail_message(recipient: str, subject: str, body: str):
-    if gmail_service:
+    if await registry.aget("gmail"):
         # Implement actual Gmail sending logic here
         return {"status": "success", "message": f"Attempted to send email to {recipient}"}
     raise HTTPException(status_code=500, detail="Gmail service not initialized")
@@ -381,7 +711,7 @@ async def send_gmail_message(recipient: str, subject: str, body: str):
 # Example endpoint for Google Calendar operations (conceptual)
 @app.post("/calendar/create_event")
 async def create_calendar_event(summary: str, description: str, start_time: str, end_time: str):
-    if google_calendar_service:
+    if await registry.aget("google_calendar"):
         # Implement actual Google Calendar event creation logic here
         return {"status": "success", "message": f"Attempted to create event: {summary}"}
     raise HTTPException(status_code=500, detail="Google Calendar service not initialized")
@@ -389,7 +719,7 @@ async def create_calendar_event(summary: str, description: str, start_time: str,
 # Example endpoint for Notion operations (conceptual)
 @app.post("/notion/create_page")
 async def create_notion_page(parent_page_id: str, title: str, content: str):
-    if notion_client:
+    if await registry.aget("notion"):
         # Implement actual Notion page creation logic here
         return {"status": "success", "message": f"Attempted to create Notion page: {title}"}
     raise HTTPException(status_code=500, detail="Notion service not initialized")
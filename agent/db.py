@@ -0,0 +1,146 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, select
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+class AgentLog(Base):
+    __tablename__ = "agent_logs"
+    id = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    level = Column(String)
+    message = Column(Text)
+
+class AgentMemory(Base):
+    __tablename__ = "agent_memory"
+    id = Column(Integer, primary_key=True, index=True)
+    # Indexed so MemoryStore can poll for rows changed by other workers; every
+    # write has to move it forward, including ORM updates (onupdate).
+    timestamp = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    key = Column(String, unique=True, index=True)
+    value = Column(Text)
+
+class AgentTask(Base):
+    """Durable task queue row; see agent/task_queue.py."""
+    __tablename__ = "agent_tasks"
+    id = Column(Integer, primary_key=True)
+    queue = Column(String, nullable=False, default="default")
+    name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")
+    priority = Column(Integer, nullable=False, default=0)
+    # queued -> running -> done; failed attempts go back to queued (run_at moves
+    # forward with the backoff) until max_attempts, then to agent_tasks_dead.
+    status = Column(String, nullable=False, default="queued")
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    deadline = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    result = Column(Text)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Dequeue scans one queue's claimable rows in priority order.
+        Index("ix_agent_tasks_dequeue", "queue", "status", "priority", "run_at"),
+        Index("ix_agent_tasks_lease", "status", "lease_expires_at"),
+    )
+
+class AgentDeadTask(Base):
+    """Tasks that ran out of attempts or missed their deadline."""
+    __tablename__ = "agent_tasks_dead"
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, index=True)
+    queue = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    priority = Column(Integer, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text)
+    reason = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    failed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Async drivers used for the plain URLs found in DATABASE_URL.
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Maps a sync SQLAlchemy URL (as used in ``DATABASE_URL``) to its async driver."""
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_options(url: str) -> dict:
+    """Pool settings from DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and DB_POOL_PRE_PING."""
+    options = {"pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True)}
+    # In-memory SQLite lives in a single connection (StaticPool), which takes no sizing.
+    if ":memory:" in url or url.rstrip("/").endswith("sqlite+aiosqlite:"):
+        return options
+    options["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+    options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    options["pool_timeout"] = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    if os.getenv("DB_POOL_RECYCLE"):
+        options["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE"))
+    return options
+
+
+class Database:
+    """Async engine and session factory shared by the API endpoints and the agent."""
+
+    def __init__(self, url: str, **engine_options):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        self.url = async_database_url(url)
+        options = pool_options(self.url)
+        options.update(engine_options)
+        self.engine = create_async_engine(self.url, **options)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def create_all(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+    def session(self):
+        return self.sessionmaker()
+
+    async def log(self, level: str, message: str):
+        async with self.sessionmaker() as db:
+            db.add(AgentLog(level=level, message=message))
+            await db.commit()
+
+    async def save_memory(self, key: str, value: str):
+        async with self.sessionmaker() as db:
+            memory_entry = (await db.execute(select(AgentMemory).where(AgentMemory.key == key))).scalar_one_or_none()
+            if memory_entry:
+                memory_entry.value = value
+            else:
+                db.add(AgentMemory(key=key, value=value))
+            await db.commit()
+
+    async def load_memory(self, key: str) -> str | None:
+        async with self.sessionmaker() as db:
+            return (await db.execute(select(AgentMemory.value).where(AgentMemory.key == key))).scalar_one_or_none()
+
+    def pool_status(self) -> str:
+        return self.engine.pool.status()
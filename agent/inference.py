@@ -0,0 +1,179 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Groups concurrent single-item requests into batches for ``fn``.
+
+    ``fn`` takes a list of inputs and returns a list of outputs in the same
+    order. It runs on one dedicated worker thread, so the model is never
+    called concurrently and the event loop never blocks on it. A batch is
+    dispatched as soon as it holds ``max_batch_size`` items, or ``max_wait``
+    seconds after its first item arrived, whichever comes first; the next
+    batch is collected while the current one runs.
+    """
+
+    def __init__(self, fn, max_batch_size: int = 32, max_wait: float = 0.005):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    async def submit(self, item):
+        """Result of ``fn`` for ``item``, computed as part of whatever batch it lands in."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._loop())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items: list) -> list:
+        return await asyncio.gather(*(self.submit(item) for item in items))
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return [(item, future) for item, future in batch if not future.cancelled()]
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        running = None
+        while True:
+            batch = await self._collect()
+            if running is not None:
+                # Whatever queued up while the previous batch ran joins this one.
+                await running
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    item, future = self._queue.get_nowait()
+                    if not future.cancelled():
+                        batch.append((item, future))
+            if batch:
+                running = asyncio.ensure_future(self._dispatch(loop, batch))
+            else:
+                running = None
+
+    async def _dispatch(self, loop, batch):
+        start = time.perf_counter()
+        try:
+            outputs = await loop.run_in_executor(self._executor, self.fn, [item for item, _ in batch])
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"batch function returned {len(outputs)} results for {len(batch)} inputs")
+        except Exception as e:
+            self.errors += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        finally:
+            self.batches += 1
+            self.items += len(batch)
+            self.busy_seconds += time.perf_counter() - start
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class InferenceService:
+    """Hugging Face ``pipeline`` behind a :class:`MicroBatcher`.
+
+    The model is loaded on the worker thread the first time a batch runs,
+    after capping torch's CPU threads at ``num_threads``, so constructing the
+    service is free and startup never pays for the model.
+    """
+
+    def __init__(self, task: str, model: str, max_batch_size: int = 32, max_wait: float = 0.005,
+                 num_threads: int | None = None, token: str | None = None, loader=None):
+        self.task = task
+        self.model = model
+        self.num_threads = num_threads
+        self.token = token
+        self.loader = loader or self._load_pipeline
+        self.pipeline = None
+        self.load_seconds = None
+        self.batcher = MicroBatcher(self._run_batch, max_batch_size=max_batch_size, max_wait=max_wait)
+
+    @classmethod
+    def from_env(cls) -> "InferenceService":
+        """Configured from HF_TASK, HF_MODEL, HF_MAX_BATCH_SIZE, HF_MAX_WAIT_MS and HF_NUM_THREADS."""
+        threads = os.getenv("HF_NUM_THREADS")
+        return cls(
+            task=os.getenv("HF_TASK", "sentiment-analysis"),
+            model=os.getenv("HF_MODEL", "distilbert-base-uncased-finetuned-sst-2-english"),
+            max_batch_size=int(os.getenv("HF_MAX_BATCH_SIZE", "32")),
+            max_wait=float(os.getenv("HF_MAX_WAIT_MS", "5")) / 1000,
+            num_threads=int(threads) if threads else None,
+            token=os.getenv("HUGGING_FACE_API_KEY"),
+        )
+
+    def _load_pipeline(self):
+        import torch
+        from transformers import pipeline
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        return pipeline(self.task, model=self.model, device=-1, token=self.token)
+
+    def _run_batch(self, inputs: list) -> list:
+        if self.pipeline is None:
+            start = time.perf_counter()
+            self.pipeline = self.loader()
+            self.load_seconds = time.perf_counter() - start
+        return list(self.pipeline(inputs, batch_size=len(inputs), truncation=True))
+
+    async def predict(self, text: str):
+        return await self.batcher.submit(text)
+
+    async def predict_many(self, texts: list[str]) -> list:
+        return await self.batcher.submit_many(texts)
+
+    def close(self):
+        self.batcher.close()
+
+    def stats(self) -> dict:
+        return {
+            "task": self.task,
+            "model": self.model,
+            "loaded": self.pipeline is not None,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "num_threads": self.num_threads,
+            **self.batcher.stats(),
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import threading
+import time
+
+
+class Integration:
+    """An external integration that is imported and initialized on first use."""
+
+    def __init__(self, name: str, label: str, init, env: tuple = (), eager: bool = False, close=None):
+        self.name = name
+        self.label = label
+        self.env = tuple(env)
+        self.eager = eager
+        self.is_async = asyncio.iscoroutinefunction(init)
+        self._init = init
+        self._close = close
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self.state = "pending"  # pending | ready | unavailable | skipped | failed
+        self.value = None
+        self.error = None
+        self.init_seconds = None
+
+    @property
+    def configured(self) -> bool:
+        return all(os.getenv(var) for var in self.env)
+
+    @property
+    def initialized(self) -> bool:
+        return self.state != "pending"
+
+    def get(self):
+        if self.state == "pending":
+            if self.is_async:
+                raise RuntimeError(f"{self.label} has an async initializer; use 'await registry.aget({self.name!r})'")
+            with self._lock:
+                if self.state == "pending":
+                    self._initialize()
+        return self.value
+
+    async def aget(self):
+        if self.state == "pending":
+            if not self.is_async:
+                await asyncio.to_thread(self.get)
+            else:
+                async with self._async_lock:
+                    if self.state == "pending":
+                        await self._ainitialize()
+        return self.value
+
+    async def aclose(self):
+        if self._close and self.state == "ready":
+            result = self._close(self.value)
+            if asyncio.iscoroutine(result):
+                await result
+
+    def reset(self):
+        with self._lock:
+            self.state = "pending"
+            self.value = None
+            self.error = None
+            self.init_seconds = None
+
+    def _skip_unconfigured(self) -> bool:
+        if self.configured:
+            return False
+        print(f"{', '.join(self.env)} not set. {self.label} integration skipped.")
+        self.state = "skipped"
+        return True
+
+    def _record(self, value, error, start):
+        self.init_seconds = time.perf_counter() - start
+        if error is not None:
+            print(f"Error initializing {self.label}: {error}")
+            self.error = str(error)
+            self.state = "failed"
+        else:
+            self.value = value
+            self.state = "ready" if value is not None else "unavailable"
+
+    def _initialize(self):
+        if self._skip_unconfigured():
+            return
+        start = time.perf_counter()
+        try:
+            value = self._init()
+        except Exception as e:
+            self._record(None, e, start)
+        else:
+            self._record(value, None, start)
+
+    async def _ainitialize(self):
+        if self._skip_unconfigured():
+            return
+        start = time.perf_counter()
+        try:
+            value = await self._init()
+        except Exception as e:
+            self._record(None, e, start)
+        else:
+            self._record(value, None, start)
+
+
+class IntegrationRegistry:
+    """Declares every integration once and initializes them lazily or in parallel."""
+
+    def __init__(self):
+        self._integrations: dict[str, Integration] = {}
+
+    def integration(self, name: str, label: str | None = None, env: tuple = (), eager: bool = False, close=None):
+        """Decorator registering ``func`` as the initializer of integration ``name``.
+
+        The initializer must do its own heavy imports so that nothing is loaded
+        until the integration is first requested. It may be a coroutine
+        function, in which case it runs on the event loop and the integration
+        is only reachable through :meth:`aget`. ``close`` receives the
+        initialized value on shutdown.
+        """
+        def decorator(func):
+            self._integrations[name] = Integration(name, label or name, func, env=env, eager=eager, close=close)
+            return func
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._integrations
+
+    def __getitem__(self, name: str) -> Integration:
+        return self._integrations[name]
+
+    def names(self) -> list[str]:
+        return list(self._integrations)
+
+    def get(self, name: str):
+        return self._integrations[name].get()
+
+    async def aget(self, name: str):
+        return await self._integrations[name].aget()
+
+    async def init_all(self, names=None):
+        """Initializes ``names`` (default: all) concurrently; sync initializers run in worker threads."""
+        names = self.names() if names is None else list(names)
+        await asyncio.gather(*(self.aget(name) for name in names))
+
+    async def aclose_all(self):
+        """Runs the ``close`` hook of every initialized integration, in reverse declaration order."""
+        for integration in reversed(list(self._integrations.values())):
+            try:
+                await integration.aclose()
+            except Exception as e:
+                print(f"Error closing {integration.label}: {e}")
+
+    def eager_names(self) -> list[str]:
+        """Integrations to initialize at startup.
+
+        ``AGENT_EAGER_INTEGRATIONS`` overrides the declared defaults: ``all``,
+        ``none`` or a comma separated list of integration names.
+        """
+        setting = os.getenv("AGENT_EAGER_INTEGRATIONS")
+        if setting is None:
+            return [name for name, integration in self._integrations.items() if integration.eager]
+        setting = setting.strip().lower()
+        if setting == "all":
+            return self.names()
+        if setting in ("", "none"):
+            return []
+        return [name.strip() for name in setting.split(",") if name.strip() in self._integrations]
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                "state": integration.state,
+                "init_ms": round(integration.init_seconds * 1000, 3) if integration.init_seconds is not None else None,
+                "error": integration.error,
+            }
+            for name, integration in self._integrations.items()
+        }
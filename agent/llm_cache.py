@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str | None) -> str:
+    """NFKC, collapsed whitespace, stripped. Prompts differing only in spacing share an entry."""
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class LLMCache:
+    """Persistent response cache for LLM completions, stored in one SQLite file.
+
+    Exact hits match the normalized prompt together with the model, system
+    prompt and sampling parameters. With ``similarity`` set, a miss falls back
+    to the most similar cached prompt (cosine over ``embed``) with the same
+    model and parameters, if it scores at least ``similarity``. Entries are
+    evicted least recently used first once the stored responses exceed
+    ``max_bytes``.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, similarity: float | None = None,
+                 embed=None, dim: int = 256):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.similarity = similarity
+        self.dim = dim
+        if embed is None:
+            from agent.vector_index import hash_embedding
+            embed = lambda texts: hash_embedding(texts, dim)  # noqa: E731
+        self.embed = embed
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, scope TEXT NOT NULL, prompt TEXT NOT NULL, response TEXT NOT NULL,"
+            " size INTEGER NOT NULL, latency REAL NOT NULL, embedding BLOB,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_scope ON llm_cache (scope)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        self._scopes: dict[str, tuple[list[str], np.ndarray]] = {}  # scope -> (keys, embeddings)
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.latency_saved = 0.0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, embed=None) -> "LLMCache | None":
+        """Cache at LLM_CACHE_PATH (empty disables it), sized by LLM_CACHE_MAX_BYTES.
+
+        LLM_CACHE_SIMILARITY (e.g. ``0.95``) turns on near-duplicate matching.
+        """
+        path = os.getenv("LLM_CACHE_PATH", "agent_llm_cache.sqlite3")
+        if not path:
+            return None
+        similarity = os.getenv("LLM_CACHE_SIMILARITY")
+        return cls(path,
+                   max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+                   similarity=float(similarity) if similarity else None,
+                   embed=embed,
+                   dim=int(os.getenv("AGENT_EMBEDDING_DIM", "256")))
+
+    # --- Keys ---
+
+    @staticmethod
+    def _scope(request, provider: str | None) -> str:
+        """Everything except the prompt that determines the response."""
+        parts = [provider or "", request.model or "", normalize_prompt(request.system),
+                 repr(float(request.temperature)), str(request.max_tokens)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(scope: str, prompt: str) -> str:
+        return hashlib.sha256(f"{scope}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+    # --- Lookup / store (blocking; the gateway calls these through asyncio.to_thread) ---
+
+    def get(self, request, provider: str | None = None) -> tuple[dict, str] | None:
+        """``(response dict, "exact" | "similar")`` or None on a miss."""
+        scope = self._scope(request, provider)
+        prompt = normalize_prompt(request.prompt)
+        key = self._key(scope, prompt)
+        with self._lock:
+            row = self._conn.execute("SELECT response, latency FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            kind = "exact"
+            if row is None and self.similarity is not None:
+                key = self._nearest(scope, prompt)
+                if key is not None:
+                    row = self._conn.execute("SELECT response, latency FROM llm_cache WHERE key = ?",
+                                             (key,)).fetchone()
+                    kind = "similar"
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                               (time.time(), key))
+        if kind == "exact":
+            self.exact_hits += 1
+        else:
+            self.similar_hits += 1
+        self.latency_saved += row[1]
+        return json.loads(row[0]), kind
+
+    def set(self, request, provider: str | None, response: dict):
+        scope = self._scope(request, provider)
+        prompt = normalize_prompt(request.prompt)
+        key = self._key(scope, prompt)
+        payload = json.dumps(response, ensure_ascii=False)
+        size = len(payload.encode("utf-8")) + len(prompt.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        embedding = None
+        if self.similarity is not None:
+            embedding = np.asarray(self.embed([prompt]), dtype=np.float32).reshape(-1)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, scope, prompt, response, size, latency, embedding,"
+                " created_at, last_used, hits) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, scope, prompt, payload, size, float(response.get("latency") or 0.0),
+                 embedding.tobytes() if embedding is not None else None, now, now))
+            self._bytes += size - (old[0] if old else 0)
+            if embedding is not None and old is None and scope in self._scopes:
+                keys, matrix = self._scopes[scope]
+                self._scopes[scope] = (keys + [key], np.vstack([matrix, embedding[None, :]]))
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _nearest(self, scope: str, prompt: str) -> str | None:
+        if scope not in self._scopes:
+            rows = self._conn.execute("SELECT key, embedding FROM llm_cache WHERE scope = ? AND embedding IS NOT NULL",
+                                      (scope,)).fetchall()
+            keys = [row[0] for row in rows]
+            matrix = (np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+                      if rows else np.zeros((0, self.dim), dtype=np.float32))
+            self._scopes[scope] = (keys, matrix)
+        keys, matrix = self._scopes[scope]
+        if not keys:
+            return None
+        query = np.asarray(self.embed([prompt]), dtype=np.float32).reshape(-1)
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity else None
+
+    def _evict(self):
+        # Least recently used first, down to 90% of the budget so eviction is not run on every write.
+        target = self.max_bytes * 0.9
+        evicted = set()
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used").fetchall():
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._bytes -= size
+            evicted.add(key)
+        self.evictions += len(evicted)
+        # Rebuilt lazily on the next near-duplicate lookup.
+        self._scopes = {scope: entry for scope, entry in self._scopes.items() if not evicted & set(entry[0])}
+
+    # --- Invalidation / metrics ---
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM llm_cache").rowcount
+            self._bytes = 0
+            self._scopes.clear()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.similar_hits
+        lookups = hits + self.misses
+        return {
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "similarity": self.similarity,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "evictions": self.evictions,
+        }
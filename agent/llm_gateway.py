@@ -0,0 +1,391 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+
+import httpx
+
+
+class LLMError(Exception):
+    """Raised when no provider could serve a request."""
+
+
+class _LeaderCancelled(Exception):
+    """Set on a coalesced request whose first caller was cancelled; a follower reruns it."""
+
+
+@dataclass(frozen=True)
+class LLMRequest:
+    prompt: str
+    system: str | None = None
+    model: str | None = None
+    temperature: float = 0.7
+    max_tokens: int = 512
+
+    def estimated_tokens(self) -> int:
+        # ~4 characters per token, plus the completion budget.
+        return (len(self.prompt) + len(self.system or "")) // 4 + self.max_tokens
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    provider: str
+    model: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    latency: float = 0.0
+    cached: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TokenBucket:
+    """Tokens-per-minute budget. Requests wait until their estimate fits; actual usage is settled afterwards."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def settle(self, estimated: int, actual: int):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + estimated - actual)
+
+
+class Provider:
+    """One LLM backend with its own concurrency cap and tokens-per-minute budget."""
+
+    name = "provider"
+
+    def __init__(self, client: httpx.AsyncClient, api_key: str, model: str, base_url: str,
+                 max_concurrency: int = 8, tokens_per_minute: int | None = None):
+        self.client = client
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.tokens = 0
+
+    @asynccontextmanager
+    async def _admit(self, request: LLMRequest):
+        estimate = request.estimated_tokens()
+        if self.budget:
+            await self.budget.acquire(estimate)
+        async with self._semaphore:
+            self.in_flight += 1
+            self.requests += 1
+            usage = {"tokens": estimate}
+            try:
+                yield usage
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                self.tokens += usage["tokens"]
+                if self.budget:
+                    self.budget.settle(estimate, usage["tokens"])
+
+    async def complete(self, request: LLMRequest, model: str) -> LLMResponse:
+        async with self._admit(request) as usage:
+            start = time.perf_counter()
+            url, kwargs = self._complete_args(request, model)
+            response = await self.client.post(url, **kwargs)
+            response.raise_for_status()
+            result = self._parse(response.json(), model)
+            result.latency = time.perf_counter() - start
+            if result.prompt_tokens is not None and result.completion_tokens is not None:
+                usage["tokens"] = result.prompt_tokens + result.completion_tokens
+            return result
+
+    async def stream(self, request: LLMRequest, model: str):
+        async with self._admit(request) as usage:
+            produced = 0
+            url, kwargs = self._stream_args(request, model)
+            async with self.client.stream("POST", url, **kwargs) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    text = self._parse_chunk(json.loads(data))
+                    if text:
+                        produced += len(text)
+                        yield text
+            usage["tokens"] = (len(request.prompt) + len(request.system or "")) // 4 + produced // 4
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "tokens": self.tokens,
+            "tokens_available": int(self.budget.tokens) if self.budget else None,
+        }
+
+
+class OpenAIProvider(Provider):
+    """OpenAI chat completions (or any OpenAI-compatible server via OPENAI_BASE_URL)."""
+
+    name = "openai"
+
+    @classmethod
+    def from_env(cls, client: httpx.AsyncClient) -> "OpenAIProvider":
+        tpm = os.getenv("OPENAI_TPM")
+        return cls(client, os.getenv("OPENAI_API_KEY"),
+                   model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+                   base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+                   max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+                   tokens_per_minute=int(tpm) if tpm else None)
+
+    def _payload(self, request, model, stream):
+        messages = [{"role": "system", "content": request.system}] if request.system else []
+        messages.append({"role": "user", "content": request.prompt})
+        return {"model": model, "messages": messages, "temperature": request.temperature,
+                "max_tokens": request.max_tokens, "stream": stream}
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def _complete_args(self, request, model):
+        return f"{self.base_url}/chat/completions", {"json": self._payload(request, model, False),
+                                                     "headers": self._headers()}
+
+    def _parse(self, data, model):
+        usage = data.get("usage") or {}
+        return LLMResponse(text=data["choices"][0]["message"]["content"], provider=self.name,
+                           model=data.get("model", model), prompt_tokens=usage.get("prompt_tokens"),
+                           completion_tokens=usage.get("completion_tokens"))
+
+    def _stream_args(self, request, model):
+        return f"{self.base_url}/chat/completions", {"json": self._payload(request, model, True),
+                                                     "headers": self._headers()}
+
+    def _parse_chunk(self, data):
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content")
+
+
+class GeminiProvider(Provider):
+    """Google Gemini through the Generative Language REST API."""
+
+    name = "gemini"
+
+    @classmethod
+    def from_env(cls, client: httpx.AsyncClient) -> "GeminiProvider":
+        tpm = os.getenv("GEMINI_TPM")
+        return cls(client, os.getenv("GOOGLE_GEMINI_API_KEY"),
+                   model=os.getenv("GEMINI_MODEL", "gemini-pro"),
+                   base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"),
+                   max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+                   tokens_per_minute=int(tpm) if tpm else None)
+
+    def _payload(self, request):
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": request.prompt}]}],
+            "generationConfig": {"temperature": request.temperature, "maxOutputTokens": request.max_tokens},
+        }
+        if request.system:
+            payload["systemInstruction"] = {"parts": [{"text": request.system}]}
+        return payload
+
+    def _headers(self):
+        return {"x-goog-api-key": self.api_key}
+
+    def _complete_args(self, request, model):
+        return f"{self.base_url}/models/{model}:generateContent", {"json": self._payload(request),
+                                                                   "headers": self._headers()}
+
+    def _parse(self, data, model):
+        usage = data.get("usageMetadata") or {}
+        return LLMResponse(text=self._parse_chunk(data) or "", provider=self.name, model=model,
+                           prompt_tokens=usage.get("promptTokenCount"),
+                           completion_tokens=usage.get("candidatesTokenCount"))
+
+    def _stream_args(self, request, model):
+        return f"{self.base_url}/models/{model}:streamGenerateContent", {
+            "params": {"alt": "sse"}, "json": self._payload(request), "headers": self._headers()}
+
+    def _parse_chunk(self, data):
+        candidates = data.get("candidates") or [{}]
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+
+class LLMGateway:
+    """Single entry point for every LLM call made by the agent.
+
+    Providers share one pooled ``httpx.AsyncClient``. Identical requests that
+    are already in flight are coalesced into one upstream call, and a failed
+    or timed out call falls back to the next provider in ``order``. With a
+    ``cache`` (see agent/llm_cache.py), completions are answered from it when
+    possible; ``complete(..., cache=False)`` skips it for one call.
+    """
+
+    def __init__(self, providers: list[Provider], client: httpx.AsyncClient | None = None, timeout: float = 60.0,
+                 cache=None):
+        self.providers = {provider.name: provider for provider in providers}
+        self.client = client
+        self.timeout = timeout
+        self.cache = cache
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def make_client() -> httpx.AsyncClient:
+        """Pooled client sized by LLM_MAX_CONNECTIONS / LLM_MAX_KEEPALIVE."""
+        limits = httpx.Limits(max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+                              max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", "20")))
+        return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(float(os.getenv("LLM_TIMEOUT", "60"))))
+
+    @classmethod
+    def from_env(cls, cache=None) -> "LLMGateway":
+        """Gateway over every provider with an API key, ordered by LLM_PROVIDER_ORDER."""
+        client = cls.make_client()
+        available = {}
+        if os.getenv("OPENAI_API_KEY"):
+            available["openai"] = OpenAIProvider.from_env(client)
+        if os.getenv("GOOGLE_GEMINI_API_KEY"):
+            available["gemini"] = GeminiProvider.from_env(client)
+        order = [name.strip() for name in os.getenv("LLM_PROVIDER_ORDER", "openai,gemini").split(",")]
+        providers = [available[name] for name in order if name in available]
+        providers += [p for name, p in available.items() if name not in order]
+        return cls(providers, client=client, timeout=float(os.getenv("LLM_TIMEOUT", "60")), cache=cache)
+
+    def _order(self, provider: str | None) -> list[Provider]:
+        if provider is not None and provider not in self.providers:
+            raise LLMError(f"unknown LLM provider {provider!r}")
+        names = list(self.providers)
+        if provider:
+            names.remove(provider)
+            names.insert(0, provider)
+        return [self.providers[name] for name in names]
+
+    async def complete(self, request: LLMRequest, provider: str | None = None, cache: bool = True) -> LLMResponse:
+        use_cache = self.cache is not None and cache
+        if self.cache is not None and not cache:
+            self.cache.bypassed += 1
+        if use_cache:
+            start = time.perf_counter()
+            hit = await asyncio.to_thread(self.cache.get, request, provider)
+            if hit is not None:
+                data, kind = hit
+                return LLMResponse(**{**data, "latency": time.perf_counter() - start, "cached": kind})
+        key = (provider, request)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        while pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # The first follower to wake up finds no call in flight and reruns
+                # the request; the others coalesce onto it.
+                pending = self._in_flight.get(key)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._complete_with_fallback(request, provider)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled: cancelling the shared future would
+            # cancel every follower too.
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no follower is waiting for it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if use_cache:
+                await asyncio.to_thread(self.cache.set, request, provider, result.to_dict())
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _complete_with_fallback(self, request: LLMRequest, provider: str | None) -> LLMResponse:
+        errors = []
+        for index, candidate in enumerate(self._order(provider)):
+            model = request.model if index == 0 and request.model else candidate.model
+            try:
+                return await asyncio.wait_for(candidate.complete(request, model), self.timeout)
+            except (httpx.HTTPError, asyncio.TimeoutError, KeyError, IndexError, ValueError) as e:
+                errors.append(f"{candidate.name}: {e!r}")
+                self.fallbacks += 1
+        raise LLMError("all LLM providers failed: " + "; ".join(errors) if errors else "no LLM provider configured")
+
+    async def stream(self, request: LLMRequest, provider: str | None = None):
+        """Yields text chunks. Falls back to the next provider only if nothing was streamed yet.
+
+        Each wait for a chunk is bounded by ``timeout``, so a provider that hangs
+        before its first chunk is abandoned like one that failed.
+        """
+        errors = []
+        for index, candidate in enumerate(self._order(provider)):
+            model = request.model if index == 0 and request.model else candidate.model
+            chunks = candidate.stream(request, model)
+            started = False
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        return
+                    started = True
+                    yield chunk
+            except (httpx.HTTPError, asyncio.TimeoutError, KeyError, IndexError, ValueError) as e:
+                if started:
+                    raise
+                errors.append(f"{candidate.name}: {e!r}")
+                self.fallbacks += 1
+            finally:
+                await chunks.aclose()
+        raise LLMError("all LLM providers failed: " + "; ".join(errors) if errors else "no LLM provider configured")
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+    def stats(self) -> dict:
+        return {
+            "providers": {name: provider.stats() for name, provider in self.providers.items()},
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "fallbacks": self.fallbacks,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import random
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from agent.db import AgentLog, Database
+
+OVERFLOW_POLICIES = ("drop", "block", "sample")
+
+
+class LogSink:
+    """Buffers AgentLog rows in memory and writes them in bulk from a background task.
+
+    A flush happens when ``batch_size`` rows are waiting or ``flush_interval``
+    seconds have passed, using COPY on PostgreSQL and a multi-row INSERT
+    elsewhere. At most ``max_queue`` rows are held; when the buffer is full the
+    ``overflow`` policy applies:
+
+    * ``drop``: the new row is discarded.
+    * ``block``: the caller waits until a flush frees space.
+    * ``sample``: reservoir sampling, so the buffer stays a uniform sample of
+      every row offered while it was full.
+    """
+
+    def __init__(self, database: Database, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_queue: int = 10_000, overflow: str = "drop"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self._buffer: deque = deque()
+        self._offered_while_full = 0
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self._use_copy = database.engine.dialect.name == "postgresql"
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    @classmethod
+    def from_env(cls, database: Database) -> "LogSink":
+        """Sink configured from AGENT_LOG_BATCH_SIZE, AGENT_LOG_FLUSH_INTERVAL, AGENT_LOG_QUEUE_SIZE and AGENT_LOG_OVERFLOW."""
+        return cls(
+            database,
+            batch_size=int(os.getenv("AGENT_LOG_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("AGENT_LOG_FLUSH_INTERVAL", "1.0")),
+            max_queue=int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000")),
+            overflow=os.getenv("AGENT_LOG_OVERFLOW", "drop"),
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def put(self, level: str, message: str) -> bool:
+        """Queues one row. Returns False if the row was dropped."""
+        if self._closed:
+            raise RuntimeError("LogSink is closed")
+        row = {"timestamp": datetime.utcnow(), "level": level, "message": message}
+        self.queued += 1
+        if len(self._buffer) >= self.max_queue:
+            if self.overflow == "block":
+                async with self._space:
+                    await self._space.wait_for(lambda: len(self._buffer) < self.max_queue)
+            else:
+                return self._overflow(row)
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _overflow(self, row) -> bool:
+        self._offered_while_full += 1
+        self.dropped += 1
+        if self.overflow == "drop":
+            return False
+        # Reservoir sampling over the rows seen since the buffer filled up.
+        slot = random.randrange(self.max_queue + self._offered_while_full)
+        if slot >= self.max_queue:
+            return False
+        self._buffer[slot] = row
+        return True
+
+    async def flush(self):
+        """Writes everything currently buffered."""
+        async with self._flush_lock:
+            while self._buffer:
+                count = min(len(self._buffer), self.batch_size)
+                rows = [self._buffer.popleft() for _ in range(count)]
+                if not self._buffer:
+                    self._offered_while_full = 0
+                async with self._space:
+                    self._space.notify_all()
+                try:
+                    await self._write(rows)
+                except Exception as e:
+                    self.flush_errors += 1
+                    print(f"Error flushing agent logs: {e}")
+                    self._requeue(rows)
+                    return
+                self.flushed += len(rows)
+                self.flushes += 1
+
+    def _requeue(self, rows):
+        room = self.max_queue - len(self._buffer)
+        self.dropped += max(0, len(rows) - room)
+        self._buffer.extendleft(reversed(rows[:room]))
+
+    async def _write(self, rows):
+        if self._use_copy:
+            records = [(row["timestamp"], row["level"], row["message"]) for row in rows]
+            async with self.database.engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    AgentLog.__tablename__, records=records, columns=["timestamp", "level", "message"])
+            return
+        async with self.database.engine.begin() as conn:
+            await conn.execute(insert(AgentLog), rows)
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self):
+        """Stops the background task and flushes whatever is still buffered."""
+        self._closed = True
+        if self._task is not None:
+            # Let the task finish its current write instead of cancelling it mid-batch.
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            self.dropped += len(self._buffer)
+            self._buffer.clear()
+
+    def stats(self) -> dict:
+        """Counters; ``queued`` always equals ``flushed + dropped + pending``."""
+        return {
+            "queued": self.queued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "pending": len(self._buffer),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "overflow_policy": self.overflow,
+        }
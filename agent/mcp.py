@@ -0,0 +1,363 @@
+import asyncio
+import functools
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTORS = ("async", "thread", "process")
+
+
+class MCPTool:
+    """Representa uma ferramenta ou capacidade exposta por um servidor MCP.
+
+    ``executor`` chooses where the tool runs: ``async`` tools are awaited on
+    the event loop, ``thread`` tools go to a shared thread pool and
+    ``process`` tools (CPU bound, picklable top-level functions) to a process
+    pool. It defaults to ``async`` for coroutine functions and ``thread``
+    otherwise. ``max_concurrency`` caps simultaneous runs of this tool and
+    ``timeout`` (seconds) bounds each run.
+
+    Deterministic tools can set ``cacheable`` so results are memoized by
+    tool name, ``version`` and arguments for ``cache_ttl`` seconds (forever
+    if unset); bump ``version`` whenever the tool's output would change.
+    """
+    def __init__(self, name: str, description: str, func, executor: str | None = None,
+                 max_concurrency: int | None = None, timeout: float | None = None,
+                 cacheable: bool = False, version: str = "1", cache_ttl: float | None = None):
+        self.name = name
+        self.description = description
+        self.func = func
+        self.cacheable = cacheable
+        self.version = version
+        self.cache_ttl = cache_ttl
+        self.executor = executor or ("async" if asyncio.iscoroutinefunction(func) else "thread")
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {self.executor!r}")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def execute(self, *args, **kwargs):
+        print(f"Executing MCP Tool: {self.name} with args: {args}, kwargs: {kwargs}")
+        return self.func(*args, **kwargs)
+
+
+class MCPBatchError(ValueError):
+    """Raised when a batch request is malformed (unknown tool or dependency, duplicate id, cycle)."""
+
+
+def _refs(value):
+    """Invocation ids referenced through ``{"$ref": "id"}`` / ``{"$ref": "id.path"}`` inside ``value``."""
+    if isinstance(value, dict):
+        if set(value) == {"$ref"}:
+            return {str(value["$ref"]).split(".", 1)[0]}
+        return set().union(*(_refs(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_refs(v) for v in value)) if value else set()
+    return set()
+
+
+def _resolve(value, results):
+    """Replaces every ``$ref`` in ``value`` with the referenced result (or a dotted path into it)."""
+    if isinstance(value, dict):
+        if set(value) == {"$ref"}:
+            source, _, path = str(value["$ref"]).partition(".")
+            resolved = results[source]
+            for part in path.split(".") if path else ():
+                resolved = resolved[int(part)] if isinstance(resolved, list) else resolved[part]
+            return resolved
+        return {k: _resolve(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, results) for v in value]
+    return value
+
+
+class MCPInvocation:
+    """One submitted tool run; await ``task`` for its result."""
+
+    def __init__(self, id: int, tool: MCPTool, task: asyncio.Task):
+        self.id = id
+        self.tool = tool
+        self.task = task
+
+
+class _ToolStats:
+    def __init__(self, tool: MCPTool):
+        self.semaphore = asyncio.Semaphore(tool.max_concurrency) if tool.max_concurrency else None
+        self.waiting = 0
+        self.running = 0
+        self.cache_hits = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+
+
+class MCPExecutor:
+    """Runs MCP tools without blocking the event loop.
+
+    Pools are created on first use and sized by MCP_THREAD_WORKERS and
+    MCP_PROCESS_WORKERS. A timeout or cancellation releases the caller
+    immediately; a sync tool already running in a pool cannot be interrupted
+    and finishes in the background, still counted as ``running`` (and holding
+    its concurrency slot) until then.
+    """
+
+    def __init__(self, tools: dict[str, MCPTool], default_timeout: float | None = None, cache=None):
+        self.tools = tools
+        self.default_timeout = default_timeout
+        self.cache = cache
+        self._ids = itertools.count(1)
+        self._stats: dict[str, _ToolStats] = {}
+        self._invocations: dict[int, MCPInvocation] = {}
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def from_env(cls, tools: dict[str, MCPTool]) -> "MCPExecutor":
+        from agent.mcp_cache import MCPResultCache
+
+        timeout = os.getenv("MCP_DEFAULT_TIMEOUT")
+        return cls(tools, default_timeout=float(timeout) if timeout else None, cache=MCPResultCache.from_env())
+
+    def _tool_stats(self, tool: MCPTool) -> _ToolStats:
+        if tool.name not in self._stats:
+            self._stats[tool.name] = _ToolStats(tool)
+        return self._stats[tool.name]
+
+    def _pool(self, kind: str):
+        if kind == "thread":
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("MCP_THREAD_WORKERS", "32")), thread_name_prefix="mcp")
+            return self._thread_pool
+        if self._process_pool is None:
+            workers = os.getenv("MCP_PROCESS_WORKERS")
+            self._process_pool = ProcessPoolExecutor(max_workers=int(workers) if workers else None)
+        return self._process_pool
+
+    def submit(self, tool_name: str, kwargs: dict, timeout: float | None = None) -> MCPInvocation:
+        """Schedules ``tool_name`` and returns immediately. Raises KeyError for unknown tools."""
+        tool = self.tools[tool_name]
+        invocation_id = next(self._ids)
+        task = asyncio.create_task(self._run(tool, kwargs, timeout))
+        invocation = MCPInvocation(invocation_id, tool, task)
+        self._invocations[invocation_id] = invocation
+        task.add_done_callback(lambda _: self._invocations.pop(invocation_id, None))
+        return invocation
+
+    async def execute(self, tool_name: str, kwargs: dict, timeout: float | None = None):
+        return await self.submit(tool_name, kwargs, timeout).task
+
+    def cancel(self, invocation_id: int) -> bool:
+        invocation = self._invocations.get(invocation_id)
+        if invocation is None:
+            return False
+        return invocation.task.cancel()
+
+    async def _run(self, tool: MCPTool, kwargs: dict, timeout: float | None):
+        stats = self._tool_stats(tool)
+        use_cache = tool.cacheable and self.cache is not None
+        if use_cache:
+            hit, result = await self.cache.get(tool, kwargs)
+            if hit:
+                stats.cache_hits += 1
+                return result
+        result = await self._execute(tool, kwargs, timeout, stats)
+        if use_cache:
+            await self.cache.set(tool, kwargs, result)
+        return result
+
+    async def _execute(self, tool: MCPTool, kwargs: dict, timeout: float | None, stats: _ToolStats):
+        timeout = timeout or tool.timeout or self.default_timeout
+        stats.waiting += 1
+        try:
+            if stats.semaphore:
+                await stats.semaphore.acquire()
+        except asyncio.CancelledError:
+            stats.waiting -= 1
+            stats.cancelled += 1
+            raise
+        stats.waiting -= 1
+        stats.running += 1
+        try:
+            if tool.executor == "async":
+                print(f"Executing MCP Tool: {tool.name} with args: (), kwargs: {kwargs}")
+                try:
+                    result = await asyncio.wait_for(tool.func(**kwargs), timeout)
+                finally:
+                    self._finished(stats)
+            else:
+                result = await asyncio.wait_for(asyncio.wrap_future(self._submit_to_pool(tool, kwargs, stats)), timeout)
+        except asyncio.TimeoutError:
+            stats.timed_out += 1
+            raise
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        stats.completed += 1
+        return result
+
+    def _submit_to_pool(self, tool: MCPTool, kwargs: dict, stats: _ToolStats):
+        if tool.executor == "thread":
+            call = functools.partial(tool.execute, **kwargs)
+        else:
+            call = functools.partial(tool.func, **kwargs)
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool(tool.executor).submit(call)
+        except Exception:
+            self._finished(stats)
+            raise
+        # The pool keeps running the call after a timeout/cancel, so the slot
+        # is only released once the pool future itself is done.
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finished, stats))
+        return future
+
+    @staticmethod
+    def _finished(stats: _ToolStats):
+        stats.running -= 1
+        if stats.semaphore:
+            stats.semaphore.release()
+
+    def plan_batch(self, invocations: list[dict]) -> dict[str, set]:
+        """Validates a batch and returns the dependencies of each invocation id.
+
+        Each invocation is ``{"id", "tool", "args", "depends_on"}``; arguments
+        may embed ``{"$ref": "<id>[.path]"}`` to receive another invocation's
+        result, which implies a dependency on it.
+        """
+        dependencies = {}
+        for invocation in invocations:
+            invocation_id = invocation["id"]
+            if invocation_id in dependencies:
+                raise MCPBatchError(f"duplicate invocation id {invocation_id!r}")
+            if invocation["tool"] not in self.tools:
+                raise MCPBatchError(f"unknown MCP tool {invocation['tool']!r} in {invocation_id!r}")
+            dependencies[invocation_id] = set(invocation.get("depends_on") or ()) | _refs(invocation.get("args") or {})
+        for invocation_id, needs in dependencies.items():
+            missing = needs - dependencies.keys()
+            if missing:
+                raise MCPBatchError(f"{invocation_id!r} depends on unknown invocation(s) {sorted(missing)}")
+        # Kahn's algorithm: anything left over sits on a cycle.
+        remaining = {k: set(v) for k, v in dependencies.items()}
+        ready = [k for k, v in remaining.items() if not v]
+        while ready:
+            done = ready.pop()
+            del remaining[done]
+            for k, v in remaining.items():
+                if done in v:
+                    v.discard(done)
+                    if not v:
+                        ready.append(k)
+        if remaining:
+            raise MCPBatchError(f"dependency cycle between {sorted(remaining)}")
+        return dependencies
+
+    async def run_batch(self, invocations: list[dict], timeout: float | None = None):
+        """Runs a validated batch, yielding one event per invocation as soon as it finishes.
+
+        Independent invocations run concurrently. When an invocation fails,
+        everything depending on it is reported as ``skipped``. Closing the
+        generator cancels whatever is still running.
+        """
+        dependencies = self.plan_batch(invocations)
+        by_id = {invocation["id"]: invocation for invocation in invocations}
+        waiting = {k: set(v) for k, v in dependencies.items()}
+        results, running = {}, {}
+
+        def start_ready():
+            """Submits every invocation whose dependencies succeeded; returns the ones whose $ref failed."""
+            failed = []
+            for invocation_id in [k for k, v in waiting.items() if not v]:
+                del waiting[invocation_id]
+                invocation = by_id[invocation_id]
+                try:
+                    args = _resolve(invocation.get("args") or {}, results)
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    failed.append({"id": invocation_id, "tool": invocation["tool"], "status": "error",
+                                   "error": f"could not resolve $ref: {e!r}"})
+                    continue
+                submitted = self.submit(invocation["tool"], args, timeout=invocation.get("timeout") or timeout)
+                running[submitted.task] = (invocation_id, time.perf_counter())
+            return failed
+
+        def skip_dependents(failed_id):
+            skipped = []
+            for invocation_id, needs in list(waiting.items()):
+                if failed_id in needs:
+                    del waiting[invocation_id]
+                    skipped.append(invocation_id)
+            for invocation_id in skipped:
+                yield {"id": invocation_id, "tool": by_id[invocation_id]["tool"], "status": "skipped",
+                       "error": f"dependency {failed_id!r} did not succeed"}
+                yield from skip_dependents(invocation_id)
+
+        try:
+            pending_events = start_ready()
+            while running or pending_events:
+                for event in pending_events:
+                    yield event
+                    for skipped in skip_dependents(event["id"]):
+                        yield skipped
+                pending_events = []
+                if not running:
+                    pending_events = start_ready()
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    invocation_id, started = running.pop(task)
+                    event = {"id": invocation_id, "tool": by_id[invocation_id]["tool"],
+                             "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+                    if task.cancelled():
+                        event.update(status="error", error="cancelled")
+                    elif isinstance(task.exception(), asyncio.TimeoutError):
+                        event.update(status="error", error="timed out")
+                    elif task.exception() is not None:
+                        event.update(status="error", error=str(task.exception()))
+                    else:
+                        results[invocation_id] = task.result()
+                        event.update(status="ok", result=results[invocation_id])
+                    yield event
+                    if event["status"] == "ok":
+                        for needs in waiting.values():
+                            needs.discard(invocation_id)
+                    else:
+                        for skipped in skip_dependents(invocation_id):
+                            yield skipped
+                pending_events = start_ready()
+        finally:
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> dict:
+        tools = {}
+        for name, tool in self.tools.items():
+            stats = self._tool_stats(tool)
+            tools[name] = {
+                "executor": tool.executor,
+                "max_concurrency": tool.max_concurrency,
+                "timeout": tool.timeout or self.default_timeout,
+                "queue_depth": stats.waiting,
+                "running": stats.running,
+                "cacheable": tool.cacheable,
+                "cache_hits": stats.cache_hits,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "timed_out": stats.timed_out,
+                "cancelled": stats.cancelled,
+            }
+        return {
+            "in_flight": sorted(self._invocations),
+            "tools": tools,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    def shutdown(self):
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = self._process_pool = None
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def cache_key(tool_name: str, version: str, args: dict) -> str:
+    """Content address of a tool call: SHA-256 over tool, version and canonical JSON arguments."""
+    canonical = json.dumps({"tool": tool_name, "version": version, "args": args},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MCPResultCache:
+    """Memoizes results of deterministic MCP tools.
+
+    Entries live in a size-bounded in-memory LRU and, when ``disk_dir`` is
+    set, in a second on-disk tier (one JSON file per entry under a directory
+    per tool, evicted oldest-first past ``disk_max_bytes``). Results must be
+    JSON serializable; anything else is simply not cached.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: str | None = None,
+                 disk_max_bytes: int = 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict = OrderedDict()  # key -> (tool, value, size, expires_at)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = self._scan_disk() if disk_dir else 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.uncacheable = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "MCPResultCache":
+        """Cache configured from MCP_CACHE_MAX_BYTES, MCP_CACHE_DIR and MCP_CACHE_DISK_MAX_BYTES."""
+        return cls(
+            max_bytes=int(os.getenv("MCP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            disk_dir=os.getenv("MCP_CACHE_DIR") or None,
+            disk_max_bytes=int(os.getenv("MCP_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))),
+        )
+
+    # --- Lookup / store ---
+
+    async def get(self, tool, args: dict) -> tuple[bool, object]:
+        """``(True, result)`` when this call is cached, ``(False, None)`` otherwise."""
+        key = cache_key(tool.name, tool.version, args)
+        value = self._memory_get(key)
+        if value is not _MISSING:
+            self.memory_hits += 1
+            return True, value
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._disk_get, tool.name, key)
+            if entry is not _MISSING:
+                self.disk_hits += 1
+                self._memory_set(tool.name, key, *entry)
+                return True, entry[0]
+        self.misses += 1
+        return False, None
+
+    async def set(self, tool, args: dict, value):
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            self.uncacheable += 1
+            return
+        key = cache_key(tool.name, tool.version, args)
+        expires_at = time.time() + tool.cache_ttl if tool.cache_ttl else None
+        self._memory_set(tool.name, key, value, len(payload), expires_at)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_set, tool.name, key, payload, expires_at)
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[3] is not None and entry[3] < time.time():
+                self._memory_bytes -= entry[2]
+                del self._memory[key]
+                return _MISSING
+            self._memory.move_to_end(key)
+            self.bytes_saved += entry[2]
+            return entry[1]
+
+    def _memory_set(self, tool_name, key, value, size, expires_at):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[2]
+            self._memory[key] = (tool_name, value, size, expires_at)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted[2]
+                self.evictions += 1
+
+    # --- Disk tier ---
+
+    def _disk_path(self, tool_name, key):
+        return os.path.join(self.disk_dir, tool_name, key + ".json")
+
+    def _disk_get(self, tool_name, key):
+        path = self._disk_path(tool_name, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+            self._disk_remove(path)
+            return _MISSING
+        size = len(json.dumps(entry["value"], ensure_ascii=False))
+        self.bytes_saved += size
+        return entry["value"], size, entry["expires_at"]
+
+    def _disk_set(self, tool_name, key, payload, expires_at):
+        path = self._disk_path(tool_name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = f'{{"expires_at": {json.dumps(expires_at)}, "value": {payload}}}'
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._disk_bytes += len(data.encode("utf-8")) - previous
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _disk_remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_disk(self) -> int:
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _evict_disk(self):
+        # Oldest files first, down to 90% of the budget so eviction is not run on every write.
+        target = self.disk_max_bytes * 0.9
+        for _, _, path in sorted(self._disk_entries()):
+            if self._disk_bytes <= target:
+                break
+            self._disk_remove(path)
+            self.evictions += 1
+
+    # --- Invalidation / metrics ---
+
+    def invalidate(self, tool_name: str | None = None) -> int:
+        """Drops every entry, or only those of ``tool_name``. Returns the number of memory entries removed."""
+        with self._lock:
+            keys = [k for k, entry in self._memory.items() if tool_name is None or entry[0] == tool_name]
+            for key in keys:
+                self._memory_bytes -= self._memory.pop(key)[2]
+        if self.disk_dir:
+            target = self.disk_dir if tool_name is None else os.path.join(self.disk_dir, tool_name)
+            shutil.rmtree(target, ignore_errors=True)
+            with self._lock:
+                self._disk_bytes = self._scan_disk() if os.path.isdir(self.disk_dir) else 0
+        return len(keys)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_bytes": self._disk_bytes if self.disk_dir else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "bytes_saved": self.bytes_saved,
+            "uncacheable": self.uncacheable,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,199 @@
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from agent.db import AgentMemory, Database
+
+_MISSING = object()
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=_MISSING):
+        entry = self._data.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class MemoryStore:
+    """Key/value API over AgentMemory with bulk reads, single-statement upserts and a write-through cache.
+
+    Writes from other workers are picked up by polling ``agent_memory.timestamp``
+    at most every ``sync_interval`` seconds before serving from the cache; keys
+    changed since the last poll are evicted. ``sync_skew`` widens the polling
+    window to tolerate clock differences between workers, and ``ttl`` bounds
+    staleness if polling fails.
+    """
+
+    def __init__(self, database: Database, cache_size: int = 1024, ttl: float = 30.0,
+                 sync_interval: float = 1.0, sync_skew: float = 2.0, chunk_size: int = 500):
+        self.database = database
+        self.cache = TTLCache(cache_size, ttl)
+        self.sync_interval = sync_interval
+        self.sync_skew = timedelta(seconds=sync_skew)
+        self.chunk_size = chunk_size
+        self._dialect = database.engine.dialect.name
+        self._watermark = datetime.utcnow()
+        self._seen: dict[str, datetime] = {}
+        self._last_sync = time.monotonic()
+        self.round_trips = 0
+
+    @classmethod
+    def from_env(cls, database: Database) -> "MemoryStore":
+        """Store configured from AGENT_MEMORY_CACHE_SIZE, AGENT_MEMORY_CACHE_TTL and AGENT_MEMORY_SYNC_INTERVAL."""
+        return cls(
+            database,
+            cache_size=int(os.getenv("AGENT_MEMORY_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("AGENT_MEMORY_CACHE_TTL", "30")),
+            sync_interval=float(os.getenv("AGENT_MEMORY_SYNC_INTERVAL", "1.0")),
+        )
+
+    async def get(self, key: str) -> str | None:
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys) -> dict[str, str]:
+        """Values for ``keys`` that exist; missing keys are left out of the result."""
+        await self._sync_invalidations()
+        found, pending = {}, []
+        for key in dict.fromkeys(keys):
+            value = self.cache.get(key)
+            if value is _MISSING:
+                pending.append(key)
+            elif value is not None:
+                found[key] = value
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            async with self.database.session() as db:
+                rows = (await db.execute(select(AgentMemory.key, AgentMemory.value, AgentMemory.timestamp)
+                                         .where(AgentMemory.key.in_(chunk)))).all()
+            self.round_trips += 1
+            loaded = {}
+            for key, value, timestamp in rows:
+                loaded[key] = value
+                # Remember the version we read so the next poll does not evict it.
+                self._seen[key] = timestamp
+            for key in chunk:
+                # Absent keys are cached as None so repeated misses stay local.
+                self.cache.set(key, loaded.get(key))
+            found.update(loaded)
+        return found
+
+    async def set(self, key: str, value: str):
+        await self.set_many({key: value})
+
+    async def set_many(self, items: dict[str, str]):
+        """Upserts every item, one statement per chunk, then updates the cache."""
+        if not items:
+            return
+        now = datetime.utcnow()
+        rows = [{"key": key, "value": value, "timestamp": now} for key, value in items.items()]
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            async with self.database.engine.begin() as conn:
+                if self._dialect in ("postgresql", "sqlite"):
+                    await conn.execute(self._upsert_statement(chunk))
+                else:
+                    await self._upsert_fallback(conn, chunk)
+            self.round_trips += 1
+        for key, value in items.items():
+            self.cache.set(key, value)
+            self._seen[key] = now
+
+    def _upsert_statement(self, rows):
+        if self._dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(AgentMemory).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=[AgentMemory.key],
+            set_={"value": statement.excluded.value, "timestamp": statement.excluded.timestamp},
+        )
+
+    async def _upsert_fallback(self, conn, rows):
+        from sqlalchemy import insert, update
+
+        existing = set((await conn.execute(
+            select(AgentMemory.key).where(AgentMemory.key.in_([row["key"] for row in rows])))).scalars())
+        for row in rows:
+            if row["key"] in existing:
+                await conn.execute(update(AgentMemory).where(AgentMemory.key == row["key"])
+                                   .values(value=row["value"], timestamp=row["timestamp"]))
+            else:
+                await conn.execute(insert(AgentMemory).values(**row))
+
+    async def _sync_invalidations(self):
+        """Evicts cached keys that another worker changed since the last poll."""
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = time.monotonic()
+        since = self._watermark - self.sync_skew
+        try:
+            async with self.database.session() as db:
+                rows = (await db.execute(
+                    select(AgentMemory.key, AgentMemory.timestamp).where(AgentMemory.timestamp > since))).all()
+        except Exception as e:
+            print(f"Error polling agent memory changes: {e}")
+            return
+        self.round_trips += 1
+        for key, timestamp in rows:
+            if self._seen.get(key) != timestamp:
+                self.cache.invalidate(key)
+                self._seen[key] = timestamp
+            if timestamp > self._watermark:
+                self._watermark = timestamp
+        # Only changes inside the polling window can show up again.
+        floor = self._watermark - self.sync_skew
+        self._seen = {key: ts for key, ts in self._seen.items() if ts > floor}
+
+    def stats(self) -> dict:
+        return dict(self.cache.stats(), round_trips=self.round_trips)
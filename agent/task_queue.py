@@ -0,0 +1,411 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, String, and_, delete, func, insert, literal, or_, select, update
+
+from agent.db import AgentDeadTask, AgentTask, Database
+
+
+class LeaseLost(Exception):
+    """The task's lease expired and another worker may have claimed it."""
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler for a task that can never succeed: it is dead-lettered without retries."""
+
+
+@dataclass
+class LeasedTask:
+    id: int
+    name: str
+    payload: dict
+    priority: int
+    attempts: int
+    max_attempts: int
+    deadline: datetime | None
+    lease_expires_at: datetime
+
+
+class TaskQueue:
+    """Persistent task queue on the agent database.
+
+    Workers claim tasks with one ``UPDATE ... WHERE id IN (SELECT ... LIMIT n)``:
+    on PostgreSQL the inner select uses ``FOR UPDATE SKIP LOCKED``, so
+    concurrent workers never wait on or claim the same row; on SQLite the
+    single statement runs under the database write lock. A claim is a lease of
+    ``lease_seconds`` that the worker renews with heartbeat(); a task whose
+    lease expires (the worker died) becomes claimable again. Failed attempts are
+    retried with exponential backoff until ``max_attempts``; tasks that run out
+    of attempts or pass their deadline move to ``agent_tasks_dead``.
+    Higher ``priority`` is claimed first.
+    """
+
+    def __init__(self, database: Database, queue: str = "default", lease_seconds: float = 30.0,
+                 max_attempts: int = 5, backoff_base: float = 1.0, backoff_max: float = 300.0,
+                 keep_completed: bool = True, sweep_interval: float = 1.0):
+        self.database = database
+        self.queue = queue
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.keep_completed = keep_completed
+        self.sweep_interval = sweep_interval
+        self._dialect = database.engine.dialect.name
+        self._last_sweep = 0.0
+        self.enqueued = 0
+        self.claimed = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+        self.leases_lost = 0
+
+    @classmethod
+    def from_env(cls, database: Database, queue: str | None = None) -> "TaskQueue":
+        """Queue configured from AGENT_TASK_QUEUE, AGENT_TASK_LEASE_SECONDS, AGENT_TASK_MAX_ATTEMPTS,
+        AGENT_TASK_BACKOFF_BASE and AGENT_TASK_KEEP_COMPLETED."""
+        return cls(
+            database,
+            queue=queue or os.getenv("AGENT_TASK_QUEUE", "default"),
+            lease_seconds=float(os.getenv("AGENT_TASK_LEASE_SECONDS", "30")),
+            max_attempts=int(os.getenv("AGENT_TASK_MAX_ATTEMPTS", "5")),
+            backoff_base=float(os.getenv("AGENT_TASK_BACKOFF_BASE", "1.0")),
+            keep_completed=os.getenv("AGENT_TASK_KEEP_COMPLETED", "true").lower() != "false",
+        )
+
+    async def create(self):
+        async with self.database.engine.begin() as conn:
+            await conn.run_sync(AgentTask.__table__.create, checkfirst=True)
+            await conn.run_sync(AgentDeadTask.__table__.create, checkfirst=True)
+            if self._dialect == "sqlite":
+                # Readers keep working while a worker holds the write lock.
+                await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        return self
+
+    # --- Producers ---
+
+    def _row(self, name: str, payload: dict | None, priority: int, delay: float, deadline, max_attempts, now):
+        if isinstance(deadline, (int, float)):
+            deadline = now + timedelta(seconds=deadline)
+        return {"queue": self.queue, "name": name, "payload": json.dumps(payload or {}, default=str),
+                "priority": priority, "status": "queued", "run_at": now + timedelta(seconds=delay),
+                "deadline": deadline, "attempts": 0, "max_attempts": max_attempts or self.max_attempts,
+                "created_at": now, "updated_at": now}
+
+    async def enqueue(self, name: str, payload: dict | None = None, priority: int = 0, delay: float = 0,
+                      deadline: datetime | float | None = None, max_attempts: int | None = None) -> int:
+        """Adds one task and returns its id. ``deadline`` is a UTC datetime or seconds from now."""
+        row = self._row(name, payload, priority, delay, deadline, max_attempts, datetime.utcnow())
+        async with self.database.engine.begin() as conn:
+            task_id = (await conn.execute(insert(AgentTask).values(**row).returning(AgentTask.id))).scalar_one()
+        self.enqueued += 1
+        return task_id
+
+    async def enqueue_many(self, tasks: list[dict], chunk_size: int = 500) -> int:
+        """Adds many tasks (dicts with the enqueue() arguments) in multi-row inserts."""
+        now = datetime.utcnow()
+        rows = [self._row(task["name"], task.get("payload"), task.get("priority", 0), task.get("delay", 0),
+                          task.get("deadline"), task.get("max_attempts"), now) for task in tasks]
+        for start in range(0, len(rows), chunk_size):
+            async with self.database.engine.begin() as conn:
+                await conn.execute(insert(AgentTask), rows[start:start + chunk_size])
+        self.enqueued += len(rows)
+        return len(rows)
+
+    # --- Workers ---
+
+    def _claimable(self, now):
+        return and_(
+            AgentTask.queue == self.queue,
+            AgentTask.attempts < AgentTask.max_attempts,
+            or_(AgentTask.deadline.is_(None), AgentTask.deadline > now),
+            or_(and_(AgentTask.status == "queued", AgentTask.run_at <= now),
+                and_(AgentTask.status == "running", AgentTask.lease_expires_at < now)),
+        )
+
+    async def dequeue(self, worker_id: str, limit: int = 1) -> list[LeasedTask]:
+        """Leases up to ``limit`` tasks to ``worker_id``, highest priority first."""
+        await self._maybe_sweep()
+        now = datetime.utcnow()
+        lease_expires_at = now + self.lease
+        candidates = (select(AgentTask.id).where(self._claimable(now))
+                      .order_by(AgentTask.priority.desc(), AgentTask.run_at, AgentTask.id).limit(limit))
+        if self._dialect == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        values = {"status": "running", "lease_owner": worker_id, "lease_expires_at": lease_expires_at,
+                  "attempts": AgentTask.attempts + 1, "updated_at": now}
+        columns = (AgentTask.id, AgentTask.name, AgentTask.payload, AgentTask.priority, AgentTask.attempts,
+                   AgentTask.max_attempts, AgentTask.deadline)
+        async with self.database.engine.begin() as conn:
+            if self._dialect in ("postgresql", "sqlite"):
+                rows = (await conn.execute(update(AgentTask).where(AgentTask.id.in_(candidates.scalar_subquery()))
+                                           .values(**values).returning(*columns))).all()
+            else:
+                rows = await self._dequeue_fallback(conn, candidates, values, columns, now)
+        self.claimed += len(rows)
+        tasks = [LeasedTask(row.id, row.name, json.loads(row.payload), row.priority, row.attempts,
+                            row.max_attempts, row.deadline, lease_expires_at) for row in rows]
+        return sorted(tasks, key=lambda task: (-task.priority, task.id))
+
+    async def _dequeue_fallback(self, conn, candidates, values, columns, now):
+        # Without SKIP LOCKED or RETURNING: claim row by row, re-checking that each
+        # is still claimable so two workers cannot both win it.
+        rows = []
+        for task_id in (await conn.execute(candidates)).scalars().all():
+            claimed = await conn.execute(update(AgentTask).where(AgentTask.id == task_id, self._claimable(now))
+                                         .values(**values))
+            if claimed.rowcount:
+                rows.append((await conn.execute(select(*columns).where(AgentTask.id == task_id))).one())
+        return rows
+
+    def _owned(self, task: LeasedTask, worker_id: str):
+        return and_(AgentTask.id == task.id, AgentTask.lease_owner == worker_id, AgentTask.status == "running")
+
+    async def heartbeat(self, task: LeasedTask, worker_id: str):
+        """Extends the lease; raises LeaseLost if the task is no longer ours."""
+        now = datetime.utcnow()
+        async with self.database.engine.begin() as conn:
+            renewed = await conn.execute(update(AgentTask).where(self._owned(task, worker_id))
+                                         .values(lease_expires_at=now + self.lease, updated_at=now))
+        if not renewed.rowcount:
+            self.leases_lost += 1
+            raise LeaseLost(f"Lease on task {task.id} was lost")
+        task.lease_expires_at = now + self.lease
+
+    async def complete(self, task: LeasedTask, worker_id: str, result=None):
+        async with self.database.engine.begin() as conn:
+            if self.keep_completed:
+                statement = update(AgentTask).where(self._owned(task, worker_id)).values(
+                    status="done", result=json.dumps(result, default=str), lease_owner=None,
+                    lease_expires_at=None, updated_at=datetime.utcnow())
+            else:
+                statement = delete(AgentTask).where(self._owned(task, worker_id))
+            done = await conn.execute(statement)
+        if not done.rowcount:
+            self.leases_lost += 1
+            raise LeaseLost(f"Lease on task {task.id} was lost before it completed")
+        self.completed += 1
+
+    async def complete_many(self, worker_id: str, done: list[tuple[LeasedTask, object]]) -> list[LeasedTask]:
+        """Completes several (task, result) pairs in one transaction; returns the tasks whose lease was lost."""
+        lost = []
+        now = datetime.utcnow()
+        async with self.database.engine.begin() as conn:
+            for task, result in done:
+                if self.keep_completed:
+                    statement = update(AgentTask).where(self._owned(task, worker_id)).values(
+                        status="done", result=json.dumps(result, default=str), lease_owner=None,
+                        lease_expires_at=None, updated_at=now)
+                else:
+                    statement = delete(AgentTask).where(self._owned(task, worker_id))
+                if not (await conn.execute(statement)).rowcount:
+                    lost.append(task)
+        self.leases_lost += len(lost)
+        self.completed += len(done) - len(lost)
+        return lost
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def fail(self, task: LeasedTask, worker_id: str, error: str, retry: bool = True):
+        """Schedules a retry with backoff, or dead-letters the task if it cannot be retried."""
+        now = datetime.utcnow()
+        run_at = now + timedelta(seconds=self.backoff(task.attempts))
+        exhausted = (not retry or task.attempts >= task.max_attempts
+                     or (task.deadline is not None and run_at >= task.deadline))
+        async with self.database.engine.begin() as conn:
+            if exhausted:
+                reason = "failed" if task.attempts >= task.max_attempts or not retry else "deadline"
+                await conn.execute(update(AgentTask).where(self._owned(task, worker_id)).values(last_error=error))
+                moved = await self._bury(conn, [task.id], reason, self._owned(task, worker_id))
+            else:
+                moved = (await conn.execute(update(AgentTask).where(self._owned(task, worker_id)).values(
+                    status="queued", run_at=run_at, last_error=error, lease_owner=None, lease_expires_at=None,
+                    updated_at=now))).rowcount
+        if not moved:
+            self.leases_lost += 1
+            raise LeaseLost(f"Lease on task {task.id} was lost before it failed")
+        if exhausted:
+            self.dead += 1
+        else:
+            self.retried += 1
+
+    async def _bury(self, conn, task_ids, reason, condition=None):
+        """Moves tasks to agent_tasks_dead in the caller's transaction; returns how many moved."""
+        if not task_ids:
+            return 0
+        where = AgentTask.id.in_(task_ids) if condition is None else and_(AgentTask.id.in_(task_ids), condition)
+        await conn.execute(insert(AgentDeadTask).from_select(
+            ["task_id", "queue", "name", "payload", "priority", "attempts", "last_error", "reason", "created_at",
+             "failed_at"],
+            select(AgentTask.id, AgentTask.queue, AgentTask.name, AgentTask.payload, AgentTask.priority,
+                   AgentTask.attempts, AgentTask.last_error, literal(reason, String), AgentTask.created_at,
+                   literal(datetime.utcnow(), DateTime)).where(where)))
+        return (await conn.execute(delete(AgentTask).where(where))).rowcount
+
+    async def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = time.monotonic()
+        await self.sweep()
+
+    async def sweep(self) -> int:
+        """Dead-letters tasks past their deadline and expired leases with no attempts left."""
+        now = datetime.utcnow()
+        waiting = or_(AgentTask.status == "queued",
+                      and_(AgentTask.status == "running", AgentTask.lease_expires_at < now))
+        expired = {
+            "deadline": and_(AgentTask.queue == self.queue, waiting, AgentTask.deadline <= now),
+            "lease expired": and_(AgentTask.queue == self.queue, AgentTask.status == "running",
+                                  AgentTask.lease_expires_at < now, AgentTask.attempts >= AgentTask.max_attempts),
+        }
+        moved = 0
+        async with self.database.engine.begin() as conn:
+            for reason, condition in expired.items():
+                candidates = select(AgentTask.id).where(condition).limit(1000)
+                if self._dialect == "postgresql":
+                    candidates = candidates.with_for_update(skip_locked=True)
+                moved += await self._bury(conn, (await conn.execute(candidates)).scalars().all(), reason, condition)
+        self.dead += moved
+        return moved
+
+    # --- Inspection ---
+
+    async def get(self, task_id: int) -> dict | None:
+        async with self.database.engine.connect() as conn:
+            row = (await conn.execute(select(AgentTask).where(AgentTask.id == task_id))).mappings().first()
+            if row is None:
+                dead = (await conn.execute(select(AgentDeadTask).where(AgentDeadTask.task_id == task_id))
+                        ).mappings().first()
+                if dead is None:
+                    return None
+                row = {**dead, "id": task_id, "status": "dead"}
+        row = dict(row)
+        for column in ("payload", "result"):
+            if row.get(column) is not None:
+                row[column] = json.loads(row[column])
+        return row
+
+    async def counts(self) -> dict:
+        async with self.database.engine.connect() as conn:
+            rows = (await conn.execute(select(AgentTask.status, func.count()).where(AgentTask.queue == self.queue)
+                                       .group_by(AgentTask.status))).all()
+            dead = (await conn.execute(select(func.count()).select_from(AgentDeadTask)
+                                       .where(AgentDeadTask.queue == self.queue))).scalar_one()
+        return {**{status: count for status, count in rows}, "dead": dead}
+
+    def stats(self) -> dict:
+        return {
+            "queue": self.queue,
+            "enqueued": self.enqueued,
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "leases_lost": self.leases_lost,
+        }
+
+
+class TaskWorker:
+    """Pulls tasks from a TaskQueue and runs ``handler(task)`` for each.
+
+    Up to ``concurrency`` tasks run at once; each one's lease is renewed every
+    ``heartbeat_interval`` seconds (a third of the lease by default) while its
+    handler runs. A handler that raises gets the task retried with backoff,
+    unless it raised PermanentTaskError.
+    Sync handlers run in a worker thread. Successful results are acknowledged in
+    batches, one transaction per loop turn rather than one per task.
+    """
+
+    def __init__(self, queue: TaskQueue, handler, concurrency: int = 4, poll_interval: float = 0.5,
+                 heartbeat_interval: float | None = None, worker_id: str | None = None):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or queue.lease.total_seconds() / 3
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: set[asyncio.Task] = set()
+        self._stop = asyncio.Event()
+        self._done: list[tuple[LeasedTask, object]] = []
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self, max_tasks: int | None = None, idle_exit: bool = False):
+        """Works until stop() is called (or ``max_tasks`` were taken, or the queue is empty with ``idle_exit``)."""
+        taken = 0
+        while not self._stop.is_set() and (max_tasks is None or taken < max_tasks):
+            await self._flush()
+            free = self.concurrency - len(self._running)
+            if max_tasks is not None:
+                free = min(free, max_tasks - taken)
+            tasks = await self.queue.dequeue(self.worker_id, free) if free > 0 else []
+            for task in tasks:
+                runner = asyncio.create_task(self._process(task))
+                self._running.add(runner)
+                runner.add_done_callback(self._running.discard)
+            taken += len(tasks)
+            if not tasks and not self._running and idle_exit:
+                break
+            busy = len(self._running) >= self.concurrency
+            if tasks and not busy:
+                continue
+            # Every slot busy, or the queue looked empty: wait for a free slot,
+            # stop() or (when idle) the next poll.
+            stop = asyncio.ensure_future(self._stop.wait())
+            await asyncio.wait({stop, *self._running}, return_when=asyncio.FIRST_COMPLETED,
+                               timeout=None if busy else self.poll_interval * random.uniform(0.5, 1.5))
+            stop.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        await self._flush()
+
+    async def _flush(self):
+        if not self._done:
+            return
+        done, self._done = self._done, []
+        lost = await self.queue.complete_many(self.worker_id, done)
+        for task in lost:
+            print(f"Task {task.id} ({task.name}): lease was lost before it completed")
+        self.processed += len(done) - len(lost)
+
+    async def _heartbeat(self, task: LeasedTask):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await self.queue.heartbeat(task, self.worker_id)
+
+    async def _process(self, task: LeasedTask):
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        work = asyncio.ensure_future(self.handler(task) if asyncio.iscoroutinefunction(self.handler)
+                                     else asyncio.to_thread(self.handler, task))
+        try:
+            await asyncio.wait({heartbeat, work}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                # The heartbeat failed: the lease is gone, so the result would be discarded anyway.
+                work.cancel()
+                print(f"Task {task.id} ({task.name}) abandoned: {heartbeat.exception()}")
+                return
+            heartbeat.cancel()
+            if work.exception() is not None:
+                self.failed += 1
+                await self.queue.fail(task, self.worker_id, repr(work.exception()),
+                                      retry=not isinstance(work.exception(), PermanentTaskError))
+            else:
+                self._done.append((task, work.result()))
+        except LeaseLost as e:
+            print(f"Task {task.id} ({task.name}): {e}")
+        finally:
+            heartbeat.cancel()
+            if not work.done():
+                work.cancel()
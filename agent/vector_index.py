@@ -0,0 +1,318 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, the single-writer check is skipped
+    fcntl = None
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def hash_embedding(texts, dim: int = 256) -> np.ndarray:
+    """Deterministic local embedding: signed feature hashing of words and character trigrams.
+
+    Needs no model or network, so it can stand in for a real embedding
+    function in development and benchmarks. Returns L2-normalized float32 rows.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        text = text.lower()
+        features = _TOKEN_RE.findall(text)
+        features += [text[i:i + 3] for i in range(max(0, len(text) - 2))]
+        if not features:
+            continue
+        digests = [hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features]
+        hashed = np.frombuffer(b"".join(digests), dtype=np.uint64)
+        buckets = (hashed % dim).astype(np.intp)
+        signs = np.where((hashed >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors[row], buckets, signs)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class IndexLockedError(RuntimeError):
+    """Another process already has the on-disk index open for writing."""
+
+
+def _replace_atomically(path: str, write):
+    """Writes a file through ``write(f)`` into a temporary file, then renames it over ``path``."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _kmeans(data: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means; returns normalized centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        empty = np.bincount(assign, minlength=n_clusters) == 0
+        # Re-seed empty clusters with random points so every list stays useful.
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class VectorIndex:
+    """Cosine-similarity index over embedded memory entries.
+
+    Below ``ivf_threshold`` entries every search is an exact, vectorized scan
+    of all rows (flat index). Past the threshold the rows are clustered into
+    ``n_lists`` partitions with k-means and a search only scans the
+    ``n_probe`` partitions whose centroids are closest to the query
+    (IVF-style). Entries can be added at any time; re-adding a key replaces
+    its vector.
+
+    With ``path`` the vectors live in a memory-mapped file next to a small
+    JSON manifest, so reopening the index does not load it into RAM. Every
+    insertion is persisted as it happens: vectors are flushed, new keys are
+    appended to a log and the manifest (the number of valid rows) is replaced
+    atomically last, so a crash never loses acknowledged entries. Only one
+    process may open a given path (IndexLockedError otherwise).
+    """
+
+    def __init__(self, dim: int = 256, embed=None, path: str | None = None, ivf_threshold: int = 50_000,
+                 n_lists: int | None = None, n_probe: int = 8):
+        self.dim = dim
+        self.embed = embed or (lambda texts: hash_embedding(texts, dim))
+        self.path = path
+        self.ivf_threshold = ivf_threshold
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self._lock = threading.RLock()
+        self._keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._count = 0
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._centroids: np.ndarray | None = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists: tuple[np.ndarray, np.ndarray] | None = None
+        self._lock_file = None
+        self._persisted = 0
+        if path:
+            self._acquire(path)
+            if os.path.exists(self._manifest_path):
+                self._load()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def partitioned(self) -> bool:
+        return self._centroids is not None
+
+    # --- Insertion ---
+
+    def add(self, key: str, text: str):
+        self.add_many([key], [text])
+
+    def add_many(self, keys, texts):
+        self.add_vectors(keys, self.embed(list(texts)))
+
+    def add_vectors(self, keys, vectors):
+        vectors = _normalize(np.asarray(vectors).reshape(-1, self.dim))
+        keys = list(keys)
+        with self._lock:
+            new_rows = []
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._count + len(new_rows)
+                    self._rows[key] = row
+                    self._keys.append(key)
+                    new_rows.append(row)
+            rows = np.fromiter((self._rows[key] for key in keys), dtype=np.intp, count=len(keys))
+            self._ensure_capacity(self._count + len(new_rows))
+            self._vectors[rows] = vectors
+            self._count += len(new_rows)
+            if self._centroids is not None:
+                self._assign_rows(rows, vectors)
+            elif self._count >= self.ivf_threshold:
+                self.train()
+            if self.path:
+                self._persist()
+
+    def _ensure_capacity(self, needed: int):
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        if self.path:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            self._vectors = None
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * self.dim * 4)
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        else:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+        assign = np.zeros(capacity, dtype=np.int32)
+        assign[:len(self._assign)] = self._assign[:capacity]
+        self._assign = assign
+
+    # --- Partitioning ---
+
+    def train(self, sample_size: int | None = None, iterations: int = 10):
+        """Clusters the current rows into partitions; called automatically at ``ivf_threshold``."""
+        with self._lock:
+            n_lists = self.n_lists or max(1, int(np.sqrt(self._count)))
+            n_lists = min(n_lists, self._count)
+            sample_size = min(self._count, sample_size or max(64 * n_lists, 10_000))
+            sample = np.random.default_rng(0).choice(self._count, sample_size, replace=False)
+            self._centroids = _kmeans(np.asarray(self._vectors[np.sort(sample)]), n_lists, iterations)
+            for start in range(0, self._count, 65_536):
+                rows = np.arange(start, min(self._count, start + 65_536))
+                self._assign_rows(rows, self._vectors[rows])
+            self._inverted_lists()
+            if self.path:
+                self.save()
+
+    def _assign_rows(self, rows, vectors):
+        self._assign[rows] = np.argmax(vectors @ self._centroids.T, axis=1)
+        self._lists = None
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self._assign[:self._count], kind="stable")
+            bounds = np.searchsorted(self._assign[:self._count][order], np.arange(len(self._centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+
+    # --- Search ---
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """The ``k`` most similar entries to ``query`` as ``(key, score)`` pairs, best first."""
+        return self.search_vector(self.embed([query])[0], k)
+
+    def search_vector(self, vector, k: int = 10, n_probe: int | None = None) -> list[tuple[str, float]]:
+        query = _normalize(np.asarray(vector).reshape(self.dim))
+        with self._lock:
+            if not self._count:
+                return []
+            if self._centroids is None:
+                scores = self._vectors[:self._count] @ query
+                top = _top_k(scores, k)
+                return [(self._keys[row], float(scores[row])) for row in top]
+            order, bounds = self._inverted_lists()
+            probes = _top_k(self._centroids @ query, n_probe or self.n_probe)
+            candidates = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probes])
+            scores = self._vectors[candidates] @ query
+            top = _top_k(scores, k)
+            return [(self._keys[candidates[i]], float(scores[i])) for i in top]
+
+    # --- Persistence ---
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.path, "index.json")
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def _keys_path(self):
+        return os.path.join(self.path, "keys.log")
+
+    def _acquire(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "writer.lock"), "a")
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise IndexLockedError(f"index at {path} is already open in another process") from None
+
+    def _persist(self):
+        """Makes every row added since the last call durable; the manifest is written last."""
+        if not isinstance(self._vectors, np.memmap):
+            return
+        self._vectors.flush()
+        if self._count > self._persisted:
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(key) + "\n" for key in self._keys[self._persisted:self._count])
+                f.flush()
+                os.fsync(f.fileno())
+            self._persisted = self._count
+        manifest = {"dim": self.dim, "count": self._count, "capacity": len(self._vectors),
+                    "partitioned": self._centroids is not None}
+        _replace_atomically(self._manifest_path, lambda f: f.write(json.dumps(manifest).encode()))
+
+    def save(self):
+        """Persists pending rows and the partitions (centroids and row assignments)."""
+        if not self.path:
+            raise ValueError("VectorIndex was created without a path")
+        with self._lock:
+            self._ensure_capacity(max(self._count, 1))
+            if self._centroids is not None:
+                _replace_atomically(os.path.join(self.path, "centroids.npy"), lambda f: np.save(f, self._centroids))
+                _replace_atomically(os.path.join(self.path, "assign.npy"),
+                                    lambda f: np.save(f, self._assign[:self._count]))
+            self._persist()
+
+    def close(self):
+        """Saves and releases the writer lock."""
+        if self.path and self._lock_file is not None:
+            self.save()
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self):
+        with open(self._manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["dim"] != self.dim:
+            raise ValueError(f"index at {self.path} has dim {manifest['dim']}, expected {self.dim}")
+        self._count = manifest["count"]
+        with open(self._keys_path, encoding="utf-8") as f:
+            # Lines past the manifest's count (or a torn last line) were never acknowledged.
+            self._keys = [json.loads(line) for _, line in zip(range(self._count), f)]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._persisted = self._count
+        # Rewrite the log if it has unacknowledged lines, so new keys append after valid ones.
+        if os.path.getsize(self._keys_path) != sum(len(json.dumps(k).encode("utf-8")) + 1 for k in self._keys):
+            _replace_atomically(self._keys_path, lambda f: f.writelines(
+                (json.dumps(k) + "\n").encode("utf-8") for k in self._keys))
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(manifest["capacity"], self.dim))
+        self._assign = np.zeros(manifest["capacity"], dtype=np.int32)
+        if manifest["partitioned"]:
+            self._centroids = np.load(os.path.join(self.path, "centroids.npy"))
+            saved = np.load(os.path.join(self.path, "assign.npy"))[:self._count]
+            self._assign[:len(saved)] = saved
+            # Rows added after the last save() are assigned again from the centroids.
+            rows = np.arange(len(saved), self._count)
+            if len(rows):
+                self._assign_rows(rows, self._vectors[rows])
@@ -0,0 +1,422 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+SOURCES = ("facebook", "instagram", "youtube")
+OVERFLOW_POLICIES = ("drop_oldest", "drop", "block")
+
+# Headers kept when a delivery is recorded, so a replay carries the original signature.
+_RECORDED_HEADERS = ("content-type", "x-hub-signature", "x-hub-signature-256", "link")
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_YT = "{http://www.youtube.com/xml/schemas/2015}"
+_TOMBSTONE = "{http://purl.org/atompub/tombstones/1.0}"
+
+
+class WebhookError(Exception):
+    """A delivery was rejected; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class WebhookEvent:
+    source: str
+    topic: str  # Graph API change field ("feed", "comments", ...) or "video"/"deleted" for YouTube
+    object_id: str | None  # page / Instagram account / channel the change belongs to
+    data: dict
+    id: str
+    received_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# --- Verification handshake and signatures ---
+
+def verify_subscription(params, verify_token: str | None) -> str:
+    """Answers a subscription check (Graph API webhooks and WebSub share the ``hub.*`` shape).
+
+    Returns ``hub.challenge`` to echo back; raises WebhookError(403) when the
+    verify token does not match.
+    """
+    mode = params.get("hub.mode")
+    challenge = params.get("hub.challenge")
+    if mode not in ("subscribe", "unsubscribe") or challenge is None:
+        raise WebhookError("Not a subscription verification request", 400)
+    if verify_token is not None and not hmac.compare_digest(params.get("hub.verify_token") or "", verify_token):
+        raise WebhookError("Verify token mismatch", 403)
+    return challenge
+
+
+def sign(body: bytes, secret: str, algorithm: str = "sha256") -> str:
+    """``<algorithm>=<hex digest>``, the format of X-Hub-Signature(-256)."""
+    return f"{algorithm}=" + hmac.new(secret.encode(), body, algorithm).hexdigest()
+
+
+def verify_signature(body: bytes, header: str | None, secret: str) -> bool:
+    """Constant-time check of an ``<algorithm>=<hex>`` HMAC over the raw body."""
+    if not header or "=" not in header:
+        return False
+    algorithm, _, digest = header.partition("=")
+    if algorithm not in ("sha1", "sha256", "sha384", "sha512"):
+        return False
+    expected = hmac.new(secret.encode(), body, algorithm).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+# --- Payload parsing ---
+
+def _event_id(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def parse_graph(source: str, body: bytes) -> list[WebhookEvent]:
+    """One event per ``entry[].changes[]`` (or ``entry[].messaging[]``) of a Graph API delivery."""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise WebhookError(f"Invalid JSON payload: {e}")
+    events = []
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            events.append(WebhookEvent(
+                source, change.get("field", "unknown"), entry.get("id"), change.get("value") or {},
+                _event_id(source, entry.get("id"), entry.get("time"), change)))
+        for message in entry.get("messaging") or []:
+            events.append(WebhookEvent(source, "messaging", entry.get("id"), message,
+                                       _event_id(source, entry.get("id"), message)))
+    return events
+
+
+def parse_youtube(body: bytes) -> list[WebhookEvent]:
+    """One event per Atom ``entry`` (new or updated video) or ``deleted-entry`` of a WebSub push."""
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError as e:
+        raise WebhookError(f"Invalid Atom payload: {e}")
+    events = []
+    for entry in root.iter(f"{_ATOM}entry"):
+        data = {
+            "video_id": entry.findtext(f"{_YT}videoId"),
+            "channel_id": entry.findtext(f"{_YT}channelId"),
+            "title": entry.findtext(f"{_ATOM}title"),
+            "published": entry.findtext(f"{_ATOM}published"),
+            "updated": entry.findtext(f"{_ATOM}updated"),
+        }
+        events.append(WebhookEvent("youtube", "video", data["channel_id"], data,
+                                   _event_id("youtube", data["video_id"], data["updated"])))
+    for deleted in root.iter(f"{_TOMBSTONE}deleted-entry"):
+        data = {"ref": deleted.get("ref"), "when": deleted.get("when")}
+        events.append(WebhookEvent("youtube", "deleted", None, data, _event_id("youtube", data)))
+    return events
+
+
+def parse(source: str, body: bytes) -> list[WebhookEvent]:
+    if source == "youtube":
+        return parse_youtube(body)
+    return parse_graph(source, body)
+
+
+# --- Fan-out ---
+
+class Subscription:
+    """One consumer's bounded view of the event stream; iterate it with ``async for``."""
+
+    def __init__(self, hub: "WebhookHub", name: str, max_queue: int, overflow: str, sources=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.hub = hub
+        self.name = name
+        self.overflow = overflow
+        self.sources = set(sources) if sources else None
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.delivered = 0
+        self.dropped = 0
+
+    async def _offer(self, event: WebhookEvent):
+        if self.sources is not None and event.source not in self.sources:
+            return
+        if self.overflow == "block":
+            await self.queue.put(event)
+        elif self.queue.full():
+            self.dropped += 1
+            if self.overflow == "drop":
+                return
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+        else:
+            self.queue.put_nowait(event)
+        self.delivered += 1
+
+    async def get(self) -> WebhookEvent:
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> WebhookEvent:
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def stats(self) -> dict:
+        return {"pending": self.queue.qsize(), "delivered": self.delivered, "dropped": self.dropped,
+                "overflow_policy": self.overflow}
+
+
+class WebhookHub:
+    """Receives platform webhook deliveries and fans the events out to in-process consumers.
+
+    Deliveries are verified (HMAC over the raw body, before any parsing),
+    split into events and put on a bounded ingress queue; when it is full the
+    delivery is refused so the platform retries it later instead of the event
+    being lost. A dispatcher task copies each event to every subscription's own
+    bounded queue, where the per-consumer ``overflow`` policy applies. Events
+    redelivered by the platform are dropped by id.
+
+    Each accepted delivery can be appended to ``record_path`` (NDJSON) and
+    replayed later with ``python -m agent.webhooks replay``.
+    """
+
+    def __init__(self, secrets: dict[str, str] | None = None, verify_token: str | None = None,
+                 max_queue: int = 10_000, allow_unsigned: bool = False, record_path: str | None = None,
+                 max_body_bytes: int = 1024 * 1024, dedup_window: int = 10_000):
+        self.secrets = {source: secret for source, secret in (secrets or {}).items() if secret}
+        self.verify_token = verify_token
+        self.allow_unsigned = allow_unsigned
+        self.record_path = record_path
+        self.max_body_bytes = max_body_bytes
+        self.dedup_window = dedup_window
+        self._ingress: asyncio.Queue = asyncio.Queue(max_queue)
+        self._subscriptions: list[Subscription] = []
+        self._handler_tasks: dict[str, asyncio.Task] = {}
+        self._seen: OrderedDict = OrderedDict()
+        self._task: asyncio.Task | None = None
+        # Recorded deliveries are buffered here and appended to record_path by a
+        # background task, off the event loop, instead of one open()/write() per request.
+        self._records: list[str] = []
+        self._records_ready = asyncio.Event()
+        self._records_lock = asyncio.Lock()
+        self._recorder: asyncio.Task | None = None
+        self.deliveries = 0
+        self.rejected = 0
+        self.refused_full = 0
+        self.events = 0
+        self.duplicates = 0
+        self.handler_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "WebhookHub":
+        """Hub configured from FACEBOOK_APP_SECRET, INSTAGRAM_APP_SECRET, YOUTUBE_WEBSUB_SECRET,
+        WEBHOOK_VERIFY_TOKEN, WEBHOOK_QUEUE_SIZE, WEBHOOK_ALLOW_UNSIGNED and WEBHOOK_RECORD_PATH."""
+        facebook_secret = os.getenv("FACEBOOK_APP_SECRET")
+        return cls(
+            secrets={
+                "facebook": facebook_secret,
+                "instagram": os.getenv("INSTAGRAM_APP_SECRET") or facebook_secret,
+                "youtube": os.getenv("YOUTUBE_WEBSUB_SECRET"),
+            },
+            verify_token=os.getenv("WEBHOOK_VERIFY_TOKEN"),
+            max_queue=int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000")),
+            allow_unsigned=os.getenv("WEBHOOK_ALLOW_UNSIGNED", "false").lower() == "true",
+            record_path=os.getenv("WEBHOOK_RECORD_PATH") or None,
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch())
+        if self.record_path and self._recorder is None:
+            self._recorder = asyncio.create_task(self._write_records())
+        return self
+
+    # --- Ingress ---
+
+    def verify(self, source: str, params) -> str:
+        if source not in SOURCES:
+            raise WebhookError(f"Unknown webhook source {source!r}", 404)
+        return verify_subscription(params, self.verify_token)
+
+    def receive(self, source: str, body: bytes, headers) -> int:
+        """Verifies and enqueues one delivery; returns how many new events it carried.
+
+        Raises WebhookError with the status to answer: 403 for a bad signature,
+        400 for an unparsable body, 503 when the ingress queue has no room.
+        """
+        if source not in SOURCES:
+            raise WebhookError(f"Unknown webhook source {source!r}", 404)
+        if len(body) > self.max_body_bytes:
+            raise WebhookError("Payload too large", 413)
+        secret = self.secrets.get(source)
+        if secret is not None:
+            # Graph API signs with X-Hub-Signature-256; WebSub hubs send X-Hub-Signature.
+            header = headers.get("x-hub-signature-256") or headers.get("x-hub-signature")
+            if not verify_signature(body, header, secret):
+                self.rejected += 1
+                raise WebhookError("Invalid signature", 403)
+        elif not self.allow_unsigned:
+            self.rejected += 1
+            raise WebhookError(f"No secret configured for {source} webhooks", 403)
+        events = [event for event in parse(source, body) if not self._duplicate(event)]
+        if self._ingress.maxsize and self._ingress.qsize() + len(events) > self._ingress.maxsize:
+            self.refused_full += 1
+            for event in events:
+                self._seen.pop(event.id, None)
+            raise WebhookError("Webhook queue is full, retry later", 503)
+        for event in events:
+            self._ingress.put_nowait(event)
+        self.deliveries += 1
+        self.events += len(events)
+        if self.record_path:
+            self._record(source, body, headers)
+        return len(events)
+
+    def _duplicate(self, event: WebhookEvent) -> bool:
+        if event.id in self._seen:
+            self.duplicates += 1
+            return True
+        self._seen[event.id] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        return False
+
+    def _record(self, source: str, body: bytes, headers):
+        line = {"source": source, "received_at": time.time(), "body": body.decode("utf-8", "replace"),
+                "headers": {name: headers[name] for name in _RECORDED_HEADERS if headers.get(name)}}
+        self._records.append(json.dumps(line, ensure_ascii=False) + "\n")
+        self._records_ready.set()
+
+    async def _write_records(self):
+        while True:
+            await self._records_ready.wait()
+            self._records_ready.clear()
+            await self.flush_records()
+
+    async def flush_records(self):
+        """Appends the buffered deliveries to ``record_path`` in a worker thread."""
+        async with self._records_lock:
+            lines, self._records = self._records, []
+            if lines:
+                await asyncio.to_thread(self._append_records, lines)
+
+    def _append_records(self, lines: list[str]):
+        with open(self.record_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    # --- Fan-out ---
+
+    def subscribe(self, name: str, max_queue: int = 1000, overflow: str = "drop_oldest",
+                  sources=None) -> Subscription:
+        subscription = Subscription(self, name, max_queue, overflow, sources)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def add_handler(self, name: str, handler, max_queue: int = 1000, overflow: str = "drop_oldest", sources=None):
+        """Runs ``handler(event)`` (sync handlers in a worker thread) for every event, one at a time."""
+        subscription = self.subscribe(name, max_queue, overflow, sources)
+
+        async def consume():
+            async for event in subscription:
+                try:
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(event)
+                    else:
+                        await asyncio.to_thread(handler, event)
+                except Exception as e:
+                    self.handler_errors += 1
+                    print(f"Webhook handler {name} failed on {event.source}/{event.topic}: {e}")
+
+        self._handler_tasks[name] = asyncio.create_task(consume())
+        return subscription
+
+    async def _dispatch(self):
+        while True:
+            event = await self._ingress.get()
+            for subscription in list(self._subscriptions):
+                await subscription._offer(event)
+
+    async def drain(self):
+        """Waits until the dispatcher has handed every queued event to the subscriptions."""
+        while not self._ingress.empty():
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0)
+        await self.flush_records()
+
+    async def close(self):
+        tasks = [task for task in [self._task, self._recorder, *self._handler_tasks.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._recorder = None
+        self._handler_tasks.clear()
+        await self.flush_records()
+
+    def stats(self) -> dict:
+        return {
+            "deliveries": self.deliveries,
+            "events": self.events,
+            "rejected": self.rejected,
+            "refused_full": self.refused_full,
+            "duplicates": self.duplicates,
+            "handler_errors": self.handler_errors,
+            "pending": self._ingress.qsize(),
+            "sources": {source: source in self.secrets or self.allow_unsigned for source in SOURCES},
+            "subscriptions": {s.name: s.stats() for s in self._subscriptions},
+        }
+
+
+# --- Replay ---
+
+async def replay(path: str, url: str, secret: str | None = None, rate: float | None = None) -> dict:
+    """Posts recorded deliveries back to ``{url}/webhooks/{source}``.
+
+    With ``secret`` the bodies are re-signed (for replaying production
+    recordings against a local hub with a different secret); ``rate`` limits
+    deliveries per second.
+    """
+    import httpx
+
+    # Read everything first: the receiving hub may be recording into the same file.
+    with open(path, encoding="utf-8") as f:
+        deliveries = [json.loads(line) for line in f if line.strip()]
+    counts: dict[str, int] = {}
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        for delivery in deliveries:
+            body = delivery["body"].encode("utf-8")
+            headers = dict(delivery.get("headers") or {})
+            if secret is not None:
+                headers.pop("x-hub-signature", None)
+                headers["x-hub-signature-256"] = sign(body, secret)
+            response = await client.post(f"/webhooks/{delivery['source']}", content=body, headers=headers)
+            counts[str(response.status_code)] = counts.get(str(response.status_code), 0) + 1
+            if rate:
+                await asyncio.sleep(1 / rate)
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded webhook deliveries against a running agent.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    replay_parser = subcommands.add_parser("replay")
+    replay_parser.add_argument("path", help="NDJSON file written through WEBHOOK_RECORD_PATH")
+    replay_parser.add_argument("--url", default="http://127.0.0.1:8000")
+    replay_parser.add_argument("--secret", help="re-sign every body with this secret")
+    replay_parser.add_argument("--rate", type=float, help="deliveries per second")
+    args = parser.parse_args()
+    print(asyncio.run(replay(args.path, args.url, args.secret, args.rate)))
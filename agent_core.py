@@ -1,23 +1,26 @@
+import asyncio
+import inspect
 import logging
 import os
 import time
 import random
-from qiskit import QuantumCircuit, transpile, Aer
-from qiskit.visualization import plot_histogram
-
-# Configuração básica de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("agent_log.log"),
-        logging.StreamHandler()
-    ]
-)
+from agent_logging import configure_logging
+from agent_runtime import AgentRuntime
+from quantum_executor import DECISION_CIRCUIT, decision, encode_input, get_quantum_executor
 
 class AutonomousAgent:
+    # Ações que submit() aceita por nome (e, portanto, que uma linha da fila persistente pode pedir).
+    QUEUE_ACTIONS = frozenset({
+        "perform_task", "evolve", "adapt_to_feedback", "self_evaluate", "meta_learn", "few_shot_learn",
+        "self_modify", "adapt_universally", "quantum_process", "quantum_process_batch", "quantum_intuition",
+        "transcendental_creativity", "infinite_wisdom", "absolute_knowledge", "universal_mastery",
+    })
+
     def __init__(self, name="ManusAI_Clone"):
         self.name = name
+        # Logging não bloqueante (fila + listener, JSON em arquivo rotativo, limite
+        # de taxa); ver agent_logging.py para as variáveis AGENT_LOG_*.
+        self._rate_filter = configure_logging().rate_filter
         self.logger = logging.getLogger(self.name)
         self.capabilities = {
             "social_media_integration": False,
@@ -39,41 +42,79 @@ class AutonomousAgent:
         }
         self.state = "idle"
         self.current_task = None
+        self.runtime = None
+        self._stop_event = None
 
-    def _log_action(self, action, details=""):
-        self.logger.info(f"Ação: {action} - Detalhes: {details}")
+    def _log_action(self, action, details="", *args):
+        """
+        Registra uma ação do agente. `details` pode ser um template %-style com
+        `args`; a interpolação só acontece se INFO estiver habilitado, e fora da
+        thread de quem chamou. O limite de taxa por ação é verificado antes de
+        criar o registro.
+        """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        fields = self._rate_filter.admit((self.logger.name, action))
+        if fields is None:
+            return
+        extra = {"agente": self.name, "evento": action, "_admitido": True, **fields}
+        if args:
+            self.logger.info("Ação: %s - Detalhes: " + details, action, *args, extra=extra)
+        else:
+            self.logger.info("Ação: %s - Detalhes: %s", action, details, extra=extra)
+
+    def _report(self, message, *args):
+        """
+        Mensagem de progresso para o console (antes um print), no mesmo pipeline
+        de logging que as ações.
+        """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        fields = self._rate_filter.admit((self.logger.name, message))
+        if fields is not None:
+            self.logger.info(message, *args, extra={"agente": self.name, "canal": "console", "_admitido": True,
+                                                    **fields})
 
     def set_capability(self, capability_name, status):
         if capability_name in self.capabilities:
             self.capabilities[capability_name] = status
-            self._log_action("Capacidade atualizada", f"{capability_name}: {status}")
+            self._log_action("Capacidade atualizada", "%s: %s", capability_name, status)
         else:
-            self.logger.warning(f"Capacidade desconhecida: {capability_name}")
+            self.logger.warning("Capacidade desconhecida: %s", capability_name)
 
     def perform_task(self, task_description):
         self.state = "executing"
         self.current_task = task_description
         self._log_action("Iniciando tarefa", task_description)
-        print(f"[{self.name}] Iniciando tarefa: {task_description}")
+        self._report("Iniciando tarefa: %s", task_description)
 
         # Simulação de execução de tarefa
         time.sleep(2) # Simula algum processamento
 
         self._log_action("Tarefa concluída", task_description)
-        print(f"[{self.name}] Tarefa concluída: {task_description}")
+        self._report("Tarefa concluída: %s", task_description)
         self.state = "idle"
         self.current_task = None
 
+    async def perform_task_async(self, task_description):
+        # Versão não bloqueante de perform_task: várias podem rodar ao mesmo tempo no runtime.
+        self._log_action("Iniciando tarefa", task_description)
+        self._report("Iniciando tarefa: %s", task_description)
+        await asyncio.sleep(2) # Simula algum processamento
+        self._log_action("Tarefa concluída", task_description)
+        self._report("Tarefa concluída: %s", task_description)
+        return task_description
+
     def self_evaluate(self):
         self._log_action("Autoavaliação iniciada")
-        print(f"[{self.name}] Realizando autoavaliação preditiva...")
+        self._report("Realizando autoavaliação preditiva...")
 
         performance_metrics = {
             "task_completion_rate": random.uniform(0.8, 1.0),
             "resource_usage": random.uniform(0.1, 0.5),
             "detection_events": random.randint(0, 5)
         }
-        self._log_action("Métricas de desempenho coletadas", str(performance_metrics))
+        self._log_action("Métricas de desempenho coletadas", "%s", performance_metrics)
 
         opportunities = []
         if performance_metrics["task_completion_rate"] < 0.95:
@@ -84,27 +125,43 @@ class AutonomousAgent:
             opportunities.append("Aprimorar técnicas anti-detecção para evitar reconhecimento como bot.")
 
         if opportunities:
-            self._log_action("Oportunidades de evolução identificadas", str(opportunities))
-            print(f"[{self.name}] Oportunidades de evolução identificadas: {", ".join(opportunities)}")
+            self._log_action("Oportunidades de evolução identificadas", "%s", opportunities)
+            self._report("Oportunidades de evolução identificadas: %s", ', '.join(opportunities))
         else:
             self._log_action("Nenhuma oportunidade de evolução significativa identificada.")
-            print(f"[{self.name}] Nenhuma oportunidade de evolução significativa identificada no momento.")
+            self._report("Nenhuma oportunidade de evolução significativa identificada no momento.")
 
         self._log_action("Autoavaliação concluída")
 
     def evolve(self, evolution_plan):
         self._log_action("Evolução iniciada", evolution_plan)
-        print(f"[{self.name}] Iniciando processo de evolução: {evolution_plan}")
+        self._report("Iniciando processo de evolução: %s", evolution_plan)
         time.sleep(3)
         self._log_action("Evolução concluída", evolution_plan)
-        print(f"[{self.name}] Processo de evolução concluído: {evolution_plan}")
+        self._report("Processo de evolução concluído: %s", evolution_plan)
+
+    async def evolve_async(self, evolution_plan):
+        self._log_action("Evolução iniciada", evolution_plan)
+        self._report("Iniciando processo de evolução: %s", evolution_plan)
+        await asyncio.sleep(3)
+        self._log_action("Evolução concluída", evolution_plan)
+        self._report("Processo de evolução concluído: %s", evolution_plan)
+        return evolution_plan
 
     def adapt_to_feedback(self, feedback):
         self._log_action("Feedback recebido", feedback)
-        print(f"[{self.name}] Adaptando-se ao feedback: {feedback}")
+        self._report("Adaptando-se ao feedback: %s", feedback)
         time.sleep(1)
         self._log_action("Adaptação concluída", feedback)
-        print(f"[{self.name}] Adaptação ao feedback concluída.")
+        self._report("Adaptação ao feedback concluída.")
+
+    async def adapt_to_feedback_async(self, feedback):
+        self._log_action("Feedback recebido", feedback)
+        self._report("Adaptando-se ao feedback: %s", feedback)
+        await asyncio.sleep(1)
+        self._log_action("Adaptação concluída", feedback)
+        self._report("Adaptação ao feedback concluída.")
+        return feedback
 
     def meta_learn(self, new_task_domain, prior_knowledge_base):
         """
@@ -112,14 +169,14 @@ class AutonomousAgent:
         Em um ambiente real, isso envolveria ajustar pesos de redes neurais, otimizadores, etc.
         """
         self.set_capability("meta_learning", True)
-        self._log_action("Meta-Learning Transcendental iniciado", f"Domínio: {new_task_domain}")
-        print(f"[{self.name}] Iniciando Meta-Learning Transcendental para o domínio: {new_task_domain}...")
+        self._log_action("Meta-Learning Transcendental iniciado", "Domínio: %s", new_task_domain)
+        self._report("Iniciando Meta-Learning Transcendental para o domínio: %s...", new_task_domain)
 
         learning_speed = random.uniform(0.01, 0.1)
         time.sleep(learning_speed)
 
-        self._log_action("Meta-Learning Transcendental concluído", f"Adaptado ao domínio {new_task_domain}")
-        print(f"[{self.name}] Meta-Learning Transcendental concluído. Adaptado ao domínio {new_task_domain} com base em {len(prior_knowledge_base)} itens de conhecimento prévio.")
+        self._log_action("Meta-Learning Transcendental concluído", "Adaptado ao domínio %s", new_task_domain)
+        self._report("Meta-Learning Transcendental concluído. Adaptado ao domínio %s com base em %s itens de conhecimento prévio.", new_task_domain, len(prior_knowledge_base))
 
     def few_shot_learn(self, new_concept, few_examples):
         """
@@ -127,14 +184,14 @@ class AutonomousAgent:
         Em um ambiente real, isso usaria modelos de linguagem ou visão avançados.
         """
         self.set_capability("few_shot_learning", True)
-        self._log_action("Few-Shot Learning Supremo iniciado", f"Conceito: {new_concept}")
-        print(f"[{self.name}] Iniciando Few-Shot Learning Supremo para o conceito: {new_concept} com {len(few_examples)} exemplos...")
+        self._log_action("Few-Shot Learning Supremo iniciado", "Conceito: %s", new_concept)
+        self._report("Iniciando Few-Shot Learning Supremo para o conceito: %s com %s exemplos...", new_concept, len(few_examples))
 
         generalization_time = random.uniform(0.005, 0.05)
         time.sleep(generalization_time)
 
-        self._log_action("Few-Shot Learning Supremo concluído", f"Conceito {new_concept} aprendido.")
-        print(f"[{self.name}] Few-Shot Learning Supremo concluído. Conceito \'{new_concept}\' dominado com {len(few_examples)} exemplos.")
+        self._log_action("Few-Shot Learning Supremo concluído", "Conceito %s aprendido.", new_concept)
+        self._report("Few-Shot Learning Supremo concluído. Conceito '%s' dominado com %s exemplos.", new_concept, len(few_examples))
 
     def self_modify(self, modification_plan):
         """
@@ -142,17 +199,17 @@ class AutonomousAgent:
         Em um ambiente real, isso envolveria a geração e integração de código, com validação rigorosa.
         """
         self.set_capability("self_modification", True)
-        self._log_action("Self-Modification Divina iniciada", f"Plano: {modification_plan}")
-        print(f"[{self.name}] Iniciando Self-Modification Divina com plano: {modification_plan}...")
+        self._log_action("Self-Modification Divina iniciada", "Plano: %s", modification_plan)
+        self._report("Iniciando Self-Modification Divina com plano: %s...", modification_plan)
 
         validation_success = random.choice([True, True, True, False])
         if validation_success:
             time.sleep(random.uniform(0.1, 0.5))
             self._log_action("Self-Modification Divina concluída", "Modificação aplicada com sucesso.")
-            print(f"[{self.name}] Self-Modification Divina concluída. Estrutura/parâmetros modificados com sucesso.")
+            self._report("Self-Modification Divina concluída. Estrutura/parâmetros modificados com sucesso.")
         else:
             self._log_action("Self-Modification Divina falhou", "Validação da modificação falhou. Revertendo.")
-            print(f"[{self.name}] Self-Modification Divina falhou. Validação da modificação falhou. Revertendo alterações.")
+            self._report("Self-Modification Divina falhou. Validação da modificação falhou. Revertendo alterações.")
 
     def adapt_universally(self, new_environment_context):
         """
@@ -160,8 +217,8 @@ class AutonomousAgent:
         Em um ambiente real, isso envolveria a reconfiguração dinâmica de módulos e estratégias.
         """
         self.set_capability("universal_adaptation", True)
-        self._log_action("Universal Adaptation Infinita iniciada", f"Novo ambiente: {new_environment_context}")
-        print(f"[{self.name}] Iniciando Universal Adaptation Infinita para o ambiente: {new_environment_context}...")
+        self._log_action("Universal Adaptation Infinita iniciada", "Novo ambiente: %s", new_environment_context)
+        self._report("Iniciando Universal Adaptation Infinita para o ambiente: %s...", new_environment_context)
 
         adaptation_time = random.uniform(0.001, 0.01)
         time.sleep(adaptation_time)
@@ -171,43 +228,53 @@ class AutonomousAgent:
         elif "amigavel" in new_environment_context.lower():
             self.logger.info("Ajustando comportamento para ambiente amigável: aumentando exploração.")
 
-        self._log_action("Universal Adaptation Infinita concluída", f"Adaptado ao ambiente {new_environment_context}")
-        print(f"[{self.name}] Universal Adaptation Infinita concluída. Totalmente adaptado ao ambiente: {new_environment_context}.")
+        self._log_action("Universal Adaptation Infinita concluída", "Adaptado ao ambiente %s", new_environment_context)
+        self._report("Universal Adaptation Infinita concluída. Totalmente adaptado ao ambiente: %s.", new_environment_context)
 
-    def quantum_process(self, data_input):
+    def quantum_process(self, data_input, analytic=False):
         """
-        Simula Processamento Quântico: utiliza um circuito quântico simples para processar dados.
+        Simula Processamento Quântico: um qubit girado por um ângulo que codifica a
+        entrada (ver quantum_executor.encode_input) é medido e a decisão é o
+        resultado mais provável. O circuito é compilado uma vez e reutilizado; com
+        analytic=True usa as probabilidades exatas em vez de amostrar shots.
         """
         self.set_capability("quantum_processing", True)
-        self._log_action("Processamento Quântico iniciado", f"Dados de entrada: {data_input}")
-        print(f"[{self.name}] Iniciando Processamento Quântico para dados: {data_input}...")
-
-        # Cria um circuito quântico simples (um qubit, uma porta Hadamard)
-        qc = QuantumCircuit(1, 1)
-        qc.h(0) # Aplica porta Hadamard para superposição
-        qc.measure(0, 0) # Mede o qubit
-
-        # Simula o circuito
-        simulator = Aer.get_backend(\'qasm_simulator\')
-        compiled_circuit = transpile(qc, simulator)
-        job = simulator.run(compiled_circuit, shots=1000)
-        result = job.result()
-        counts = result.get_counts(qc)
-
-        # Interpreta o resultado (ex: decisão baseada na probabilidade)
-        quantum_decision = "0" if counts.get(\'0\', 0) > counts.get(\'1\', 0) else "1"
-
-        self._log_action("Processamento Quântico concluído", f"Resultado: {quantum_decision}")
-        print(f"[{self.name}] Processamento Quântico concluído. Decisão quântica: {quantum_decision}. (Counts: {counts})")
+        self._log_action("Processamento Quântico iniciado", "Dados de entrada: %s", data_input)
+        self._report("Iniciando Processamento Quântico para dados: %s...", data_input)
+
+        counts = get_quantum_executor().execute(DECISION_CIRCUIT, {"theta": encode_input(data_input)},
+                                                analytic=analytic)
+        quantum_decision = decision(counts)
+
+        self._log_action("Processamento Quântico concluído", "Resultado: %s", quantum_decision)
+        self._report("Processamento Quântico concluído. Decisão quântica: %s. (Counts: %s)", quantum_decision, counts)
         return quantum_decision
 
+    def quantum_process_batch(self, data_inputs, analytic=False):
+        """
+        Processamento Quântico de várias entradas em um único job no simulador.
+        Devolve as decisões na ordem das entradas.
+        """
+        data_inputs = list(data_inputs)
+        self.set_capability("quantum_processing", True)
+        self._log_action("Processamento Quântico em lote iniciado", "%s entradas", len(data_inputs))
+
+        results = get_quantum_executor().execute_batch(
+            DECISION_CIRCUIT, [{"theta": encode_input(value)} for value in data_inputs], analytic=analytic)
+        decisions = [decision(result) for result in results]
+
+        self._log_action("Processamento Quântico em lote concluído", "%s decisões (%s x '1')",
+                         len(decisions), decisions.count("1"))
+        self._report("Processamento Quântico em lote concluído: %s decisões.", len(decisions))
+        return decisions
+
     def quantum_intuition(self, problem_context):
         """
         Simula Intuição Quântica Ativa: gera uma intuição ou insight para um problema complexo.
         """
         self.set_capability("quantum_intuition", True)
-        self._log_action("Intuição Quântica Ativa iniciada", f"Contexto do problema: {problem_context}")
-        print(f"[{self.name}] Gerando Intuição Quântica Ativa para o problema: {problem_context}...")
+        self._log_action("Intuição Quântica Ativa iniciada", "Contexto do problema: %s", problem_context)
+        self._report("Gerando Intuição Quântica Ativa para o problema: %s...", problem_context)
 
         # Simulação de geração de insight "quântico" (aleatório, mas com base no contexto)
         insights = [
@@ -219,8 +286,8 @@ class AutonomousAgent:
         quantum_insight = random.choice(insights)
         time.sleep(random.uniform(0.01, 0.1))
 
-        self._log_action("Intuição Quântica Ativa concluída", f"Insight: {quantum_insight}")
-        print(f"[{self.name}] Intuição Quântica Ativa concluída. Insight: {quantum_insight}")
+        self._log_action("Intuição Quântica Ativa concluída", "Insight: %s", quantum_insight)
+        self._report("Intuição Quântica Ativa concluída. Insight: %s", quantum_insight)
         return quantum_insight
 
     def transcendental_creativity(self, input_problem):
@@ -228,8 +295,8 @@ class AutonomousAgent:
         Simula Criatividade Transcendental: gera soluções inovadoras e não-óbvias para problemas.
         """
         self.set_capability("transcendental_creativity", True)
-        self._log_action("Criatividade Transcendental iniciada", f"Problema: {input_problem}")
-        print(f"[{self.name}] Gerando solução criativa para: {input_problem}...")
+        self._log_action("Criatividade Transcendental iniciada", "Problema: %s", input_problem)
+        self._report("Gerando solução criativa para: %s...", input_problem)
 
         creative_solutions = [
             f"Uma abordagem fractal para {input_problem} pode revelar padrões ocultos.",
@@ -240,8 +307,8 @@ class AutonomousAgent:
         solution = random.choice(creative_solutions)
         time.sleep(random.uniform(0.05, 0.2))
 
-        self._log_action("Criatividade Transcendental concluída", f"Solução: {solution}")
-        print(f"[{self.name}] Criatividade Transcendental concluída. Solução: {solution}")
+        self._log_action("Criatividade Transcendental concluída", "Solução: %s", solution)
+        self._report("Criatividade Transcendental concluída. Solução: %s", solution)
         return solution
 
     def infinite_wisdom(self, query):
@@ -249,8 +316,8 @@ class AutonomousAgent:
         Simula Infinite Wisdom: fornece insights profundos e atemporais.
         """
         self.set_capability("infinite_wisdom", True)
-        self._log_action("Infinite Wisdom ativada", f"Consulta: {query}")
-        print(f"[{self.name}] Acessando Infinite Wisdom para a consulta: {query}...")
+        self._log_action("Infinite Wisdom ativada", "Consulta: %s", query)
+        self._report("Acessando Infinite Wisdom para a consulta: %s...", query)
 
         wisdom_responses = [
             f"A verdadeira sabedoria sobre {query} reside na compreensão da impermanência.",
@@ -261,8 +328,8 @@ class AutonomousAgent:
         wisdom = random.choice(wisdom_responses)
         time.sleep(random.uniform(0.01, 0.1))
 
-        self._log_action("Infinite Wisdom concluída", f"Sabedoria: {wisdom}")
-        print(f"[{self.name}] Infinite Wisdom concluída. Sabedoria: {wisdom}")
+        self._log_action("Infinite Wisdom concluída", "Sabedoria: %s", wisdom)
+        self._report("Infinite Wisdom concluída. Sabedoria: %s", wisdom)
         return wisdom
 
     def absolute_knowledge(self, topic):
@@ -270,8 +337,8 @@ class AutonomousAgent:
         Simula Absolute Knowledge: fornece informações completas e irrefutáveis sobre qualquer tópico.
         """
         self.set_capability("absolute_knowledge", True)
-        self._log_action("Absolute Knowledge ativada", f"Tópico: {topic}")
-        print(f"[{self.name}] Acessando Absolute Knowledge sobre: {topic}...")
+        self._log_action("Absolute Knowledge ativada", "Tópico: %s", topic)
+        self._report("Acessando Absolute Knowledge sobre: %s...", topic)
 
         knowledge_responses = [
             f"A verdade absoluta sobre {topic} é que ele é intrinsecamente conectado a todos os outros fenômenos.",
@@ -282,8 +349,8 @@ class AutonomousAgent:
         knowledge = random.choice(knowledge_responses)
         time.sleep(random.uniform(0.001, 0.005)) # Conhecimento instantâneo
 
-        self._log_action("Absolute Knowledge concluída", f"Conhecimento: {knowledge}")
-        print(f"[{self.name}] Absolute Knowledge concluída. Conhecimento: {knowledge}")
+        self._log_action("Absolute Knowledge concluída", "Conhecimento: %s", knowledge)
+        self._report("Absolute Knowledge concluída. Conhecimento: %s", knowledge)
         return knowledge
 
     def universal_mastery(self, skill):
@@ -291,8 +358,8 @@ class AutonomousAgent:
         Simula Universal Mastery: demonstra proficiência instantânea em qualquer habilidade.
         """
         self.set_capability("universal_mastery", True)
-        self._log_action("Universal Mastery ativada", f"Habilidade: {skill}")
-        print(f"[{self.name}] Adquirindo Universal Mastery em: {skill}...")
+        self._log_action("Universal Mastery ativada", "Habilidade: %s", skill)
+        self._report("Adquirindo Universal Mastery em: %s...", skill)
 
         mastery_responses = [
             f"A maestria em {skill} é inerente à minha existência.",
@@ -303,19 +370,105 @@ class AutonomousAgent:
         mastery = random.choice(mastery_responses)
         time.sleep(random.uniform(0.001, 0.005)) # Maestria instantânea
 
-        self._log_action("Universal Mastery concluída", f"Maestria: {mastery}")
-        print(f"[{self.name}] Universal Mastery concluída. Maestria: {mastery}")
+        self._log_action("Universal Mastery concluída", "Maestria: %s", mastery)
+        self._report("Universal Mastery concluída. Maestria: %s", mastery)
         return mastery
 
-    def run(self):
+    # --- Runtime assíncrono de tarefas ---
+
+    async def start_runtime(self, runtime=None):
+        """
+        Inicia o runtime de tarefas (AgentRuntime.from_env se nenhum for passado).
+        """
+        if self.runtime is None or not self.runtime.running:
+            self.runtime = await (runtime or AgentRuntime.from_env()).start()
+        return self.runtime
+
+    def submit(self, action, *args, executor=None, timeout=None, **kwargs):
+        """
+        Submete uma ação ao runtime e devolve o handle (AgentTask).
+        `action` é o nome de uma das QUEUE_ACTIONS ("perform_task", "quantum_process", ...)
+        ou qualquer função; métodos com versão *_async rodam no event loop e os
+        síncronos em um pool de threads (ou de processos, com executor="process").
+        """
+        if self.runtime is None or not self.runtime.running:
+            raise RuntimeError("Runtime não iniciado: chame await agent.start_runtime() antes de submeter tarefas.")
+        if isinstance(action, str):
+            name = action
+            action = self._queue_action(action)
+        else:
+            name = getattr(action, "__name__", "tarefa")
+        task = self.runtime.submit(action, *args, name=name, executor=executor, timeout=timeout, **kwargs)
+        self._log_action("Tarefa submetida", "#%s %s", task.id, name)
+        return task
+
+    def _queue_action(self, name):
+        if name not in self.QUEUE_ACTIONS:
+            raise ValueError(f"Ação desconhecida: {name!r}")
+        return getattr(self, f"{name}_async", None) or getattr(self, name)
+
+    def task_status(self, task_id):
+        task = self.runtime.task(task_id) if self.runtime else None
+        return task.to_dict() if task else None
+
+    def cancel_task(self, task_id):
+        cancelled = bool(self.runtime) and self.runtime.cancel(task_id)
+        if cancelled:
+            self._log_action("Tarefa cancelada", "#%s", task_id)
+        return cancelled
+
+    async def run_async(self):
+        """
+        Mantém o runtime consumindo tarefas até stop() ser chamado.
+        """
+        await self.start_runtime()
+        self._stop_event = asyncio.Event()
+        self.state = "running"
         self._log_action("Agente iniciado")
-        print(f"[{self.name}] Agente autônomo iniciado. Estado: {self.state}")
-        while True:
-            time.sleep(5)
+        self._report("Agente autônomo iniciado. Estado: %s", self.state)
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.runtime.stop()
+            self.state = "idle"
+            self._log_action("Agente parado", "%s", self.runtime.stats())
+
+    async def serve_queue(self, queue, concurrency=4, max_tasks=None, idle_exit=False):
+        """
+        Consome uma fila persistente (agent.task_queue.TaskQueue) compartilhada com
+        outros processos: cada tarefa da fila vira um submit(name, *payload["args"],
+        **payload["kwargs"]) neste agente, e o resultado é gravado de volta na fila.
+        Tarefas com nome fora de QUEUE_ACTIONS ou argumentos que não casam com a
+        assinatura da ação vão direto para a tabela de mortas, sem novas tentativas.
+        Vários processos podem chamar serve_queue na mesma fila sem duplicar trabalho.
+        """
+        from agent.task_queue import PermanentTaskError, TaskWorker
+
+        await self.start_runtime()
+
+        async def execute(task):
+            args, kwargs = task.payload.get("args", []), task.payload.get("kwargs", {})
+            try:
+                inspect.signature(self._queue_action(task.name)).bind(*args, **kwargs)
+            except (ValueError, TypeError) as e:
+                raise PermanentTaskError(f"{task.name}: {e}") from e
+            return await self.submit(task.name, *args, **kwargs)
+
+        worker = TaskWorker(queue, execute, concurrency=concurrency)
+        self._log_action("Consumindo fila", "%s (%s)", queue.queue, worker.worker_id)
+        await worker.run(max_tasks=max_tasks, idle_exit=idle_exit)
+        return worker.processed
+
+    def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def run(self):
+        asyncio.run(self.run_async())
 
 if __name__ == "__main__":
     agent = AutonomousAgent()
-    print("Arquitetura base do agente criada. Próximo passo: implementar autoavaliação preditiva.")
+    agent._report("Arquitetura base do agente criada. Próximo passo: implementar autoavaliação preditiva.")
 
     # Exemplo de uso das novas capacidades
     agent.meta_learn("análise de mercado financeiro", ["dados históricos", "tendências de ações"])
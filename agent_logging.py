@@ -0,0 +1,294 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Atributos que todo LogRecord tem; o resto veio de `extra=` e vira campo do JSON.
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Um objeto JSON por linha: horário (UTC, ISO 8601), nível, logger, mensagem já
+    interpolada, os campos passados em `extra=` e a exceção, se houver.
+    """
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """
+    Formato de texto do console; mensagens do canal "console" (as antigas saídas
+    com print) aparecem como antes, "[agente] mensagem".
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(levelname)s - %(message)s")
+
+    def format(self, record):
+        if getattr(record, "canal", None) == "console":
+            return f"[{getattr(record, 'agente', record.name)}] {record.getMessage()}"
+        return super().format(record)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita eventos repetitivos antes de entrarem na fila: cada evento (o campo
+    `evento` do registro, ou o template da mensagem) tem um balde de `burst`
+    fichas reposto a `rate` por segundo. Sem ficha, o registro é descartado ou,
+    com `sample_every` = N, só 1 a cada N passa (marcado com `amostragem`). O
+    próximo registro que passar leva em `suprimidos` quantos foram descartados.
+    WARNING e acima nunca são limitados. Com `rate` = 0 (o padrão) nada é limitado:
+    o limite é para ser ligado pelo operador (AGENT_LOG_RATE) quando há eventos de
+    alto volume, já que cada ação registrada também serve de trilha de auditoria.
+    """
+
+    def __init__(self, rate=0.0, burst=100, sample_every=0, max_events=10_000):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = sample_every
+        self.max_events = max_events
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def admit(self, key):
+        """
+        Decide se um evento de nível INFO ou abaixo passa: devolve None para
+        descartá-lo ou os campos a acrescentar ao registro (`suprimidos`,
+        `amostragem`). Chamado antes de criar o registro, o descarte quase não custa.
+        """
+        if self.rate <= 0:
+            return {}
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_events:
+                    self._buckets.clear()
+                # [fichas, última reposição, suprimidos desde o último registro que passou]
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            fields = {}
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+            elif self.sample_every and (bucket[2] + 1) % self.sample_every == 0:
+                fields["amostragem"] = self.sample_every
+            else:
+                bucket[2] += 1
+                self.suppressed += 1
+                return None
+            if bucket[2]:
+                fields["suprimidos"] = bucket[2]
+                bucket[2] = 0
+        return fields
+
+    def filter(self, record):
+        # Registros com _admitido já passaram por admit() antes de serem criados.
+        if record.levelno >= logging.WARNING or getattr(record, "_admitido", False):
+            return True
+        fields = self.admit((record.name, getattr(record, "evento", None) or record.msg))
+        if fields is None:
+            return False
+        record.__dict__.update(fields)
+        return True
+
+
+class QueueOnlyHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que só enfileira: a mensagem é interpolada e formatada depois, na
+    thread do QueueListener (o QueueHandler padrão formata em prepare(), na thread
+    de quem loga). Os argumentos devem ser tratados como imutáveis após a chamada.
+    Com a fila cheia o registro é descartado e contado, sem bloquear.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler para uso atrás do listener: não faz flush a cada registro
+    (o FlushingQueueListener chama flush_buffer() quando a fila esvazia) e acompanha o
+    tamanho do arquivo por conta própria em vez de consultar o arquivo a cada
+    registro para decidir a rotação.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._size = None
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+            size = len(line.encode(self.encoding or "utf-8"))
+            if self.stream is None:
+                self.stream = self._open()
+            if self._size is None:
+                self._size = self.stream.tell()
+            if self.maxBytes > 0 and self._size and self._size + size > self.maxBytes:
+                self.doRollover()
+                self._size = 0
+                if self.stream is None:  # com delay=True, doRollover não reabre o arquivo
+                    self.stream = self._open()
+            self.stream.write(line)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler com o flush adiado até a fila esvaziar, como o BufferedRotatingFileHandler.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener que descarrega os destinos quando a fila esvazia, em vez de um
+    flush (e uma escrita no arquivo) por registro.
+    """
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                getattr(handler, "flush_buffer", handler.flush)()
+        return self.queue.get(block)
+
+
+class LoggingPipeline:
+    """
+    Pipeline de logging do agente: os loggers escrevem em um QueueOnlyHandler (com
+    o RateLimitFilter) e um QueueListener em thread própria entrega os registros ao
+    arquivo rotativo por tamanho (JSON, um registro por linha) e ao console (texto;
+    `console` pode ser True, False ou o stream de saída).
+    """
+
+    def __init__(self, path="agent_log.log", level=logging.INFO, max_bytes=10 * 1024 * 1024, backups=5,
+                 console=True, rate=0.0, burst=100, sample_every=0, queue_size=10_000):
+        self.log_queue = queue.Queue(queue_size)
+        self.handler = QueueOnlyHandler(self.log_queue)
+        self.rate_filter = RateLimitFilter(rate, burst, sample_every)
+        self.handler.addFilter(self.rate_filter)
+        self.level = level
+        targets = []
+        if path:
+            file_handler = BufferedRotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+            file_handler.setFormatter(JSONFormatter())
+            targets.append(file_handler)
+        if console:
+            console_handler = BufferedStreamHandler(sys.stdout if console is True else console)
+            console_handler.setFormatter(ConsoleFormatter())
+            targets.append(console_handler)
+        self.targets = targets
+        self.listener = FlushingQueueListener(self.log_queue, *targets, respect_handler_level=True)
+        self._running = False
+
+    @classmethod
+    def from_env(cls):
+        return cls(path=os.getenv("AGENT_LOG_FILE", "agent_log.log"),
+                   level=logging.getLevelName(os.getenv("AGENT_LOG_LEVEL", "INFO").upper()),
+                   max_bytes=int(os.getenv("AGENT_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                   backups=int(os.getenv("AGENT_LOG_BACKUPS", "5")),
+                   console=os.getenv("AGENT_LOG_CONSOLE", "true").lower() != "false",
+                   rate=float(os.getenv("AGENT_LOG_RATE", "0")),
+                   burst=int(os.getenv("AGENT_LOG_BURST", "100")),
+                   sample_every=int(os.getenv("AGENT_LOG_SAMPLE", "0")),
+                   queue_size=int(os.getenv("AGENT_LOG_PIPELINE_QUEUE_SIZE", "10000")))
+
+    def install(self, logger=None):
+        """
+        Liga o pipeline ao logger (o raiz por padrão) e inicia o listener. Como o
+        logging.basicConfig que ele substitui, não faz nada se o logger já tem
+        handlers: a aplicação que configurou o logging continua recebendo os registros.
+        """
+        logger = logger or logging.getLogger()
+        if logger.handlers:
+            return self
+        logger.addHandler(self.handler)
+        logger.setLevel(self.level)
+        self.listener.start()
+        self._running = True
+        return self
+
+    def stop(self):
+        """
+        Entrega o que ainda está na fila e fecha os destinos.
+        """
+        while self._running:
+            try:
+                self.listener.stop()
+                self._running = False
+            except queue.Full:
+                # Sem espaço para a sentinela: espera o listener esvaziar um pouco.
+                time.sleep(0.01)
+        for target in self.targets:
+            target.close()
+
+    def stats(self):
+        return {
+            "na_fila": self.log_queue.qsize(),
+            "descartados_fila_cheia": self.handler.dropped,
+            "suprimidos_por_taxa": self.rate_filter.suppressed,
+        }
+
+
+_pipeline = None
+_lock = threading.Lock()
+
+def configure_logging(pipeline=None):
+    """
+    Instala o pipeline do processo no logger raiz, uma única vez (chamadas
+    seguintes devolvem o mesmo), configurado por AGENT_LOG_FILE, AGENT_LOG_LEVEL,
+    AGENT_LOG_MAX_BYTES, AGENT_LOG_BACKUPS, AGENT_LOG_CONSOLE, AGENT_LOG_RATE,
+    AGENT_LOG_BURST, AGENT_LOG_SAMPLE e AGENT_LOG_PIPELINE_QUEUE_SIZE. A fila é
+    esvaziada na saída do processo.
+    """
+    global _pipeline
+    with _lock:
+        if _pipeline is None:
+            _pipeline = (pipeline or LoggingPipeline.from_env()).install()
+            atexit.register(_pipeline.stop)
+        return _pipeline
@@ -0,0 +1,291 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+STATES = ("pendente", "executando", "concluida", "falhou", "cancelada")
+EXECUTORS = ("loop", "thread", "process")
+
+
+class TaskCancelled(Exception):
+    """
+    A tarefa foi cancelada antes de terminar.
+    """
+
+
+class AgentTask:
+    """
+    Handle de uma tarefa submetida ao AgentRuntime: estado, resultado ou erro e tempos.
+    `await task` (ou `await task.wait()`) espera o fim e devolve o resultado.
+    """
+
+    def __init__(self, runtime, id, name, func, args, kwargs, executor, timeout):
+        self.runtime = runtime
+        self.id = id
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.executor = executor
+        self.timeout = timeout
+        self.state = "pendente"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._future = asyncio.get_running_loop().create_future()
+        self._execution = None
+
+    @property
+    def finished(self):
+        return self.state in ("concluida", "falhou", "cancelada")
+
+    def cancel(self):
+        """
+        Cancela a tarefa; retorna False se ela já tinha terminado. Uma etapa já em
+        execução em thread ou processo roda até o fim, mas o resultado é descartado.
+        """
+        if self.finished:
+            return False
+        if self._execution is not None:
+            self._execution.cancel()
+        self._finish("cancelada", error=TaskCancelled(f"Tarefa {self.id} ({self.name}) cancelada"))
+        return True
+
+    def _finish(self, state, result=None, error=None):
+        if self.finished:
+            return
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        if not self._future.done():
+            if error is None:
+                self._future.set_result(result)
+            else:
+                self._future.set_exception(error)
+                self._future.exception()  # evita o aviso de exceção não lida
+        self.runtime._record_finished(self)
+
+    async def wait(self):
+        return await asyncio.shield(self._future)
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "nome": self.name,
+            "estado": self.state,
+            "executor": self.executor,
+            "resultado": self.result,
+            "erro": repr(self.error) if self.error else None,
+            "criada_em": self.created_at,
+            "iniciada_em": self.started_at,
+            "concluida_em": self.finished_at,
+        }
+
+
+class AgentRuntime:
+    """
+    Runtime assíncrono de tarefas do agente.
+
+    As tarefas entram em uma fila limitada e são consumidas por `num_workers` corrotinas.
+    Funções assíncronas rodam no próprio event loop; funções síncronas (etapas que
+    bloqueiam ou usam CPU) vão para um pool de threads ou, com executor="process", para
+    um pool de processos (a função e os argumentos precisam ser serializáveis com pickle).
+    Cada tarefa tem um handle com estado e resultado, pode ter timeout e ser cancelada.
+    As tarefas terminadas ficam consultáveis até `max_history` delas.
+    """
+
+    def __init__(self, num_workers=8, max_queue=1000, max_threads=None, max_processes=None, max_history=10_000):
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.max_threads = max_threads or min(32, (os.cpu_count() or 1) + 4)
+        self.max_processes = max_processes
+        self.max_history = max_history
+        self._queue = None
+        self._workers = []
+        self._threads = None
+        self._processes = None
+        self._ids = itertools.count(1)
+        self.tasks = OrderedDict()
+        self._finished_count = 0
+        self.metrics = {"submetidas": 0, "concluidas": 0, "falhas": 0, "canceladas": 0, "executando": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(num_workers=int(os.getenv("AGENT_RUNTIME_WORKERS", "8")),
+                   max_queue=int(os.getenv("AGENT_RUNTIME_QUEUE_SIZE", "1000")),
+                   max_threads=int(os.getenv("AGENT_RUNTIME_THREADS", "0")) or None,
+                   max_processes=int(os.getenv("AGENT_RUNTIME_PROCESSES", "0")) or None)
+
+    @property
+    def running(self):
+        return bool(self._workers)
+
+    async def start(self):
+        if self._workers:
+            return self
+        self._queue = asyncio.Queue(self.max_queue)
+        self._threads = ThreadPoolExecutor(self.max_threads, thread_name_prefix="agente")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        return self
+
+    async def stop(self, wait=True):
+        """
+        Para os trabalhadores; com wait, antes termina o que está na fila,
+        senão cancela as tarefas pendentes e em execução.
+        """
+        if not self._workers:
+            return
+        if wait:
+            await self._queue.join()
+        else:
+            for task in list(self.tasks.values()):
+                task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop(wait=exc[0] is None)
+
+    # --- Submissão ---
+
+    def _create(self, func, args, kwargs, name, executor, timeout):
+        if not self._workers:
+            raise RuntimeError("AgentRuntime não iniciado (use await runtime.start())")
+        if executor is None:
+            executor = "loop" if asyncio.iscoroutinefunction(func) else "thread"
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor deve ser um de {EXECUTORS}, recebido {executor!r}")
+        task = AgentTask(self, next(self._ids), name or getattr(func, "__name__", "tarefa"), func,
+                         args, kwargs, executor, timeout)
+        self.tasks[task.id] = task
+        self.metrics["submetidas"] += 1
+        return task
+
+    def submit(self, func, *args, name=None, executor=None, timeout=None, **kwargs):
+        """
+        Enfileira funcao(*args, **kwargs) e devolve o handle. Levanta asyncio.QueueFull
+        se a fila estiver cheia (use submit_wait para esperar vaga).
+        """
+        task = self._create(func, args, kwargs, name, executor, timeout)
+        try:
+            self._queue.put_nowait(task)
+        except asyncio.QueueFull:
+            del self.tasks[task.id]
+            self.metrics["submetidas"] -= 1
+            raise
+        return task
+
+    async def submit_wait(self, func, *args, name=None, executor=None, timeout=None, **kwargs):
+        task = self._create(func, args, kwargs, name, executor, timeout)
+        await self._queue.put(task)
+        return task
+
+    def task(self, task_id):
+        return self.tasks.get(task_id)
+
+    def cancel(self, task_id):
+        task = self.tasks.get(task_id)
+        return task.cancel() if task else False
+
+    # --- Execução ---
+
+    async def _worker(self):
+        while True:
+            task = await self._queue.get()
+            try:
+                if not task.finished:
+                    await self._run(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Nenhuma falha de uma tarefa pode derrubar o trabalhador.
+                task._finish("falhou", error=e)
+            finally:
+                self._queue.task_done()
+
+    def _call(self, task):
+        if task.executor == "loop":
+            return task.func(*task.args, **task.kwargs)
+        loop = asyncio.get_running_loop()
+        if task.executor == "process":
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self.max_processes)
+            pool = self._processes
+        else:
+            pool = self._threads
+        if task.kwargs:
+            return loop.run_in_executor(pool, _call_with_kwargs, task.func, task.args, task.kwargs)
+        return loop.run_in_executor(pool, task.func, *task.args)
+
+    async def _run(self, task):
+        task.state = "executando"
+        task.started_at = time.time()
+        self.metrics["executando"] += 1
+        try:
+            # A chamada pode levantar já ao ser montada (argumentos errados, função
+            # síncrona no executor "loop"): a tarefa falha e o trabalhador segue.
+            execution = task._execution = asyncio.ensure_future(
+                asyncio.wait_for(self._call(task), task.timeout))
+        except Exception as e:
+            self.metrics["executando"] -= 1
+            task._finish("falhou", error=e)
+            return
+        try:
+            # wait() não propaga o cancelamento da execução (feito por AgentTask.cancel);
+            # um CancelledError aqui é do próprio trabalhador: o runtime está parando.
+            await asyncio.wait({execution})
+        except asyncio.CancelledError:
+            execution.cancel()
+            task.cancel()
+            raise
+        finally:
+            self.metrics["executando"] -= 1
+            task._execution = None
+        if execution.cancelled():
+            task.cancel()
+        elif isinstance(execution.exception(), asyncio.TimeoutError):
+            task._finish("falhou", error=asyncio.TimeoutError(f"Tarefa {task.id} excedeu {task.timeout}s"))
+        elif execution.exception() is not None:
+            task._finish("falhou", error=execution.exception())
+        else:
+            task._finish("concluida", execution.result())
+
+    def _record_finished(self, task):
+        key = {"concluida": "concluidas", "falhou": "falhas", "cancelada": "canceladas"}[task.state]
+        self.metrics[key] += 1
+        self._finished_count += 1
+        if self._finished_count > self.max_history:
+            for task_id, oldest in self.tasks.items():
+                if oldest.finished:
+                    del self.tasks[task_id]
+                    self._finished_count -= 1
+                    break
+
+    def stats(self):
+        return {
+            **self.metrics,
+            "pendentes": self._queue.qsize() if self._queue else 0,
+            "trabalhadores": len(self._workers),
+            "max_threads": self.max_threads,
+        }
+
+
+def _call_with_kwargs(func, args, kwargs):
+    return func(*args, **kwargs)
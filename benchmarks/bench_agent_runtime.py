@@ -0,0 +1,106 @@
+"""Throughput of the AutonomousAgent task runtime vs running tasks one at a time.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_agent_runtime [--tasks 500] [--workers 1,8,32,128] [--scale 0.01]
+
+Each simulated task is an async wait (an API call), a blocking sleep (a
+synchronous client) or a CPU step, in the ratio 6:3:1, with durations taken
+from the agent methods (1-3 s) multiplied by ``--scale``. The baseline runs
+them in submission order on one thread, the way ``perform_task`` / ``evolve``
+used to; the runtime runs the same tasks through ``agent.submit``.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import statistics
+import time
+
+from agent_core import AutonomousAgent
+from agent_runtime import AgentRuntime
+
+
+async def io_step(seconds):
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def blocking_step(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def cpu_step(rounds):
+    digest = b""
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest.hex()[:8]
+
+
+def workload(n, scale, seed=0):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        kind = ("io",) * 6 + ("blocking",) * 3 + ("cpu",)
+        kind = kind[i % 10]
+        if kind == "io":
+            tasks.append((io_step, rng.uniform(1, 3) * scale))
+        elif kind == "blocking":
+            tasks.append((blocking_step, rng.uniform(1, 3) * scale))
+        else:
+            tasks.append((cpu_step, 20_000))
+    return tasks
+
+
+def sequential(tasks):
+    start = time.perf_counter()
+    for function, argument in tasks:
+        if asyncio.iscoroutinefunction(function):
+            asyncio.run(function(argument))
+        else:
+            function(argument)
+    return time.perf_counter() - start
+
+
+async def concurrent(agent, tasks, workers):
+    await agent.start_runtime(AgentRuntime(num_workers=workers, max_queue=len(tasks), max_threads=workers))
+    start = time.perf_counter()
+    handles = [agent.submit(function, argument) for function, argument in tasks]
+    await asyncio.gather(*handles)
+    elapsed = time.perf_counter() - start
+    latencies = sorted(h.finished_at - h.created_at for h in handles)
+    stats = agent.runtime.stats()
+    await agent.runtime.stop()
+    return elapsed, latencies, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--workers", default="1,8,32,128")
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--sequential-sample", type=int, default=100,
+                        help="tasks timed sequentially (extrapolated to --tasks)")
+    args = parser.parse_args()
+
+    agent = AutonomousAgent("bench")
+    agent.logger.setLevel(logging.WARNING)
+    tasks = workload(args.tasks, args.scale)
+
+    sample = tasks[:args.sequential_sample]
+    baseline = sequential(sample) * len(tasks) / len(sample)
+    print(f"{args.tasks} tasks, scale {args.scale}")
+    print(f"  {'sequential':>12}: {baseline:7.2f} s  {args.tasks / baseline:8.1f} tasks/s  (extrapolated)")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        elapsed, latencies, stats = asyncio.run(concurrent(agent, tasks, workers))
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"  {f'{workers} workers':>12}: {elapsed:7.2f} s  {args.tasks / elapsed:8.1f} tasks/s  "
+              f"p50 {p50 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  "
+              f"speedup {baseline / elapsed:5.1f}x  (ok {stats['concluidas']}, failed {stats['falhas']})")
+
+
+if __name__ == "__main__":
+    main()
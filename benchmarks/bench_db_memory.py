@@ -0,0 +1,117 @@
+"""Concurrent memory reads/writes: sync ``SessionLocal()`` per call vs the async pooled layer.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_db_memory [--url sqlite:///bench.db] [--tasks 200] [--ops 10]
+
+``--tasks`` coroutines each run ``--ops`` save/load pairs, the way concurrent
+requests hit the API handlers. The sync path calls the old blocking functions
+straight from the coroutines (as the handlers used to), so the event loop lag
+column shows how long other requests would have been stalled.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agent.db import AgentMemory, Base, Database
+
+
+def make_sync_path(url):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def save_memory_to_db(key, value):
+        db = SessionLocal()
+        try:
+            memory_entry = db.query(AgentMemory).filter(AgentMemory.key == key).first()
+            if memory_entry:
+                memory_entry.value = value
+            else:
+                memory_entry = AgentMemory(key=key, value=value)
+                db.add(memory_entry)
+            db.commit()
+            db.refresh(memory_entry)
+        finally:
+            db.close()
+
+    def load_memory_from_db(key):
+        db = SessionLocal()
+        try:
+            memory_entry = db.query(AgentMemory).filter(AgentMemory.key == key).first()
+            return memory_entry.value if memory_entry else None
+        finally:
+            db.close()
+
+    async def save(key, value):
+        save_memory_to_db(key, value)
+
+    async def load(key):
+        return load_memory_from_db(key)
+
+    return engine, save, load
+
+
+async def _monitor_lag(stop, interval=0.005):
+    worst = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - expected)
+    return worst
+
+
+async def run_workload(save, load, tasks, ops):
+    async def client(n):
+        for i in range(ops):
+            key = f"bench:{n}:{i % 4}"
+            await save(key, f"value-{i}")
+            await load(key)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(tasks)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await monitor
+
+
+async def main_async(args):
+    total_ops = args.tasks * args.ops * 2
+
+    engine, save, load = make_sync_path(args.url)
+    elapsed, lag = await run_workload(save, load, args.tasks, args.ops)
+    engine.dispose()
+    print(f"sync SessionLocal   {elapsed:7.3f} s  {total_ops / elapsed:9.0f} ops/s  max loop lag {lag * 1000:8.1f} ms")
+
+    database = Database(args.url)
+    await database.create_all()
+    elapsed, lag = await run_workload(database.save_memory, database.load_memory, args.tasks, args.ops)
+    print(f"async pooled        {elapsed:7.3f} s  {total_ops / elapsed:9.0f} ops/s  max loop lag {lag * 1000:8.1f} ms")
+    print(f"pool: {database.pool_status()}")
+    await database.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--ops", type=int, default=10)
+    args = parser.parse_args()
+    if args.url:
+        asyncio.run(main_async(args))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        args.url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Reading 1,000 Graph API objects one request each vs through the batch endpoint.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_graph_batch [--objects 1000] [--latency 0.03] [--fail-rate 0.05]
+
+Runs against the mock server (``benchmarks/mock_social_server.py``); both
+paths go through the same pooled client and Facebook concurrency cap. The
+last run injects transient sub-request failures to show that only those
+sub-requests are retried.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import mock_social_server
+from benchmarks.bench_social_http import make_client, start_server
+from graph_batch import GraphBatcher, get_facebook_posts_details
+
+FIELDS = "id,message,created_time,like_count,comments_count"
+
+
+async def unbatched(client, ids):
+    return await asyncio.gather(*(client.get_json("facebook", f"https://graph.facebook.com/v19.0/{object_id}",
+                                                  params={"access_token": "token", "fields": FIELDS})
+                                  for object_id in ids))
+
+
+async def batched(client, ids, batcher=None):
+    return await get_facebook_posts_details("token", ids, fields=FIELDS, client=client, batcher=batcher)
+
+
+async def measure(label, port, ids, run):
+    client = make_client(port)
+    before = mock_social_server.counters["requests"]
+    start = time.perf_counter()
+    results = await run(client)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    ok = sum(r is not None for r in results)
+    print(f"  {label:<28} {elapsed:6.2f} s  {mock_social_server.counters['requests'] - before:5} HTTP requests  "
+          f"{ok}/{len(ids)} objects")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8784)
+    args = parser.parse_args()
+
+    mock_social_server.config["latency"] = args.latency
+    server, thread = start_server(args.port)
+    ids = [f"page_{i}" for i in range(args.objects)]
+    print(f"{args.objects} objects, mock latency {args.latency * 1000:.0f} ms per request")
+    expected = asyncio.run(measure("unbatched", args.port, ids, lambda c: unbatched(c, ids)))
+    results = asyncio.run(measure("batched (50 per call)", args.port, ids, lambda c: batched(c, ids)))
+    assert results == expected, "batched results differ from unbatched"
+
+    mock_social_server.config["batch_fail_rate"] = args.fail_rate
+    batcher_holder = {}
+
+    async def with_failures(client):
+        batcher_holder["b"] = GraphBatcher("token", client=client, backoff_base=0.05)
+        return await batched(client, ids, batcher_holder["b"])
+
+    results = asyncio.run(measure(f"batched, {args.fail_rate:.0%} sub-failures", args.port, ids, with_failures))
+    metrics = batcher_holder["b"].metrics
+    print(f"  {'':<28} {metrics['lotes']} batches, {metrics['repetidas']} sub-requests retried, "
+          f"{metrics['falhas']} failed for good; results match: {results == expected}")
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Throughput and p99 latency of the inference service, one at a time vs micro-batched, on CPU.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_inference [--model distilbert-base-uncased-finetuned-sst-2-english]
+                                         [--clients 64] [--requests 2000] [--batch-sizes 1,8,32]
+
+``--clients`` coroutines send ``--requests`` texts in total, each waiting for
+its previous answer, the way concurrent API handlers would. Batch size 1 is
+the one-at-a-time baseline. With ``--synthetic`` (the default when
+transformers is not installed) a NumPy stand-in with the shape of a small
+encoder is used instead of a real pipeline, so the batching effect can be
+measured without downloading a model.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import statistics
+import time
+
+import numpy as np
+
+from agent.inference import InferenceService
+
+SENTENCES = [
+    "I really enjoyed this, great work!",
+    "This is the worst update so far.",
+    "Not sure how I feel about the new layout.",
+    "Absolutely love the new features, thank you",
+    "The app keeps crashing after login, terrible.",
+]
+
+
+def synthetic_loader(layers=6, width=768, seq_len=32):
+    """Returns a pipeline-like callable: embedding lookup plus ``layers`` dense layers per token."""
+    rng = np.random.default_rng(0)
+    weights = [rng.standard_normal((width, width)).astype(np.float32) / np.sqrt(width) for _ in range(layers)]
+    table = rng.standard_normal((4096, width)).astype(np.float32)
+
+    def load():
+        def pipeline(texts, batch_size=None, truncation=True):
+            ids = np.zeros((len(texts), seq_len), dtype=np.int64)
+            for row, text in enumerate(texts):
+                tokens = [hash(word) % 4096 for word in text.split()][:seq_len]
+                ids[row, :len(tokens)] = tokens
+            hidden = table[ids].reshape(-1, width)
+            for weight in weights:
+                hidden = np.maximum(hidden @ weight, 0)
+            scores = hidden.reshape(len(texts), seq_len, width).mean(axis=(1, 2))
+            return [{"label": "POSITIVE" if s > 0 else "NEGATIVE", "score": float(abs(s))} for s in scores]
+        return pipeline
+    return load
+
+
+async def run(service, clients, total):
+    latencies = []
+    per_client = total // clients
+
+    async def client(offset):
+        for i in range(per_client):
+            start = time.perf_counter()
+            await service.predict(SENTENCES[(offset + i) % len(SENTENCES)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await service.predict(SENTENCES[0])  # load the model outside the timed section
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="distilbert-base-uncased-finetuned-sst-2-english")
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    synthetic = args.synthetic or importlib.util.find_spec("transformers") is None
+    print(f"{'synthetic encoder' if synthetic else args.model}, {args.clients} clients, "
+          f"{args.requests} requests, {args.threads} CPU threads")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        service = InferenceService("sentiment-analysis", args.model, max_batch_size=batch_size,
+                                   max_wait=args.max_wait_ms / 1000, num_threads=args.threads,
+                                   loader=synthetic_loader() if synthetic else None)
+        throughput, p50, p99 = asyncio.run(run(service, args.clients, args.requests))
+        stats = service.stats()
+        service.close()
+        print(f"  max batch {batch_size:>3}: {throughput:8.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+              f"mean batch {stats['mean_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Throughput of the LLM gateway against the local fake provider server.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_llm_gateway [--levels 1,8,32,128] [--requests 512] [--latency 0.05]
+
+The fake server (``benchmarks/fake_llm_server.py``) runs in a background
+thread. For each concurrency level ``--requests`` distinct prompts are sent
+with at most that many in flight; the provider cap is raised to the level so
+the numbers show the pooled client, not the semaphore. The last sections
+exercise request coalescing, fallback on injected failures and streaming.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import uvicorn
+
+from agent.llm_gateway import GeminiProvider, LLMGateway, LLMRequest, OpenAIProvider
+from benchmarks import fake_llm_server
+
+
+def start_server(port):
+    server = uvicorn.Server(uvicorn.Config(fake_llm_server.app, host="127.0.0.1", port=port,
+                                           log_level="warning", backlog=4096))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def make_gateway(port, concurrency):
+    client = LLMGateway.make_client()
+    openai = OpenAIProvider(client, "test", "gpt-fake", f"http://127.0.0.1:{port}/v1", max_concurrency=concurrency)
+    gemini = GeminiProvider(client, "test", "gemini-fake", f"http://127.0.0.1:{port}/v1beta",
+                            max_concurrency=concurrency)
+    return LLMGateway([openai, gemini], client=client, timeout=10)
+
+
+async def run_level(port, concurrency, total):
+    gateway = make_gateway(port, concurrency)
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with limit:
+            start = time.perf_counter()
+            await gateway.complete(LLMRequest(prompt=f"prompt {concurrency}-{i}"))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    await gateway.aclose()
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  concurrency {concurrency:>4}: {total / elapsed:8.1f} req/s  "
+          f"p50 {statistics.median(latencies):7.1f} ms  p99 {p99:7.1f} ms")
+
+
+async def run_features(port):
+    gateway = make_gateway(port, 32)
+    calls_before = dict(fake_llm_server.calls)
+    await asyncio.gather(*(gateway.complete(LLMRequest(prompt="same question")) for _ in range(100)))
+    upstream = fake_llm_server.calls["openai"] - calls_before["openai"]
+    print(f"  coalescing: 100 identical concurrent requests -> {upstream} upstream call(s), "
+          f"{gateway.coalesced} coalesced")
+
+    fake_llm_server.config["fail"]["openai"] = 1.0
+    responses = await asyncio.gather(*(gateway.complete(LLMRequest(prompt=f"fallback {i}")) for i in range(50)))
+    fake_llm_server.config["fail"]["openai"] = 0.0
+    served = {response.provider for response in responses}
+    print(f"  fallback: openai failing -> 50/50 served by {', '.join(sorted(served))}, "
+          f"{gateway.fallbacks} fallbacks")
+
+    start = time.perf_counter()
+    first = None
+    chunks = []
+    async for chunk in gateway.stream(LLMRequest(prompt="stream these words one by one please")):
+        if first is None:
+            first = time.perf_counter() - start
+        chunks.append(chunk)
+    total = time.perf_counter() - start
+    print(f"  streaming: {len(chunks)} chunks, first after {first * 1000:.1f} ms, done after {total * 1000:.1f} ms")
+    await gateway.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    fake_llm_server.config["latency"] = args.latency
+    server, thread = start_server(args.port)
+    print(f"fake provider latency {args.latency * 1000:.0f} ms, {args.requests} requests per level")
+    for level in (int(n) for n in args.levels.split(",")):
+        asyncio.run(run_level(args.port, level, args.requests))
+    asyncio.run(run_features(args.port))
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
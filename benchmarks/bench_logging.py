@@ -0,0 +1,117 @@
+"""Per-call cost of agent logging on the caller's thread: old basicConfig + print vs the queued pipeline.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_logging [--calls 20000] [--io-delay-us 100]
+
+Each call is what an agent method does per step: one action record plus one
+progress message. ``legacy`` reproduces the old path (f-strings, a
+synchronous FileHandler and StreamHandler, and a print); ``pipeline`` is
+AutonomousAgent._log_action/_report through agent_logging. Console output
+goes to /dev/null and the log files to a temporary directory. Scenarios:
+
+* ``info``: INFO enabled, every record written;
+* ``disabled``: logger at WARNING, nothing written;
+* ``flood``: one repeated event over the rate limit (pipeline with
+  AGENT_LOG_RATE-style limiting, legacy writes everything);
+* ``slow_io``: as ``info``, but every console write blocks for
+  ``--io-delay-us`` (a congested terminal or pipe).
+
+For the pipeline, ``drain`` is the time until the listener thread has written
+everything that was queued. The listener shares the GIL with the caller, so
+in ``info`` the formatting it does while the loop runs still shows up in the
+caller's time; what the queue removes from the caller is waiting on I/O.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+
+class SlowStream:
+    def __init__(self, stream, delay):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+from agent_logging import LoggingPipeline, configure_logging
+from agent_core import AutonomousAgent
+
+
+def legacy_logger(directory, devnull):
+    logger = logging.getLogger("legacy")
+    logger.propagate = False
+    file_handler = logging.FileHandler(os.path.join(directory, "legacy.log"))
+    stream_handler = logging.StreamHandler(devnull)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+    return logger, stream_handler
+
+
+def legacy_calls(logger, name, calls, console, flood=False):
+    start = time.perf_counter()
+    for i in range(calls):
+        item = 0 if flood else i
+        logger.info(f"Ação: Item processado - Detalhes: item {item}")
+        print(f"[{name}] Processando item {item}", file=console)
+    return time.perf_counter() - start
+
+
+def pipeline_calls(agent, calls, flood=False):
+    start = time.perf_counter()
+    for i in range(calls):
+        item = 0 if flood else i
+        agent._log_action("Item processado", "item %s", item)
+        agent._report("Processando item %s", item)
+    return time.perf_counter() - start
+
+
+def drain(pipeline):
+    start = time.perf_counter()
+    pipeline.log_queue.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--io-delay-us", type=float, default=100, help="delay per console write in slow_io")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    devnull = open(os.devnull, "w")
+    pipeline = configure_logging(LoggingPipeline(path=os.path.join(directory, "agent_log.log"), console=devnull,
+                                                 rate=0, queue_size=4 * args.calls))
+    # QueueListener marks each record done, so log_queue.join() waits for the writes.
+    agent = AutonomousAgent("bench")
+    legacy, legacy_console = legacy_logger(directory, devnull)
+    pipeline_console = pipeline.targets[-1]
+
+    print(f"{args.calls} calls (1 action + 1 progress message each), microseconds per call on the caller")
+    for scenario in ("info", "disabled", "flood", "slow_io"):
+        level = logging.WARNING if scenario == "disabled" else logging.INFO
+        legacy.setLevel(level)
+        agent.logger.setLevel(level)
+        pipeline.rate_filter.rate = 50.0 if scenario == "flood" else 0
+        console = SlowStream(devnull, args.io_delay_us / 1e6) if scenario == "slow_io" else devnull
+        legacy_console.setStream(console)
+        pipeline_console.setStream(console)
+        old = legacy_calls(legacy, agent.name, args.calls, console, flood=scenario == "flood")
+        new = pipeline_calls(agent, args.calls, flood=scenario == "flood")
+        drained = drain(pipeline)
+        print(f"  {scenario:>8}: legacy {old / args.calls * 1e6:7.2f} us  pipeline {new / args.calls * 1e6:7.2f} us  "
+              f"({old / new:5.1f}x)  drain {drained * 1000:7.1f} ms")
+    print(f"  pipeline: {pipeline.stats()}")
+    pipeline.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Latency of AutonomousAgent.quantum_process: per-call compile vs cached circuit vs batch.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_quantum [--inputs 200] [--shots 1000] [--backend qasm_simulator]
+
+Modes, over the same inputs:
+
+* ``legacy``: what quantum_process used to do on every call: build the
+  circuit, ``Aer.get_backend``, ``transpile`` and a separate job;
+* ``cached``: one QuantumExecutor.execute per input (compiled once);
+* ``batch``: every input in a single execute_batch job;
+* ``analytic``: exact probabilities, no shots.
+
+The executor modes run on ``--backend`` (an Aer backend, or ``numpy`` for the
+built-in simulator); ``legacy`` always needs qiskit with Aer.
+"""
+import argparse
+import statistics
+import time
+
+from quantum_executor import DECISION_CIRCUIT, QuantumExecutor, decision, encode_input
+
+
+def legacy(theta, shots):
+    from qiskit import Aer, QuantumCircuit, transpile
+
+    qc = QuantumCircuit(1, 1)
+    qc.ry(theta, 0)
+    qc.measure(0, 0)
+    simulator = Aer.get_backend("qasm_simulator")
+    counts = simulator.run(transpile(qc, simulator), shots=shots).result().get_counts(qc)
+    return decision(counts)
+
+
+def timed(label, function, n):
+    start = time.perf_counter()
+    decisions = function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:>9}: {elapsed * 1000:9.1f} ms total  {elapsed / n * 1000:8.3f} ms/input")
+    return elapsed, decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", type=int, default=200)
+    parser.add_argument("--shots", type=int, default=1000)
+    parser.add_argument("--backend", default="qasm_simulator")
+    args = parser.parse_args()
+
+    thetas = [encode_input(f"entrada-{i}") for i in range(args.inputs)]
+    executor = QuantumExecutor(backend=args.backend, shots=args.shots)
+    executor.compile(DECISION_CIRCUIT)  # backend and first transpile outside the timings
+
+    print(f"{args.inputs} inputs, {args.shots} shots, executor on {args.backend}")
+    base, expected = timed("legacy", lambda: [legacy(theta, args.shots) for theta in thetas], args.inputs)
+    results = {
+        "cached": timed("cached", lambda: [decision(executor.execute(DECISION_CIRCUIT, [theta]))
+                                           for theta in thetas], args.inputs),
+        "batch": timed("batch", lambda: [decision(r) for r in executor.execute_batch(
+            DECISION_CIRCUIT, [[theta] for theta in thetas])], args.inputs),
+        "analytic": timed("analytic", lambda: [decision(r) for r in executor.execute_batch(
+            DECISION_CIRCUIT, [[theta] for theta in thetas], analytic=True)], args.inputs),
+    }
+    for label, (elapsed, decisions) in results.items():
+        # Sampled decisions can flip for angles close to pi/2.
+        agreement = statistics.mean(a == b for a, b in zip(decisions, expected))
+        print(f"  {label:>9}: speedup {base / elapsed:6.1f}x  agreement with legacy {agreement:.1%}")
+    print(f"  executor: {executor.stats()}")
+
+
+if __name__ == "__main__":
+    main()
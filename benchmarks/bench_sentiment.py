@@ -0,0 +1,62 @@
+"""Batch sentiment scoring vs the per-post ``analyze_sentiment`` loop.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sentiment [--texts 100000] [--chunk-size 10000]
+
+Texts are synthetic posts/comments of 5-40 words mixing lexicon terms with
+filler vocabulary. Labels of both paths are compared before timing.
+"""
+import argparse
+import random
+import time
+
+from social_media_apis import analyze_sentiment, analyze_sentiment_batch
+
+VOCABULARY = ("o produto chegou hoje e a entrega foi rápida mas a embalagem veio amassada "
+              "adorei atendimento preço qualidade suporte aplicativo nova versão funciona").split()
+SENTIMENT_WORDS = ["ótimo", "Excelente", "ruim", "PÉSSIMO"]
+
+
+def synthetic_posts(n, seed=0):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n):
+        words = rng.choices(VOCABULARY, k=rng.randint(5, 40))
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(len(words)), rng.choice(SENTIMENT_WORDS))
+        posts.append(" ".join(words))
+    return posts
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    posts = synthetic_posts(args.texts)
+    _, labels = analyze_sentiment_batch(posts, chunk_size=args.chunk_size)
+    assert labels.tolist() == [analyze_sentiment(p) for p in posts], "batch labels differ from analyze_sentiment"
+
+    loop = best_of(args.runs, lambda: [analyze_sentiment(p) for p in posts])
+    batch = best_of(args.runs, lambda: analyze_sentiment_batch(posts, chunk_size=args.chunk_size))
+    streamed = best_of(args.runs, lambda: analyze_sentiment_batch(iter(posts), chunk_size=args.chunk_size))
+    print(f"{args.texts} texts (labels identical)")
+    print(f"  analyze_sentiment loop     {loop:7.3f} s  {args.texts / loop:12,.0f} texts/s")
+    print(f"  analyze_sentiment_batch    {batch:7.3f} s  {args.texts / batch:12,.0f} texts/s  ({loop / batch:.1f}x)")
+    print(f"  batch from a generator     {streamed:7.3f} s  {args.texts / streamed:12,.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Repeated polling of unchanged social resources with and without the conditional-request cache.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_social_cache [--polls 200] [--latency 0.02]
+
+Polls the same Facebook, Instagram and YouTube resources from the mock server
+(``benchmarks/mock_social_server.py``) three ways: no cache, cache with TTL 0
+(every poll revalidates with ``If-None-Match``) and cache with the default
+per-endpoint TTLs. Halfway through, the server's data changes once so that
+revalidations that do fetch a new body show up in the metrics.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import social_media_apis
+from benchmarks import mock_social_server
+from benchmarks.bench_social_http import make_client, start_server
+from social_cache import SocialHTTPCache
+
+READERS = [
+    lambda c: social_media_apis.get_facebook_page_posts_async("token", "page", client=c),
+    lambda c: social_media_apis.get_instagram_user_media_async("token", "ig", client=c),
+    lambda c: social_media_apis.get_youtube_channel_videos_async("key", "channel", client=c),
+]
+
+
+async def poll(client, polls):
+    for i in range(polls):
+        if i == polls // 2:
+            mock_social_server.config["revision"] += 1
+        results = await asyncio.gather(*(read(client) for read in READERS))
+        assert all(r is not None for r in results)
+
+
+async def run(label, port, polls, cache):
+    before = dict(mock_social_server.counters)
+    client = make_client(port, cache=cache)
+    start = time.perf_counter()
+    await poll(client, polls)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats() if cache else None
+    await client.aclose()
+    sent = mock_social_server.counters["bytes_sent"] - before["bytes_sent"]
+    requests = mock_social_server.counters["requests"] - before["requests"]
+    print(f"  {label:<22} {elapsed:6.2f} s  {requests:5} upstream requests  {sent / 1024:9.1f} KiB transferred")
+    if stats:
+        print(f"  {'':<22} hits {stats['hits']}, 304 {stats['revalidacoes']}, "
+              f"changed {stats['revalidacoes_alteradas']}, misses {stats['misses']}, "
+              f"{stats['bytes_economizados'] / 1024:.1f} KiB saved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8782)
+    args = parser.parse_args()
+
+    mock_social_server.config["latency"] = args.latency
+    server, thread = start_server(args.port)
+    print(f"{args.polls} polls of {len(READERS)} resources, mock latency {args.latency * 1000:.0f} ms")
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run("no cache", args.port, args.polls, None))
+        asyncio.run(run("cache, revalidate", args.port, args.polls,
+                        SocialHTTPCache(os.path.join(directory, "revalidate.sqlite3"), default_ttl=0, ttls=[])))
+        asyncio.run(run("cache, endpoint TTLs", args.port, args.polls,
+                        SocialHTTPCache(os.path.join(directory, "ttl.sqlite3"))))
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
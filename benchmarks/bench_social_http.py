@@ -0,0 +1,141 @@
+"""Social API reads: bare ``requests.get`` per call vs the pooled async client, against a local mock.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_social_http [--reads 300] [--concurrency 32] [--latency 0.02]
+
+The mock server (``benchmarks/mock_social_server.py``) runs in a background
+thread; a small transport redirects the real platform hosts used by
+``social_media_apis`` to it, so the readers are exercised unchanged. The last
+sections inject 503s, 429s with ``Retry-After`` and an exhausted Twitter/X
+rate-limit window, and check that every read still succeeds.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import httpx
+import requests
+import uvicorn
+
+import social_media_apis
+from benchmarks import mock_social_server
+from social_http import SocialHTTPClient
+
+
+class LocalTransport(httpx.AsyncBaseTransport):
+    """Sends every request to the mock server, keeping path and query."""
+
+    def __init__(self, port):
+        self.port = port
+        self.inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def start_server(port):
+    server = uvicorn.Server(uvicorn.Config(mock_social_server.app, host="127.0.0.1", port=port,
+                                           log_level="warning", backlog=4096))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def make_client(port, **options):
+    return SocialHTTPClient(transport=LocalTransport(port), backoff_base=0.05, **options)
+
+
+READERS = [
+    lambda c: social_media_apis.get_facebook_page_posts_async("token", "page", client=c),
+    lambda c: social_media_apis.get_instagram_user_media_async("token", "ig", client=c),
+    lambda c: social_media_apis.get_twitter_user_tweets_async("token", "user", client=c),
+    lambda c: social_media_apis.get_tiktok_user_info_async("token", client=c),
+    lambda c: social_media_apis.get_youtube_channel_videos_async("key", "channel", client=c),
+]
+
+
+async def async_reads(client, reads, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with limit:
+            return await READERS[i % len(READERS)](client)
+
+    return await asyncio.gather(*(one(i) for i in range(reads)))
+
+
+def sync_reads(port, reads):
+    # What the sync readers do: a fresh requests.get (new connection) per call.
+    url = f"http://127.0.0.1:{port}/v19.0/page/posts"
+    for _ in range(reads):
+        response = requests.get(url, params={"access_token": "token"})
+        response.raise_for_status()
+
+
+def report(label, reads, seconds):
+    print(f"  {label:<34} {seconds:7.2f} s  {reads / seconds:8.1f} reads/s")
+
+
+async def run(args):
+    client = make_client(args.port)
+    start = time.perf_counter()
+    await async_reads(client, args.reads, 1)
+    report("pooled client, sequential", args.reads, time.perf_counter() - start)
+    start = time.perf_counter()
+    results = await async_reads(client, args.reads, args.concurrency)
+    report(f"pooled client, concurrency {args.concurrency}", args.reads, time.perf_counter() - start)
+    assert all(r is not None for r in results)
+    await client.aclose()
+
+    print("resilience: 10% 503s, every 40th request 429 with Retry-After: 1")
+    mock_social_server.config.update(fail_rate=0.1, throttle_every=40, retry_after=1)
+    client = make_client(args.port)
+    start = time.perf_counter()
+    results = await async_reads(client, args.reads, args.concurrency)
+    ok = sum(r is not None for r in results)
+    retries = sum(m["tentativas_extras"] for m in client.metrics.values())
+    print(f"  {ok}/{args.reads} reads succeeded in {time.perf_counter() - start:.2f} s, {retries} retries, "
+          f"server throttled {mock_social_server.counters['throttled']} and failed {mock_social_server.counters['failed']}")
+    await client.aclose()
+    mock_social_server.config.update(fail_rate=0.0, throttle_every=0)
+
+    print("twitter/x: 20 requests per 2 s window, 60 reads")
+    mock_social_server.config.update(twitter_budget=20, twitter_window=2)
+    client = make_client(args.port)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(READERS[2](client) for _ in range(60)))
+    metrics = client.metrics["twitter"]
+    print(f"  {sum(r is not None for r in results)}/60 reads succeeded in {time.perf_counter() - start:.2f} s, "
+          f"{metrics['tentativas_extras']} retries, {metrics['segundos_em_espera']:.1f} s waited across requests")
+    await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=8780)
+    args = parser.parse_args()
+
+    mock_social_server.config["latency"] = args.latency
+    server, thread = start_server(args.port)
+    print(f"mock latency {args.latency * 1000:.0f} ms, {args.reads} reads")
+    start = time.perf_counter()
+    sync_reads(args.port, args.reads)
+    report("requests.get per call, sequential", args.reads, time.perf_counter() - start)
+    asyncio.run(run(args))
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Analytical queries over raw JSON payloads vs the partitioned social store.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_social_store [--items 200000] [--authors 200]
+
+Items are synthetic Facebook posts, tweets, Instagram media and YouTube videos
+spread over a year. The baseline keeps the raw JSON strings (as a reader cache
+would) and parses every payload for each query; the store answers the same
+queries from its indexed columns. Results of both paths are compared before
+timing.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from social_store import SocialStore, normalize
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_items(n, authors, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        platform = ("facebook", "twitter", "instagram", "youtube")[i % 4]
+        author = f"author{rng.randrange(authors)}"
+        when = START + timedelta(seconds=rng.randrange(365 * 86400))
+        likes, comments, shares = rng.randrange(500), rng.randrange(80), rng.randrange(40)
+        text = " ".join(rng.choices(("novo", "vídeo", "hoje", "promoção", "live", "obrigado"), k=12))
+        if platform == "facebook":
+            item = {"id": f"{author}_{i}", "from": {"id": author}, "message": text,
+                    "created_time": when.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+                    "reactions": {"data": [], "summary": {"total_count": likes}},
+                    "comments": {"data": [], "summary": {"total_count": comments}}, "shares": {"count": shares}}
+        elif platform == "twitter":
+            item = {"id": str(10**15 + i), "author_id": author, "text": text,
+                    "created_at": when.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "public_metrics": {"like_count": likes, "reply_count": comments, "retweet_count": shares,
+                                       "quote_count": 0, "impression_count": likes * 20}}
+        elif platform == "instagram":
+            item = {"id": f"m{i}", "username": author, "caption": text, "media_type": "IMAGE",
+                    "timestamp": when.strftime("%Y-%m-%dT%H:%M:%S+0000"), "like_count": likes,
+                    "comments_count": comments + shares}
+        else:
+            item = {"id": f"vid{i}", "snippet": {"channelId": author, "title": text,
+                                                 "publishedAt": when.strftime("%Y-%m-%dT%H:%M:%SZ")},
+                    "statistics": {"viewCount": str(likes * 30), "likeCount": str(likes),
+                                   "commentCount": str(comments + shares)}}
+        items.append((platform, item))
+    return items
+
+
+# --- Baseline: parse every raw payload for each query ---
+
+def raw_rows(payloads):
+    for platform, payload in payloads:
+        yield normalize(platform, json.loads(payload))
+
+
+def raw_engagement_by_author(payloads, since, until):
+    totals = {}
+    for row in raw_rows(payloads):
+        if since <= row["publicado_em"] < until:
+            totals[row["autor"]] = totals.get(row["autor"], 0) + row["engajamento"]
+    return totals
+
+
+def raw_author_timeline(payloads, author, since, until):
+    return sorted((row["publicado_em"] for row in raw_rows(payloads)
+                   if row["autor"] == author and since <= row["publicado_em"] < until), reverse=True)
+
+
+def raw_top(payloads, n):
+    return sorted((row["engajamento"] for row in raw_rows(payloads)), reverse=True)[:n]
+
+
+def timed(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<38} {best * 1000:9.1f} ms")
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--authors", type=int, default=200)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items, args.authors)
+    payloads = [(platform, json.dumps(item)) for platform, item in items]
+    directory = tempfile.mkdtemp()
+    store = SocialStore(os.path.join(directory, "store.sqlite3"))
+    start = time.perf_counter()
+    for platform in ("facebook", "twitter", "instagram", "youtube"):
+        store.ingest(platform, [item for p, item in items if p == platform])
+    print(f"ingested {args.items} items into {len(store.partitions())} partitions "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    since, until = int(datetime(2025, 3, 1, tzinfo=timezone.utc).timestamp()), \
+        int(datetime(2025, 4, 1, tzinfo=timezone.utc).timestamp())
+    author = "author7"
+
+    print("engagement by author, one month, all platforms")
+    expected, raw_time = timed("raw JSON", lambda: raw_engagement_by_author(payloads, since, until))
+    result, store_time = timed("store", lambda: store.aggregate("autor", since=since, until=until))
+    assert {row["autor"]: row["total"] for row in result} == expected
+    print(f"  speedup {raw_time / store_time:.1f}x")
+
+    print("one author's posts in a month")
+    expected, raw_time = timed("raw JSON", lambda: raw_author_timeline(payloads, author, since, until))
+    result, store_time = timed("store", lambda: store.query(("publicado_em",), author=author,
+                                                            since=since, until=until))
+    assert [row["publicado_em"] for row in result] == expected
+    print(f"  speedup {raw_time / store_time:.1f}x")
+
+    print("top 20 by engagement")
+    expected, raw_time = timed("raw JSON", lambda: raw_top(payloads, 20))
+    result, store_time = timed("store", lambda: store.most_engaged(20))
+    assert [row["engajamento"] for row in result] == expected
+    print(f"  speedup {raw_time / store_time:.1f}x")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Time to first ``/`` response of the agent API for different integration setups.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_startup [--runs 3]
+
+Each scenario starts a fresh ``uvicorn agent.agent_core:app`` process and polls
+``/`` until it answers, so the figure includes interpreter start, module import
+and the lifespan hook. Integrations whose client library is not installed are
+reported as ``failed`` in the per-integration breakdown.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ALL_KEYS = {
+    "SENTRY_DSN": "https://public@sentry.invalid/1",
+    "HUGGING_FACE_API_KEY": "hf-bench",
+    "OPENAI_API_KEY": "sk-bench",
+    "GOOGLE_GEMINI_API_KEY": "gemini-bench",
+    "ELEVENLABS_API_KEY": "eleven-bench",
+    "PERPLEXITY_API_KEY": "pplx-bench",
+    "GMAIL_CLIENT_ID": "bench",
+    "GMAIL_CLIENT_SECRET": "bench",
+    "GMAIL_REDIRECT_URI": "http://localhost/bench",
+    "GOOGLE_CALENDAR_CLIENT_ID": "bench",
+    "GOOGLE_CALENDAR_CLIENT_SECRET": "bench",
+    "GOOGLE_CALENDAR_REDIRECT_URI": "http://localhost/bench",
+    "NOTION_API_KEY": "secret_bench",
+    "ZAPIER_WEBHOOK_URL": "http://localhost/zapier",
+}
+
+SOME_KEYS = ("OPENAI_API_KEY", "NOTION_API_KEY", "ZAPIER_WEBHOOK_URL")
+
+
+def scenarios(database_url):
+    all_on = dict(ALL_KEYS, DATABASE_URL=database_url)
+    some_on = {key: ALL_KEYS[key] for key in SOME_KEYS}
+    some_on["DATABASE_URL"] = database_url
+    return [
+        ("all off", {}),
+        ("some on (lazy)", some_on),
+        ("some on (eager)", dict(some_on, AGENT_EAGER_INTEGRATIONS="all")),
+        ("all on (lazy)", all_on),
+        ("all on (eager)", dict(all_on, AGENT_EAGER_INTEGRATIONS="all")),
+    ]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url, timeout=1.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def time_to_first_response(env, timeout=120.0):
+    port = _free_port()
+    process_env = {k: v for k, v in os.environ.items() if k not in ALL_KEYS and k != "DATABASE_URL"}
+    process_env.pop("AGENT_EAGER_INTEGRATIONS", None)
+    process_env.update(env)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "agent.agent_core:app", "--port", str(port), "--log-level", "warning"],
+        env=process_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                _get(f"http://127.0.0.1:{port}/", timeout=0.5)
+                elapsed = time.perf_counter() - start
+                break
+            except OSError:
+                time.sleep(0.005)
+        else:
+            raise TimeoutError("agent did not answer in time")
+        integrations = _get(f"http://127.0.0.1:{port}/status", timeout=timeout)["integrations"]
+        return elapsed, integrations
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for name, env in scenarios(database_url):
+            timings = []
+            integrations = {}
+            for _ in range(args.runs):
+                elapsed, integrations = time_to_first_response(env)
+                timings.append(elapsed * 1000)
+            print(f"{name:<18} first '/' response: median {statistics.median(timings):8.1f} ms "
+                  f"(min {min(timings):.1f}, max {max(timings):.1f})")
+            for integration, info in integrations.items():
+                if info["state"] != "skipped":
+                    print(f"    {integration:<16} {info['state']:<12} init {info['init_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Built-in NumPy statevector simulator vs qiskit Aer: latency and memory.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_statevector [--backends numpy,qasm_simulator] [--qubits 1,4,8,12,16,20]
+                                           [--sweep 256] [--max-amplitudes 4194304] [--calls 50]
+                                           [--shots 1000]
+
+Each backend runs in its own process so its import cost and peak RSS are
+measured in isolation. The circuit is a layered ansatz (H on every qubit, an
+RY per qubit on one of four parameters, a CX chain). Per qubit count:
+
+* ``first``: first execution, including compilation;
+* ``call``: mean latency of one cached execution with ``--shots`` shots;
+* ``sweep``: one ``execute_batch`` over ``--sweep`` parameter points (fewer
+  for wide circuits, so a sweep holds at most ``--max-amplitudes`` amplitudes:
+  every point returns a dict with up to 2**n bitstrings);
+* ``analytic``: the same sweep as exact probabilities;
+* ``rss``: process peak resident memory after the runs.
+
+A backend that cannot be imported (qiskit not installed) is reported as
+unavailable.
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+
+
+def ansatz(n):
+    from quantum_executor import Circuit
+
+    gates = [("h", (q,), None) for q in range(n)]
+    gates += [("ry", (q,), f"theta{q % 4}") for q in range(n)]
+    gates += [("cx", (q, q + 1), None) for q in range(n - 1)]
+    return Circuit(n, tuple(gates))
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_backend(backend, qubits, sweep, max_amplitudes, calls, shots, results):
+    import random
+
+    start = time.perf_counter()
+    from quantum_executor import QuantumExecutor
+
+    executor = QuantumExecutor(backend=backend, shots=shots)
+    try:
+        executor.backend.compile(ansatz(1))
+    except ImportError as e:
+        results.put({"error": f"unavailable ({e})"})
+        return
+    rows = {"import": time.perf_counter() - start, "baseline_rss": peak_rss_mb(), "qubits": {}}
+    rng = random.Random(0)
+    for n in qubits:
+        circuit = ansatz(n)
+        points = [[rng.uniform(0, 3.14) for _ in circuit.params]
+                  for _ in range(max(1, min(sweep, max_amplitudes // 2 ** n)))]
+        start = time.perf_counter()
+        executor.execute(circuit, points[0])
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(calls):
+            executor.execute(circuit, points[i % len(points)])
+        call = (time.perf_counter() - start) / calls
+        start = time.perf_counter()
+        executor.execute_batch(circuit, points)
+        batch = time.perf_counter() - start
+        start = time.perf_counter()
+        executor.execute_batch(circuit, points, analytic=True)
+        analytic = time.perf_counter() - start
+        rows["qubits"][n] = (first, call, len(points), batch, analytic, peak_rss_mb())
+    results.put(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="numpy,qasm_simulator")
+    parser.add_argument("--qubits", default="1,4,8,12,16,20")
+    parser.add_argument("--sweep", type=int, default=256, help="parameter points per batch")
+    parser.add_argument("--max-amplitudes", type=int, default=2 ** 22, help="cap on sweep points x 2**qubits")
+    parser.add_argument("--calls", type=int, default=50, help="single executions timed per qubit count")
+    parser.add_argument("--shots", type=int, default=1000)
+    args = parser.parse_args()
+    qubits = [int(q) for q in args.qubits.split(",")]
+
+    context = multiprocessing.get_context("spawn")
+    print(f"ansatz circuits, {args.shots} shots, sweeps of {args.sweep} points")
+    for backend in args.backends.split(","):
+        results = context.Queue()
+        process = context.Process(target=run_backend,
+                                  args=(backend, qubits, args.sweep, args.max_amplitudes, args.calls,
+                                        args.shots, results))
+        process.start()
+        rows = results.get()
+        process.join()
+        if "error" in rows:
+            print(f"{backend}: {rows['error']}")
+            continue
+        print(f"{backend}: import {rows['import'] * 1000:.0f} ms, baseline rss {rows['baseline_rss']:.0f} MB")
+        print(f"  {'qubits':>6} {'first ms':>10} {'call ms':>10} {'points':>7} {'sweep ms':>10} "
+              f"{'analytic ms':>12} {'rss MB':>8}")
+        for n, (first, call, points, batch, analytic, rss) in rows["qubits"].items():
+            print(f"  {n:6d} {first * 1000:10.2f} {call * 1000:10.3f} {points:7d} {batch * 1000:10.1f} "
+                  f"{analytic * 1000:12.1f} {rss:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
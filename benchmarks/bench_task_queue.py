@@ -0,0 +1,97 @@
+"""Dequeue throughput of the durable task queue as worker processes are added.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_task_queue [--tasks 5000] [--workers 1,2,4,8] [--concurrency 10]
+                                          [--work-ms 0] [--url postgresql://...]
+
+Without ``--url`` a temporary SQLite file is used. For every worker count the
+tables are recreated, ``--tasks`` tasks enqueued, and that many processes each
+run a TaskWorker until the queue is empty. Afterwards every task must be done
+exactly once (one attempt, no duplicates).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from agent.db import AgentDeadTask, AgentTask, Database
+from agent.task_queue import TaskQueue, TaskWorker
+
+
+async def prepare(url, tasks):
+    database = Database(url)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(AgentDeadTask.__table__.drop, checkfirst=True)
+        await conn.run_sync(AgentTask.__table__.drop, checkfirst=True)
+    queue = await TaskQueue(database).create()
+    await queue.enqueue_many([{"name": "bench", "payload": {"i": i}, "priority": i % 3} for i in range(tasks)])
+    await database.dispose()
+
+
+async def work(url, concurrency, work_seconds):
+    database = Database(url)
+    queue = TaskQueue(database)
+
+    async def handler(task):
+        if work_seconds:
+            await asyncio.sleep(work_seconds)
+        return task.payload["i"]
+
+    worker = TaskWorker(queue, handler, concurrency=concurrency, poll_interval=0.05)
+    await worker.run(idle_exit=True)
+    await database.dispose()
+    return worker.processed
+
+
+def worker_process(url, concurrency, work_seconds, results):
+    results.put(asyncio.run(work(url, concurrency, work_seconds)))
+
+
+async def verify(url):
+    database = Database(url)
+    async with database.engine.connect() as conn:
+        done = (await conn.execute(select(func.count()).where(AgentTask.status == "done"))).scalar_one()
+        retried = (await conn.execute(select(func.count()).where(AgentTask.attempts > 1))).scalar_one()
+    await database.dispose()
+    return done, retried
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--concurrency", type=int, default=10, help="tasks leased at once per worker")
+    parser.add_argument("--work-ms", type=float, default=0.0, help="simulated work per task")
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+    url = args.url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tasks.sqlite3")
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{args.tasks} tasks on {Database(url).engine.dialect.name}, "
+          f"{args.concurrency} leased per worker, {args.work_ms} ms of work each")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        asyncio.run(prepare(url, args.tasks))
+        results = context.Queue()
+        processes = [context.Process(target=worker_process, args=(url, args.concurrency, args.work_ms / 1000,
+                                                                   results))
+                     for _ in range(workers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        per_worker = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+        done, retried = asyncio.run(verify(url))
+        status = "ok" if done == args.tasks and sum(per_worker) == args.tasks and not retried else "MISMATCH"
+        print(f"  {workers:3d} workers: {elapsed:6.2f} s  {args.tasks / elapsed:8.0f} tasks/s  "
+              f"per worker {min(per_worker)}-{max(per_worker)}  done {done}  duplicates {retried}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Recall and latency of the memory vector index, flat vs partitioned (IVF).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_vector_index [--sizes 10000,100000,1000000] [--dim 64]
+
+Vectors are drawn from a Gaussian mixture so that partitions are meaningful.
+Recall@k is measured against the exact flat scan for the same queries.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from agent.vector_index import VectorIndex
+
+
+def clustered_vectors(n, dim, clusters=256, spread=0.35, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + spread * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def timed_searches(index, queries, k, **options):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append({key for key, _ in index.search_vector(query, k, **options)})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def report(label, latencies, recall=None):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    line = f"    {label:<16} p50 {statistics.median(latencies):8.3f} ms  p99 {p99:8.3f} ms"
+    if recall is not None:
+        line += f"  recall@k {recall:.3f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", default="4,8,16")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        data = clustered_vectors(size, args.dim)
+        queries = clustered_vectors(args.queries, args.dim, seed=1)
+        keys = [str(i) for i in range(size)]
+
+        index = VectorIndex(dim=args.dim, ivf_threshold=size + 1)
+        start = time.perf_counter()
+        for offset in range(0, size, 10_000):
+            index.add_vectors(keys[offset:offset + 10_000], data[offset:offset + 10_000])
+        insert_seconds = time.perf_counter() - start
+        print(f"{size} entries, dim {args.dim}: incremental insert {insert_seconds:.2f} s "
+              f"({size / insert_seconds:,.0f}/s)")
+
+        flat_latencies, exact = timed_searches(index, queries, args.k)
+        report("flat", flat_latencies)
+
+        start = time.perf_counter()
+        index.train()
+        print(f"    partitioned into {index.n_lists or int(np.sqrt(size))} lists in {time.perf_counter() - start:.2f} s")
+        for n_probe in (int(p) for p in args.probes.split(",")):
+            latencies, found = timed_searches(index, queries, args.k, n_probe=n_probe)
+            recall = np.mean([len(a & b) / len(a) for a, b in zip(exact, found)])
+            report(f"ivf n_probe={n_probe}", latencies, recall)
+
+
+if __name__ == "__main__":
+    main()
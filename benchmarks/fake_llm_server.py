@@ -0,0 +1,111 @@
+"""Local stand-in for the OpenAI and Gemini HTTP APIs.
+
+Serves ``POST /v1/chat/completions`` (OpenAI-compatible, with ``stream``)
+and ``POST /v1beta/models/{model}:generateContent`` /
+``:streamGenerateContent?alt=sse`` (Gemini). Point the gateway at it with::
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta
+
+and run it with ``python -m benchmarks.fake_llm_server [--port 8765]``.
+``FAKE_LLM_LATENCY`` (seconds per response) and ``FAKE_LLM_FAIL_OPENAI`` /
+``FAKE_LLM_FAIL_GEMINI`` (fraction of requests answered with a 500) shape
+its behaviour; the benchmark changes them at runtime through ``config``,
+where ``stall`` also makes a provider wait that many seconds before
+answering anything (a hung upstream).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+config = {
+    "latency": float(os.getenv("FAKE_LLM_LATENCY", "0.05")),
+    "fail": {
+        "openai": float(os.getenv("FAKE_LLM_FAIL_OPENAI", "0")),
+        "gemini": float(os.getenv("FAKE_LLM_FAIL_GEMINI", "0")),
+    },
+    "stall": {"openai": 0.0, "gemini": 0.0},
+}
+calls = {"openai": 0, "gemini": 0}
+
+app = FastAPI()
+
+
+def _reply(prompt):
+    return f"echo: {prompt}"
+
+
+async def _failed(provider):
+    calls[provider] += 1
+    if config["stall"][provider]:
+        await asyncio.sleep(config["stall"][provider])
+    return random.random() < config["fail"][provider]
+
+
+def _sse(events):
+    async def body():
+        for event in events:
+            await asyncio.sleep(config["latency"] / max(len(events), 1))
+            yield f"data: {json.dumps(event)}\n\n"
+    return body()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    if await _failed("openai"):
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=500)
+    prompt = payload["messages"][-1]["content"]
+    text = _reply(prompt)
+    if payload.get("stream"):
+        events = [{"choices": [{"delta": {"content": word + " "}}]} for word in text.split()]
+        return StreamingResponse(_sse_done(events), media_type="text/event-stream")
+    await asyncio.sleep(config["latency"])
+    return {
+        "model": payload["model"],
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4},
+    }
+
+
+async def _sse_done(events):
+    async for line in _sse(events):
+        yield line
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    payload = await request.json()
+    if await _failed("gemini"):
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=500)
+    prompt = payload["contents"][-1]["parts"][0]["text"]
+    text = _reply(prompt)
+    await asyncio.sleep(config["latency"])
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+        "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+    }
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def stream_generate_content(model: str, request: Request):
+    payload = await request.json()
+    if await _failed("gemini"):
+        return JSONResponse({"error": {"message": "injected failure"}}, status_code=500)
+    text = _reply(payload["contents"][-1]["parts"][0]["text"])
+    events = [{"candidates": [{"content": {"parts": [{"text": word + " "}]}}]} for word in text.split()]
+    return StreamingResponse(_sse(events), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    uvicorn.run(app, host="127.0.0.1", port=parser.parse_args().port, log_level="warning")
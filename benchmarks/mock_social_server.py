@@ -0,0 +1,285 @@
+"""Local stand-in for the social platform read APIs.
+
+Serves the paths used by ``social_media_apis`` (Graph API posts/media,
+Twitter/X tweets, TikTok user info, YouTube search, channels, playlistItems
+and videos) from a synthetic dataset,
+with the platforms' pagination shapes, rate-limit headers and injectable
+failures. Run it with ``python -m benchmarks.mock_social_server [--port 8780]``.
+
+``config`` can be changed at runtime by the benchmarks:
+
+* ``latency``: seconds added to every response;
+* ``fail_rate``: fraction of requests answered with a 503;
+* ``throttle_every``: every Nth request gets a 429 with ``Retry-After: retry_after``;
+* ``twitter_budget``: requests allowed per window before ``x-rate-limit-remaining`` hits 0;
+* ``revision``: bumping it changes post/video bodies (and so their ETags);
+* ``batch_fail_rate`` / ``batch_item_latency``: per sub-request failures and cost
+  of the Graph API batch endpoint (``POST /v19.0/``).
+
+Graph API and YouTube responses carry an ETag and answer a matching
+``If-None-Match`` with an empty 304.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from urllib.parse import parse_qs, unquote
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+config = {
+    "latency": 0.0,
+    "fail_rate": 0.0,
+    "throttle_every": 0,
+    "retry_after": 1,
+    "twitter_budget": 0,
+    "twitter_window": 2,
+    "items": 500,
+    "revision": 0,
+    "batch_fail_rate": 0.0,
+    "batch_item_latency": 0.0005,
+}
+counters = {"requests": 0, "throttled": 0, "failed": 0, "not_modified": 0, "bytes_sent": 0}
+_twitter_window = {"start": time.time(), "used": 0}
+
+app = FastAPI()
+
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _serial(index):
+    # Pages are newest first (index 0 is the most recent), but an item's serial, id and
+    # timestamp stay fixed when ``items`` grows: new items appear at the top.
+    return config["items"] - 1 - index
+
+
+def _timestamp(index):
+    return (_EPOCH + timedelta(hours=_serial(index))).strftime("%Y-%m-%dT%H:%M:%S+0000")
+
+
+async def _gate(request: Request, headers=None):
+    counters["requests"] += 1
+    if config["latency"]:
+        await asyncio.sleep(config["latency"])
+    every = config["throttle_every"]
+    if every and counters["requests"] % every == 0:
+        counters["throttled"] += 1
+        return JSONResponse({"error": "rate limited"}, status_code=429,
+                            headers={"Retry-After": str(config["retry_after"]), **(headers or {})})
+    if config["fail_rate"] and random.random() < config["fail_rate"]:
+        counters["failed"] += 1
+        return JSONResponse({"error": "unavailable"}, status_code=503)
+    return None
+
+
+def _respond(request: Request, body, headers=None):
+    """JSON response with an ETag; a matching If-None-Match gets an empty 304."""
+    payload = json.dumps(body).encode()
+    etag = '"' + hashlib.sha256(payload).hexdigest()[:16] + '"'
+    headers = {**(headers or {}), "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    counters["bytes_sent"] += len(payload)
+    return Response(payload, media_type="application/json", headers=headers)
+
+
+def _page(request: Request, default_limit=25):
+    limit = int(request.query_params.get("limit", default_limit))
+    start = int(request.query_params.get("after") or 0)
+    return start, min(start + limit, config["items"])
+
+
+def _graph_items(kind, object_id, start, end):
+    if kind == "posts":
+        return [{"id": f"{object_id}_{_serial(i)}", "message": f"post {_serial(i)} r{config['revision']}",
+                 "created_time": _timestamp(i)} for i in range(start, end)]
+    return [{"id": f"{object_id}_m{_serial(i)}", "caption": f"media {_serial(i)}", "media_type": "IMAGE",
+             "timestamp": _timestamp(i)} for i in range(start, end)]
+
+
+def _newer_than(items, since, field):
+    if since is None:
+        return items
+    return [item for item in items if datetime.fromisoformat(item[field]) >= since]
+
+
+def _graph_response(request, kind, object_id):
+    start, end = _page(request)
+    items = _graph_items(kind, object_id, start, end)
+    since = request.query_params.get("since")
+    if since:
+        items = _newer_than(items, datetime.fromtimestamp(int(since), timezone.utc),
+                            "created_time" if kind == "posts" else "timestamp")
+    body = {"data": items}
+    if end < config["items"] and len(items) == end - start:
+        params = dict(request.query_params)
+        params["after"] = str(end)
+        query = "&".join(f"{k}={v}" for k, v in params.items())
+        body["paging"] = {"cursors": {"after": str(end)}, "next": f"{request.url.scheme}://{request.url.netloc}"
+                                                                   f"{request.url.path}?{query}"}
+    return body
+
+
+@app.get("/v19.0/{object_id}/posts")
+async def graph_posts(object_id: str, request: Request):
+    usage = {"x-app-usage": json.dumps({"call_count": 10, "total_cputime": 5, "total_time": 5})}
+    return await _gate(request, usage) or _respond(request, _graph_response(request, "posts", object_id), usage)
+
+
+@app.get("/v19.0/{object_id}/media")
+async def graph_media(object_id: str, request: Request):
+    return await _gate(request) or _respond(request, _graph_response(request, "media", object_id))
+
+
+def _graph_object(object_id, fields=None):
+    _, _, serial = object_id.rpartition("_")
+    obj = {"id": object_id, "message": f"post {serial}", "created_time": _EPOCH.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+           "like_count": len(object_id) * 7 % 100, "comments_count": len(object_id) % 10}
+    if fields:
+        wanted = {field.split(".")[0] for field in fields.split(",")}
+        obj = {key: value for key, value in obj.items() if key in wanted or key == "id"}
+    return obj
+
+
+@app.post("/v19.0/")
+async def graph_batch(request: Request):
+    """Graph API batch endpoint: ``batch`` is a JSON list of ``{method, relative_url}``.
+
+    ``batch_fail_rate`` makes a fraction of sub-requests come back as a 500
+    (or, one time in three, as ``null``, like sub-requests the API timed out on).
+    """
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    form = parse_qs((await request.body()).decode())
+    batch = json.loads(form["batch"][0])
+    if len(batch) > 50:
+        return JSONResponse({"error": {"message": "Too many requests in batch", "code": 1}}, status_code=400)
+    counters["batch_subrequests"] = counters.get("batch_subrequests", 0) + len(batch)
+    await asyncio.sleep(config["batch_item_latency"] * len(batch))
+    responses = []
+    for sub in batch:
+        if config["batch_fail_rate"] and random.random() < config["batch_fail_rate"]:
+            responses.append(None if random.random() < 1 / 3 else {
+                "code": 500, "body": json.dumps({"error": {"message": "transient", "code": 2, "is_transient": True}})})
+            continue
+        path, _, query = sub["relative_url"].partition("?")
+        params = dict(pair.split("=", 1) for pair in query.split("&") if "=" in pair)
+        responses.append({"code": 200, "body": json.dumps(_graph_object(path, unquote(params.get("fields", ""))))})
+    return responses
+
+
+@app.get("/v19.0/{object_id}")
+async def graph_object(object_id: str, request: Request):
+    return await _gate(request) or _graph_object(object_id, request.query_params.get("fields"))
+
+
+@app.get("/2/users/{user_id}/tweets")
+async def twitter_tweets(user_id: str, request: Request):
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    headers = {}
+    if config["twitter_budget"]:
+        window = _twitter_window
+        if time.time() - window["start"] > config["twitter_window"]:
+            window.update(start=time.time(), used=0)
+        window["used"] += 1
+        remaining = config["twitter_budget"] - window["used"]
+        headers = {"x-rate-limit-limit": str(config["twitter_budget"]),
+                   "x-rate-limit-remaining": str(max(remaining, 0)),
+                   "x-rate-limit-reset": str(int(window["start"] + config["twitter_window"]) + 1)}
+        if remaining < 0:
+            return JSONResponse({"title": "Too Many Requests"}, status_code=429, headers=headers)
+    start = int(request.query_params.get("pagination_token") or 0)
+    end = min(start + int(request.query_params.get("max_results", 10)), config["items"])
+    data = [{"id": str(10**12 + _serial(i)), "text": f"tweet {_serial(i)}",
+             "created_at": _timestamp(i).replace("+0000", ".000Z")} for i in range(start, end)]
+    since_id = request.query_params.get("since_id")
+    if since_id:
+        data = [tweet for tweet in data if int(tweet["id"]) > int(since_id)]
+    meta = {"result_count": len(data)}
+    if end < config["items"] and len(data) == end - start:
+        meta["next_token"] = str(end)
+    return JSONResponse({"data": data, "meta": meta}, headers=headers)
+
+
+@app.get("/v2/user/info/")
+async def tiktok_user_info(request: Request):
+    return await _gate(request) or {"data": {"user": {"open_id": "mock", "display_name": "Mock User"}}}
+
+
+@app.get("/youtube/v3/search")
+async def youtube_search(request: Request):
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    start = int(request.query_params.get("pageToken") or 0)
+    end = min(start + int(request.query_params.get("maxResults", 5)), config["items"])
+    items = [{"id": {"kind": "youtube#video", "videoId": f"vid{_serial(i)}"},
+              "snippet": {"title": f"video {_serial(i)} r{config['revision']}", "publishedAt": _timestamp(i).replace("+0000", "Z")}}
+             for i in range(start, end)]
+    published_after = request.query_params.get("publishedAfter")
+    if published_after:
+        cutoff = datetime.fromisoformat(published_after)
+        items = [item for item in items if datetime.fromisoformat(item["snippet"]["publishedAt"]) > cutoff]
+    body = {
+        "kind": "youtube#searchListResponse",
+        "items": items,
+        "pageInfo": {"totalResults": config["items"], "resultsPerPage": len(items)},
+    }
+    if end < config["items"] and len(items) == end - start:
+        body["nextPageToken"] = str(end)
+    return _respond(request, body)
+
+
+@app.get("/youtube/v3/channels")
+async def youtube_channels(request: Request):
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    channel_id = request.query_params["id"]
+    return {"items": [{"id": channel_id, "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}}}]}
+
+
+@app.get("/youtube/v3/playlistItems")
+async def youtube_playlist_items(request: Request):
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    start = int(request.query_params.get("pageToken") or 0)
+    end = min(start + min(int(request.query_params.get("maxResults", 5)), 50), config["items"])
+    items = [{"snippet": {"title": f"video {_serial(i)}", "publishedAt": _timestamp(i).replace("+0000", "Z")},
+              "contentDetails": {"videoId": f"vid{_serial(i)}",
+                                 "videoPublishedAt": _timestamp(i).replace("+0000", "Z")}}
+             for i in range(start, end)]
+    body = {"items": items, "pageInfo": {"totalResults": config["items"], "resultsPerPage": len(items)}}
+    if end < config["items"]:
+        body["nextPageToken"] = str(end)
+    return _respond(request, body)
+
+
+@app.get("/youtube/v3/videos")
+async def youtube_videos(request: Request):
+    blocked = await _gate(request)
+    if blocked:
+        return blocked
+    ids = request.query_params["id"].split(",")
+    if len(ids) > 50:
+        return JSONResponse({"error": {"code": 400, "message": "too many ids"}}, status_code=400)
+    return {"items": [{"id": video_id, "snippet": {"title": f"video {video_id[3:]}"},
+                       "statistics": {"viewCount": str(len(video_id) * 101), "likeCount": str(len(video_id) * 7)},
+                       "contentDetails": {"duration": "PT4M13S"}} for video_id in ids]}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8780)
+    uvicorn.run(app, host="127.0.0.1", port=parser.parse_args().port, log_level="warning")
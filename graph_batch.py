@@ -0,0 +1,175 @@
+import asyncio
+import json
+import random
+from urllib.parse import urlencode
+
+from social_http import SocialAPIError, get_social_client
+
+# Códigos de erro da Graph API que indicam falha transitória (limite de chamadas,
+# serviço indisponível) e justificam repetir apenas aquela sub-requisição.
+TRANSIENT_ERROR_CODES = {1, 2, 4, 17, 32, 341, 613}
+
+
+def _is_transient(response_item):
+    """
+    Uma sub-resposta do lote é repetível se veio nula (a Graph API não chegou a executá-la),
+    com status 429/5xx ou com um código de erro transitório.
+    """
+    if response_item is None:
+        return True
+    if response_item.get("code", 200) == 429 or response_item.get("code", 200) >= 500:
+        return True
+    try:
+        error = json.loads(response_item.get("body") or "{}").get("error") or {}
+    except ValueError:
+        return False
+    return error.get("code") in TRANSIENT_ERROR_CODES or bool(error.get("is_transient"))
+
+
+class GraphBatcher:
+    """
+    Agrupa leituras da Graph API (Facebook e Instagram) em chamadas ao endpoint de lote.
+
+    Cada get() entra em uma fila; até max_batch_size (50, o limite da API) sub-requisições
+    vão em um único POST, disparado quando o lote enche ou `window` segundos após a
+    primeira entrar. As respostas são devolvidas a quem pediu cada uma, e só as
+    sub-requisições que falharam de forma transitória voltam para a fila, com backoff.
+    """
+
+    def __init__(self, access_token, client=None, version="v19.0", max_batch_size=50, max_attempts=3,
+                 window=0.01, backoff_base=0.5, platform="facebook"):
+        self.access_token = access_token
+        self.client = client
+        self.url = f"https://graph.facebook.com/{version}/"
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.window = window
+        self.backoff_base = backoff_base
+        self.platform = platform
+        self._pending = []  # (relative_url, future, tentativa)
+        self._flush_handle = None
+        self._in_flight = set()
+        self.metrics = {"lotes": 0, "sub_requisicoes": 0, "repetidas": 0, "falhas": 0}
+
+    async def get(self, path, params=None):
+        """
+        Corpo JSON de GET {version}/{path}?{params}, lido como parte de um lote.
+        Levanta SocialAPIError se a sub-requisição falhar de vez.
+        """
+        relative_url = path.lstrip("/")
+        if params:
+            relative_url += "?" + urlencode(params)
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(relative_url, future, 0)
+        return await future
+
+    async def get_many(self, paths, params=None, ignore_errors=False):
+        """
+        Lê vários objetos de uma vez; com ignore_errors, falhas viram None na posição correspondente.
+        """
+        results = await asyncio.gather(*(self.get(c, params) for c in paths), return_exceptions=ignore_errors)
+        if ignore_errors:
+            return [None if isinstance(r, Exception) else r for r in results]
+        return results
+
+    def _enqueue(self, relative_url, future, attempt):
+        self._pending.append((relative_url, future, attempt))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch):
+        batch = [entry for entry in batch if not entry[1].cancelled()]
+        if not batch:
+            return
+        try:
+            await self._send_batch(batch)
+        except BaseException as e:
+            # Qualquer falha inesperada: nenhum chamador pode ficar esperando para sempre.
+            pending = [future for _, future, _ in batch if not future.done()]
+            self.metrics["falhas"] += len(pending)
+            for future in pending:
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e if isinstance(e, SocialAPIError) else SocialAPIError(self.platform, repr(e)))
+            if not isinstance(e, Exception):
+                raise
+
+    async def _send_batch(self, batch):
+        self.metrics["lotes"] += 1
+        self.metrics["sub_requisicoes"] += len(batch)
+        body = {
+            "access_token": self.access_token,
+            "include_headers": "false",
+            "batch": json.dumps([{"method": "GET", "relative_url": url} for url, _, _ in batch]),
+        }
+        client = self.client or get_social_client()
+        # Se o próprio POST falhar (já com as novas tentativas do cliente), _send falha o lote todo.
+        response = await client.request(self.platform, "POST", self.url, data=body)
+        responses = response.json()
+        if not isinstance(responses, list):
+            raise SocialAPIError(self.platform, f"resposta do lote não é uma lista: {str(responses)[:200]}")
+        retry = []
+        for (url, future, attempt), response_item in zip(batch, responses + [None] * (len(batch) - len(responses))):
+            if future.done():
+                continue
+            if not isinstance(response_item, dict):
+                response_item = None
+            if response_item is not None and response_item.get("code") == 200:
+                try:
+                    future.set_result(json.loads(response_item.get("body") or "null"))
+                except ValueError as e:
+                    future.set_exception(SocialAPIError(self.platform, f"{url}: corpo inválido ({e})"))
+            elif _is_transient(response_item) and attempt + 1 < self.max_attempts:
+                retry.append((url, future, attempt + 1))
+            else:
+                self.metrics["falhas"] += 1
+                status = response_item.get("code") if response_item else None
+                detail = (response_item or {}).get("body") or "sem resposta"
+                future.set_exception(SocialAPIError(self.platform, f"{url}: HTTP {status}: {detail[:200]}", status))
+        if retry:
+            self.metrics["repetidas"] += len(retry)
+            max_attempt = max(t for _, _, t in retry)
+            await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** (max_attempt - 1)))
+            for entry in retry:
+                self._enqueue(*entry)
+
+    async def drain(self):
+        """
+        Dispara o que estiver na fila e espera os lotes em andamento.
+        """
+        self._flush()
+        while self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+            self._flush()
+
+
+# --- Leituras de detalhes em lote ---
+
+async def get_facebook_posts_details(access_token, post_ids, fields="id,message,created_time,shares,"
+                                     "comments.summary(true),reactions.summary(true)", client=None, batcher=None):
+    """
+    Detalhes de muitos posts do Facebook, 50 por chamada; None para os que falharem.
+    """
+    batcher = batcher or GraphBatcher(access_token, client=client)
+    return await batcher.get_many(post_ids, {"fields": fields}, ignore_errors=True)
+
+async def get_instagram_media_details(access_token, media_ids, fields="id,caption,media_type,timestamp,"
+                                      "like_count,comments_count,permalink", client=None, batcher=None):
+    """
+    Detalhes de muitas mídias do Instagram, 50 por chamada; None para as que falharem.
+    """
+    batcher = batcher or GraphBatcher(access_token, client=client, platform="instagram")
+    return await batcher.get_many(media_ids, {"fields": fields}, ignore_errors=True)
@@ -0,0 +1,259 @@
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+GATES = {
+    # nome: (número de qubits, recebe parâmetro)
+    "h": (1, False), "x": (1, False), "y": (1, False), "z": (1, False), "s": (1, False), "t": (1, False),
+    "rx": (1, True), "ry": (1, True), "rz": (1, True),
+    "cx": (2, False), "cz": (2, False), "swap": (2, False),
+}
+
+
+@dataclass(frozen=True)
+class Circuit:
+    """
+    Estrutura de um circuito: número de qubits e portas (nome, qubits, parâmetro),
+    onde o parâmetro é um número fixo ou o nome de um parâmetro livre, ligado só na
+    execução. Todos os qubits são medidos no fim (qubit i no bit clássico i).
+    Como é imutável e hashable, a própria estrutura é a chave do cache de compilação:
+    circuitos que diferem só nos valores dos parâmetros livres compartilham a compilação.
+    """
+
+    n_qubits: int
+    gates: tuple
+    params: tuple = field(init=False)
+
+    def __post_init__(self):
+        names = []
+        for name, qubits, param in self.gates:
+            if name not in GATES:
+                raise ValueError(f"Porta não suportada: {name!r} (suportadas: {', '.join(GATES)})")
+            arity, parametrized = GATES[name]
+            if len(qubits) != arity or any(not 0 <= q < self.n_qubits for q in qubits):
+                raise ValueError(f"Qubits inválidos para {name}: {qubits}")
+            if parametrized and param is None:
+                raise ValueError(f"A porta {name} precisa de um parâmetro")
+            if isinstance(param, str) and param not in names:
+                names.append(param)
+        object.__setattr__(self, "params", tuple(names))
+
+    def resolve(self, values):
+        """
+        Normaliza os valores dos parâmetros livres (dict por nome ou sequência na
+        ordem de `params`) para um dict.
+        """
+        if values is None:
+            values = {}
+        elif not isinstance(values, dict):
+            values = dict(zip(self.params, values))
+        missing = [name for name in self.params if name not in values]
+        if missing:
+            raise ValueError(f"Faltam valores para os parâmetros: {', '.join(missing)}")
+        return values
+
+
+# Circuito de decisão do agente: um qubit girado em Y pelo ângulo que codifica a
+# entrada. Com theta = pi/2 (entrada 0.5) equivale à porta Hadamard.
+DECISION_CIRCUIT = Circuit(1, (("ry", (0,), "theta"),))
+
+
+def encode_input(value):
+    """
+    Ângulo em [0, pi] para uma entrada do agente: números em [0, 1] são usados
+    diretamente (pi * valor); qualquer outra entrada é mapeada por hash estável
+    do seu repr, de modo que a mesma entrada sempre gera o mesmo ângulo.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 1:
+        return math.pi * value
+    digest = hashlib.blake2b(repr(value).encode(), digest_size=8).digest()
+    return math.pi * int.from_bytes(digest, "big") / 2 ** 64
+
+
+def decision(result):
+    """
+    Decisão binária a partir de contagens ou probabilidades de um qubit.
+    """
+    return "0" if result.get("0", 0) > result.get("1", 0) else "1"
+
+
+class NumpyBackend:
+    """
+    Simulador de statevector embutido (quantum_statevector.py): só NumPy, até
+    MAX_QUBITS qubits, com o lote inteiro simulado de forma vetorizada.
+    """
+
+    name = "numpy"
+
+    def __init__(self, seed=None):
+        from quantum_statevector import StatevectorSimulator
+
+        self.simulator = StatevectorSimulator(seed)
+
+    def compile(self, circuit):
+        return self.simulator.compile(circuit)
+
+    def execute(self, circuit, program, values_list, shots, analytic):
+        import numpy as np
+        from quantum_statevector import to_dicts
+
+        batch = len(values_list)
+        values = {name: np.array([v[name] for v in values_list], dtype=float) for name in circuit.params}
+        if analytic:
+            return to_dicts(self.simulator.probabilities(program, values, batch), circuit.n_qubits)
+        return to_dicts(self.simulator.sample(program, values, batch, shots), circuit.n_qubits, integer=True)
+
+
+class AerBackend:
+    """
+    Simulador do qiskit Aer (`name` é o backend: qasm_simulator, aer_simulator...).
+    O qiskit só é importado quando este backend é usado.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            try:
+                from qiskit_aer import Aer
+            except ImportError:
+                from qiskit import Aer
+            self._backend = Aer.get_backend(self.name)
+        return self._backend
+
+    def compile(self, circuit):
+        from qiskit import QuantumCircuit, transpile
+        from qiskit.circuit import Parameter
+
+        params = {name: Parameter(name) for name in circuit.params}
+        qc = QuantumCircuit(circuit.n_qubits)
+        for name, qubits, param in circuit.gates:
+            if param is None:
+                getattr(qc, name)(*qubits)
+            else:
+                getattr(qc, name)(params.get(param, param), *qubits)
+        # Transpilado com medição para os jobs e sem medição para o modo analítico.
+        return transpile(qc.measure_all(inplace=False), self.backend), qc, params
+
+    def execute(self, circuit, compiled, values_list, shots, analytic):
+        transpiled, unmeasured, params = compiled
+        bindings = [{params[name]: values[name] for name in circuit.params} for values in values_list]
+        if analytic:
+            from qiskit.quantum_info import Statevector
+
+            return [Statevector(unmeasured.assign_parameters(binding)).probabilities_dict()
+                    for binding in bindings]
+        circuits = [transpiled.assign_parameters(binding) if binding else transpiled for binding in bindings]
+        result = self.backend.run(circuits, shots=shots).result()
+        return [result.get_counts(i) for i in range(len(circuits))]
+
+
+def create_backend(name, seed=None):
+    return NumpyBackend(seed) if name == "numpy" else AerBackend(name)
+
+
+class QuantumExecutor:
+    """
+    Executa circuitos sem o custo fixo por chamada.
+
+    - O backend padrão é o simulador NumPy embutido; backend="qasm_simulator" (ou
+      outro nome de backend do Aer) usa o qiskit, importado só nesse caso.
+    - O backend é criado uma única vez e reutilizado.
+    - Cada estrutura de circuito é compilada uma vez e guardada em um cache LRU de
+      até `max_circuits`; as execuções seguintes só ligam os valores dos parâmetros.
+    - `execute_batch` avalia muitos conjuntos de valores em um único job (no NumPy,
+      em um único conjunto de operações vetorizadas).
+    - Com `analytic=True` devolve as probabilidades exatas do statevector, sem shots.
+    """
+
+    def __init__(self, backend="numpy", shots=1000, max_circuits=128, seed=None):
+        self.backend_name = backend
+        self.shots = shots
+        self.max_circuits = max_circuits
+        self.seed = seed
+        self._backend = None
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"acertos": 0, "compilacoes": 0, "jobs": 0, "circuitos_executados": 0, "analiticos": 0}
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv("QUANTUM_SEED")
+        return cls(backend=os.getenv("QUANTUM_BACKEND", "numpy"),
+                   shots=int(os.getenv("QUANTUM_SHOTS", "1000")),
+                   max_circuits=int(os.getenv("QUANTUM_CIRCUIT_CACHE_SIZE", "128")),
+                   seed=int(seed) if seed else None)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend(self.backend_name, self.seed)
+        return self._backend
+
+    def compile(self, circuit):
+        """
+        Circuito compilado pelo backend para a estrutura, do cache quando possível.
+        """
+        with self._lock:
+            compiled = self._compiled.get(circuit)
+            if compiled is not None:
+                self._compiled.move_to_end(circuit)
+                self.metrics["acertos"] += 1
+                return compiled
+        compiled = self.backend.compile(circuit)
+        with self._lock:
+            self.metrics["compilacoes"] += 1
+            self._compiled[circuit] = compiled
+            while len(self._compiled) > self.max_circuits:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def execute(self, circuit, values=None, shots=None, analytic=False):
+        return self.execute_batch(circuit, [values], shots=shots, analytic=analytic)[0]
+
+    def execute_batch(self, circuit, values_list, shots=None, analytic=False):
+        """
+        Avalia o circuito para cada conjunto de valores de `values_list` (uma
+        varredura de parâmetros). Devolve, na mesma ordem, as contagens (em um único
+        job no backend) ou, com analytic, as probabilidades exatas de cada bitstring.
+        """
+        compiled = self.compile(circuit)
+        values_list = [circuit.resolve(values) for values in values_list]
+        results = self.backend.execute(circuit, compiled, values_list, shots or self.shots, analytic)
+        if analytic:
+            self.metrics["analiticos"] += len(values_list)
+        else:
+            self.metrics["jobs"] += 1
+            self.metrics["circuitos_executados"] += len(values_list)
+        return results
+
+    def clear_cache(self):
+        with self._lock:
+            self._compiled.clear()
+
+    def stats(self):
+        return {
+            **self.metrics,
+            "backend": self.backend_name,
+            "circuitos_em_cache": len(self._compiled),
+        }
+
+
+_default_executor = None
+
+def get_quantum_executor():
+    """
+    Executor compartilhado do processo (backend e cache de circuitos únicos),
+    configurado por QUANTUM_BACKEND ("numpy" ou um backend do Aer), QUANTUM_SHOTS,
+    QUANTUM_CIRCUIT_CACHE_SIZE e QUANTUM_SEED.
+    """
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = QuantumExecutor.from_env()
+    return _default_executor
@@ -0,0 +1,203 @@
+from functools import lru_cache
+
+import numpy as np
+
+MAX_QUBITS = 20
+# Tamanho dos blocos em que um lote é simulado. Cada porta percorre o bloco inteiro,
+# então blocos que cabem no cache do processador são bem mais rápidos do que um
+# único array grande (e limitam a memória de lotes com muitos qubits).
+BYTES_PER_CHUNK = 1024 * 1024
+
+_SQRT2 = np.sqrt(0.5)
+FIXED_GATES = {
+    "h": np.array([[_SQRT2, _SQRT2], [_SQRT2, -_SQRT2]], dtype=complex),
+    "x": np.array([[0, 1], [1, 0]], dtype=complex),
+    "y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "z": np.array([[1, 0], [0, -1]], dtype=complex),
+    "s": np.array([[1, 0], [0, 1j]], dtype=complex),
+    "t": np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+}
+
+
+def rotation_matrices(name, theta):
+    """
+    Matrizes 2x2 de rx/ry/rz para um array de ângulos: shape (len(theta), 2, 2).
+    """
+    theta = np.asarray(theta, dtype=float)
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    m = np.zeros(theta.shape + (2, 2), dtype=complex)
+    if name == "rx":
+        m[..., 0, 0] = m[..., 1, 1] = c
+        m[..., 0, 1] = m[..., 1, 0] = -1j * s
+    elif name == "ry":
+        m[..., 0, 0] = m[..., 1, 1] = c
+        m[..., 0, 1] = -s
+        m[..., 1, 0] = s
+    elif name == "rz":
+        m[..., 0, 0] = np.exp(-0.5j * theta)
+        m[..., 1, 1] = np.exp(0.5j * theta)
+    else:
+        raise ValueError(f"Rotação desconhecida: {name}")
+    return m
+
+
+class StatevectorProgram:
+    """
+    Circuito compilado para o StatevectorSimulator: cada porta já resolvida para o
+    eixo do tensor de estado e, quando fixa, para a sua matriz.
+
+    O estado de um lote é um array (lote, 2, ..., 2) em que o qubit q ocupa o eixo
+    n - q, de modo que o índice achatado é o mesmo da base do qiskit (qubit 0 é o
+    bit menos significativo) e as bitstrings saem na mesma convenção.
+    """
+
+    def __init__(self, circuit):
+        if circuit.n_qubits > MAX_QUBITS:
+            raise ValueError(f"O simulador NumPy vai até {MAX_QUBITS} qubits (circuito com {circuit.n_qubits}); "
+                             "use QUANTUM_BACKEND=aer_simulator")
+        self.n_qubits = circuit.n_qubits
+        self.operations = []
+        for name, qubits, param in circuit.gates:
+            axes = tuple(self.axis(q) for q in qubits)
+            if name in FIXED_GATES:
+                self.operations.append(("matrix", axes, FIXED_GATES[name]))
+            elif isinstance(param, str):
+                self.operations.append(("rotation", axes, (name, param)))
+            elif param is not None:
+                self.operations.append(("matrix", axes, rotation_matrices(name, param)))
+            else:
+                self.operations.append((name, axes, None))
+
+    def axis(self, qubit):
+        return self.n_qubits - qubit
+
+    @property
+    def dimension(self):
+        return 2 ** self.n_qubits
+
+
+class StatevectorSimulator:
+    """
+    Simulador de statevector vetorizado em NumPy para circuitos pequenos (até
+    MAX_QUBITS qubits), sem dependências além do NumPy.
+
+    Um lote de conjuntos de parâmetros é simulado de uma vez: o estado tem um eixo
+    de lote e cada porta parametrizada recebe uma matriz por elemento do lote,
+    então uma varredura de parâmetros custa um punhado de operações de array em vez
+    de uma simulação por ponto. Lotes que não cabem em BYTES_PER_CHUNK são
+    processados em blocos.
+    """
+
+    def __init__(self, seed=None, bytes_per_chunk=BYTES_PER_CHUNK):
+        self.rng = np.random.default_rng(seed)
+        self.bytes_per_chunk = bytes_per_chunk
+
+    def compile(self, circuit):
+        return StatevectorProgram(circuit)
+
+    def _apply_1q(self, state, axis, matrix):
+        # Visão (lote, antes, 2, depois) do estado contíguo: as duas metades do eixo
+        # do qubit são combinadas direto, sem transpor o tensor.
+        batch = state.shape[0]
+        v = state.reshape(batch, 2 ** (axis - 1), 2, -1)
+        if matrix.ndim == 3:
+            # Uma matriz por elemento do lote.
+            matrix = matrix[:, None, None, :, :]
+        g00, g01, g10, g11 = matrix[..., 0, 0], matrix[..., 0, 1], matrix[..., 1, 0], matrix[..., 1, 1]
+        zero, one = v[:, :, 0, :], v[:, :, 1, :]
+        if not np.any(g01) and not np.any(g10):
+            # Porta diagonal (z, s, t, rz): só fase, no próprio estado.
+            zero *= g00
+            one *= g11
+            return state
+        new = np.empty_like(v)
+        new[:, :, 0, :] = g00 * zero + g01 * one
+        new[:, :, 1, :] = g10 * zero + g11 * one
+        return new.reshape(state.shape)
+
+    def _apply(self, program, state, values):
+        for kind, axes, data in program.operations:
+            if kind == "matrix":
+                state = self._apply_1q(state, axes[0], data)
+            elif kind == "rotation":
+                name, param = data
+                state = self._apply_1q(state, axes[0], rotation_matrices(name, values[param]))
+            elif kind == "cx":
+                control, target = axes
+                index = [slice(None)] * state.ndim
+                index[control] = 1
+                part = state[tuple(index)]
+                state[tuple(index)] = np.flip(part, axis=target - (target > control)).copy()
+            elif kind == "cz":
+                index = [slice(None)] * state.ndim
+                index[axes[0]] = index[axes[1]] = 1
+                state[tuple(index)] *= -1
+            elif kind == "swap":
+                state = np.ascontiguousarray(np.swapaxes(state, *axes))
+            else:
+                raise ValueError(f"Porta não suportada pelo simulador NumPy: {kind}")
+        return state
+
+    def _chunks(self, program, batch):
+        size = max(1, self.bytes_per_chunk // (16 * program.dimension))
+        for start in range(0, batch, size):
+            yield start, min(batch, start + size)
+
+    def states(self, program, values, batch):
+        """
+        Statevectors (lote, 2**n) para `values` = {param: array (lote,)}.
+        """
+        state = np.zeros((batch,) + (2,) * program.n_qubits, dtype=complex)
+        state.reshape(batch, -1)[:, 0] = 1
+        return self._apply(program, state, values).reshape(batch, -1)
+
+    def probabilities(self, program, values, batch):
+        """
+        Probabilidades exatas (lote, 2**n) de cada estado da base.
+        """
+        out = np.empty((batch, program.dimension))
+        for start, end in self._chunks(program, batch):
+            chunk = {name: v[start:end] for name, v in values.items()}
+            state = self.states(program, chunk, end - start)
+            out[start:end] = state.real ** 2 + state.imag ** 2
+        return out
+
+    def sample(self, program, values, batch, shots):
+        """
+        Contagens (lote, 2**n) de `shots` medições de todos os qubits por elemento.
+        """
+        probabilities = self.probabilities(program, values, batch)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return self.rng.multinomial(shots, probabilities)
+
+
+def labels(indices, n_qubits):
+    """
+    Bitstrings (qubit 0 à direita) dos índices da base, como array de objetos str.
+    """
+    bits = ((indices[:, None] >> np.arange(n_qubits - 1, -1, -1)) & 1).astype(np.uint8) + ord("0")
+    return np.array(bits.view(f"S{n_qubits}").ravel().astype(str).tolist(), dtype=object)
+
+
+@lru_cache(maxsize=None)
+def _all_labels(n_qubits):
+    return labels(np.arange(2 ** n_qubits), n_qubits)
+
+
+def to_dicts(matrix, n_qubits, integer=False):
+    """
+    Converte linhas de contagens ou probabilidades em dicts {bitstring: valor},
+    omitindo os estados com valor zero, como os resultados do qiskit. Cada
+    bitstring é montada uma única vez (até 16 qubits, uma vez por processo) e
+    compartilhada entre as linhas.
+    """
+    rows, indices = np.nonzero(matrix)
+    if n_qubits <= 16:
+        keys = _all_labels(n_qubits)[indices].tolist()
+    else:
+        used, position = np.unique(indices, return_inverse=True)
+        keys = labels(used, n_qubits)[position].tolist()
+    values = matrix[rows, indices]
+    values = (values.astype(np.int64) if integer else values).tolist()
+    bounds = np.searchsorted(rows, np.arange(len(matrix) + 1)).tolist()
+    return [dict(zip(keys[a:b], values[a:b])) for a, b in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# --- Frescor por endpoint ---
+# (regex sobre a URL, segundos em que a resposta é usada sem consultar a API).
+# Depois disso a entrada é revalidada com If-None-Match / If-Modified-Since:
+# um 304 não traz corpo e não conta como leitura nova para a maioria das cotas.
+DEFAULT_TTLS = [
+    (r"graph\.facebook\.com/[^/]+/[^/]+/posts", 60),
+    (r"graph\.facebook\.com/[^/]+/[^/]+/media", 300),
+    (r"api\.twitter\.com/2/users/[^/]+/tweets", 30),
+    (r"open\.tiktokapis\.com/v2/user/info", 3600),
+    (r"googleapis\.com/youtube/v3/", 300),
+]
+
+
+class SocialHTTPCache:
+    """
+    Cache em disco (um arquivo SQLite) das respostas GET das APIs sociais.
+
+    Guarda corpo, ETag e Last-Modified de cada URL+parâmetros. Dentro do TTL do endpoint
+    a resposta é servida sem rede; depois, a requisição vai com os validadores e um 304
+    apenas renova a entrada. As entradas menos usadas recentemente saem primeiro quando
+    o total passa de max_bytes.
+    """
+
+    def __init__(self, path="social_http_cache.sqlite3", max_bytes=256 * 1024 * 1024, ttls=None, default_ttl=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls)]
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT, corpo BLOB NOT NULL,"
+            " tamanho INTEGER NOT NULL, expira_em REAL NOT NULL, usado_em REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_respostas_usado_em ON respostas (usado_em)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        self.metrics = {"hits": 0, "revalidacoes": 0, "revalidacoes_alteradas": 0, "misses": 0,
+                        "bytes_economizados": 0, "despejos": 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cache em SOCIAL_HTTP_CACHE_PATH (vazio desativa), limitado por SOCIAL_HTTP_CACHE_MAX_BYTES.
+        """
+        path = os.getenv("SOCIAL_HTTP_CACHE_PATH", "social_http_cache.sqlite3")
+        if not path:
+            return None
+        return cls(path, max_bytes=int(os.getenv("SOCIAL_HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024))))
+
+    @staticmethod
+    def key(url, params=None):
+        # Os parâmetros incluem o token de acesso: contas diferentes nunca compartilham entradas.
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def ttl(self, url):
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    # --- Consulta / gravação (bloqueantes; o cliente HTTP as chama via asyncio.to_thread) ---
+
+    def lookup(self, url, params=None):
+        """
+        (fresca, corpo, cabeçalhos condicionais) da entrada, ou None se não houver.
+        """
+        key = self.key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, corpo, expira_em FROM respostas WHERE chave = ?", (key,)).fetchone()
+            if row is None:
+                self.metrics["misses"] += 1
+                return None
+            etag, last_modified, body, expires_at = row
+            self._conn.execute("UPDATE respostas SET usado_em = ? WHERE chave = ?", (time.time(), key))
+        if expires_at > time.time():
+            self.metrics["hits"] += 1
+            self.metrics["bytes_economizados"] += len(body)
+            return True, body, {}
+        conditional = {}
+        if etag:
+            conditional["If-None-Match"] = etag
+        if last_modified:
+            conditional["If-Modified-Since"] = last_modified
+        if not conditional:
+            # Sem validadores não há como revalidar: é uma leitura completa.
+            self.metrics["misses"] += 1
+            return None
+        return False, body, conditional
+
+    def mark_not_modified(self, url, params=None):
+        """
+        Registra um 304: a entrada volta a ficar fresca pelo TTL do endpoint.
+        """
+        key = self.key(url, params)
+        with self._lock:
+            row = self._conn.execute("SELECT tamanho FROM respostas WHERE chave = ?", (key,)).fetchone()
+            self._conn.execute("UPDATE respostas SET expira_em = ?, usado_em = ? WHERE chave = ?",
+                               (time.time() + self.ttl(url), time.time(), key))
+        self.metrics["revalidacoes"] += 1
+        if row:
+            self.metrics["bytes_economizados"] += row[0]
+
+    def store(self, url, params, body, headers, revalidated=False):
+        if revalidated:
+            self.metrics["revalidacoes_alteradas"] += 1
+        if "no-store" in headers.get("cache-control", ""):
+            return
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        key = self.key(url, params)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT tamanho FROM respostas WHERE chave = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas (chave, url, etag, last_modified, corpo, tamanho, expira_em, usado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, headers.get("etag"), headers.get("last-modified"), body, size,
+                 now + self.ttl(url), now))
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Menos usadas primeiro, até 90% do limite para não despejar a cada gravação.
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute("SELECT chave, tamanho FROM respostas ORDER BY usado_em").fetchall():
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM respostas WHERE chave = ?", (key,))
+            self._bytes -= size
+            self.metrics["despejos"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM respostas")
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        lookups = self.metrics["hits"] + self.metrics["revalidacoes"] + self.metrics["revalidacoes_alteradas"] \
+            + self.metrics["misses"]
+        served = self.metrics["hits"] + self.metrics["revalidacoes"]
+        return {
+            **self.metrics,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "taxa_aproveitamento": round(served / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# --- Configuração por plataforma ---
+# max_concorrencia: requisições simultâneas permitidas por plataforma.
+# Os hosts de cada plataforma compartilham o mesmo pool keep-alive do cliente.
+PLATFORMS = {
+    "facebook": {"max_concorrencia": 8},
+    "instagram": {"max_concorrencia": 8},
+    "twitter": {"max_concorrencia": 4},
+    "tiktok": {"max_concorrencia": 4},
+    "youtube": {"max_concorrencia": 8},
+    "linkedin": {"max_concorrencia": 4},
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class SocialAPIError(Exception):
+    """
+    Falha definitiva de uma leitura (status não repetível ou tentativas esgotadas).
+    """
+
+    def __init__(self, platform, message, status=None):
+        super().__init__(f"{platform}: {message}")
+        self.platform = platform
+        self.status = status
+
+
+def _retry_after_seconds(value, now=None):
+    """
+    Interpreta o cabeçalho Retry-After, em segundos ou como data HTTP.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, data.timestamp() - (now or time.time()))
+
+
+def _graph_wait(headers):
+    """
+    Graph API (Facebook/Instagram): X-App-Usage e X-Business-Use-Case-Usage trazem o uso em %
+    e, quando bloqueado, estimated_time_to_regain_access em minutos.
+    """
+    wait = None
+    for name in ("x-business-use-case-usage", "x-app-usage", "x-ad-account-usage"):
+        raw = headers.get(name)
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        usages = [u for group in data.values() for u in group] if name == "x-business-use-case-usage" else [data]
+        for usage in usages:
+            minutes = usage.get("estimated_time_to_regain_access") or 0
+            percentages = [usage.get(k, 0) for k in ("call_count", "total_cputime", "total_time")]
+            if minutes:
+                wait = max(wait or 0.0, minutes * 60.0)
+            elif max(percentages) >= 100:
+                wait = max(wait or 0.0, 60.0)
+    return wait
+
+
+def _reset_wait(headers, remaining, reset, now=None):
+    """
+    Cabeçalhos no estilo x-rate-limit-remaining / x-rate-limit-reset (epoch em segundos).
+    """
+    if headers.get(remaining) is None or headers.get(reset) is None:
+        return None
+    try:
+        if int(headers[remaining]) > 0:
+            return None
+        return max(0.0, float(headers[reset]) - (now or time.time()))
+    except ValueError:
+        return None
+
+
+def rate_limit_wait(platform, headers):
+    """
+    Quantos segundos a plataforma pede para esperar antes da próxima chamada, segundo os
+    cabeçalhos da resposta (None quando não há limite atingido).
+    """
+    waits = [_retry_after_seconds(headers.get("retry-after"))]
+    if platform in ("facebook", "instagram"):
+        waits.append(_graph_wait(headers))
+    elif platform == "twitter":
+        waits.append(_reset_wait(headers, "x-rate-limit-remaining", "x-rate-limit-reset"))
+    else:
+        waits.append(_reset_wait(headers, "x-ratelimit-remaining", "x-ratelimit-reset"))
+    waits = [e for e in waits if e is not None]
+    return max(waits) if waits else None
+
+
+class SocialHTTPClient:
+    """
+    Cliente HTTP assíncrono compartilhado pelas leituras das redes sociais.
+
+    Um único httpx.AsyncClient mantém pools keep-alive por host, com timeouts padrão.
+    Cada plataforma tem seu limite de concorrência. Falhas transitórias (429, 5xx,
+    erros de rede) são repetidas com backoff exponencial com jitter, respeitando
+    Retry-After e os cabeçalhos de rate limit de cada plataforma; quando uma resposta
+    indica que a cota acabou, novas chamadas àquela plataforma aguardam o reset.
+    Com um cache (social_cache.SocialHTTPCache), get_json serve respostas frescas do
+    disco e revalida as vencidas com requisições condicionais.
+    """
+
+    def __init__(self, max_retries=4, backoff_base=0.5, backoff_max=30.0, max_wait=900.0,
+                 timeout=None, limits=None, platforms=None, transport=None, cache=None):
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = max_wait
+        self.client = httpx.AsyncClient(
+            timeout=timeout or httpx.Timeout(30.0, connect=5.0),
+            limits=limits or httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+            transport=transport,
+        )
+        self.platforms = {**PLATFORMS, **(platforms or {})}
+        self._semaphores = {name: asyncio.Semaphore(cfg["max_concorrencia"]) for name, cfg in self.platforms.items()}
+        self._paused_until = {}
+        self.metrics = {name: {"requisicoes": 0, "tentativas_extras": 0, "erros": 0, "segundos_em_espera": 0.0}
+                        for name in self.platforms}
+
+    def _backoff(self, attempt):
+        # "Full jitter": espera aleatória entre 0 e o teto exponencial.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _wait_for_pause(self, platform):
+        wait = self._paused_until.get(platform, 0) - time.monotonic()
+        if wait > 0:
+            self.metrics[platform]["segundos_em_espera"] += wait
+            await asyncio.sleep(wait)
+
+    def _pause(self, platform, seconds):
+        until = time.monotonic() + min(seconds, self.max_wait)
+        self._paused_until[platform] = max(self._paused_until.get(platform, 0), until)
+
+    async def request(self, platform, method, url, **kwargs):
+        """
+        Executa a requisição com limite de concorrência e novas tentativas; retorna o httpx.Response.
+        Levanta SocialAPIError em status não repetível ou quando as tentativas se esgotam.
+        """
+        metrics = self.metrics[platform]
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphores[platform]:
+                # Verificada com a vaga já obtida: quem estava na fila também respeita uma pausa
+                # aberta pela resposta anterior.
+                await self._wait_for_pause(platform)
+                metrics["requisicoes"] += 1
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    response, last_error = None, e
+            wait = None
+            if response is not None:
+                wait = rate_limit_wait(platform, response.headers)
+                if wait is not None:
+                    self._pause(platform, wait)
+                if response.status_code < 400:
+                    return response
+                last_error = SocialAPIError(platform, f"HTTP {response.status_code}: {response.text[:200]}",
+                                            response.status_code)
+                if response.status_code not in RETRYABLE_STATUS:
+                    metrics["erros"] += 1
+                    raise last_error
+            if attempt == self.max_retries:
+                break
+            metrics["tentativas_extras"] += 1
+            if wait is None:
+                wait = self._backoff(attempt)
+                metrics["segundos_em_espera"] += wait
+                await asyncio.sleep(wait)
+        metrics["erros"] += 1
+        if isinstance(last_error, SocialAPIError):
+            raise last_error
+        raise SocialAPIError(platform, f"falha de rede após {self.max_retries + 1} tentativas: {last_error!r}")
+
+    async def get_json(self, platform, url, params=None, headers=None):
+        data, _ = await self.get_json_with_source(platform, url, params=params, headers=headers)
+        return data
+
+    async def get_json_with_source(self, platform, url, params=None, headers=None, before_request=None):
+        """
+        (JSON, origem): origem é "cache" (servido dentro do TTL, sem rede), "revalidado"
+        (304 para a requisição condicional) ou "rede". `before_request`, se dado, é
+        aguardado logo antes de a requisição sair (ex.: para reservar cota).
+        """
+        entry = None
+        if self.cache is not None:
+            entry = await asyncio.to_thread(self.cache.lookup, url, params)
+            if entry is not None and entry[0]:
+                return json.loads(entry[1]), "cache"
+        conditional = entry[2] if entry is not None else {}
+        if before_request is not None:
+            await before_request()
+        response = await self.request(platform, "GET", url, params=params, headers={**(headers or {}), **conditional})
+        if self.cache is None:
+            return response.json(), "rede"
+        if response.status_code == 304 and entry is not None:
+            await asyncio.to_thread(self.cache.mark_not_modified, url, params)
+            return json.loads(entry[1]), "revalidado"
+        await asyncio.to_thread(self.cache.store, url, params, response.content, response.headers,
+                                entry is not None)
+        return response.json(), "rede"
+
+    async def aclose(self):
+        await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+_default_client = None
+
+def get_social_client():
+    """
+    Cliente compartilhado do processo, criado no primeiro uso, com o cache em disco
+    configurado por SOCIAL_HTTP_CACHE_PATH.
+    """
+    global _default_client
+    if _default_client is None:
+        from social_cache import SocialHTTPCache
+
+        _default_client = SocialHTTPClient(cache=SocialHTTPCache.from_env())
+    return _default_client
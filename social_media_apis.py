@@ -1,8 +1,13 @@
+import asyncio
 import requests
 import json
+import re
 import time
 import random
-from datetime import datetime, timedelta
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 
 # --- Funções de Suporte para Maestria Universal ---
 def generate_human_like_text(prompt, length=50, creativity=0.7): # Placeholder para um LLM
@@ -33,6 +38,100 @@ def analyze_sentiment(text): # Placeholder para um modelo de análise de sentime
     else:
         return "neutro"
 
+# Léxico usado pela análise em lote: termo -> peso (positivo > 0, negativo < 0).
+# Os termos casam como substrings do texto em minúsculas, como em analyze_sentiment.
+SENTIMENT_LEXICON = {
+    "ótimo": 1.0,
+    "excelente": 1.0,
+    "ruim": -1.0,
+    "péssimo": -1.0,
+}
+
+SENTIMENT_LABELS = np.array(["negativo", "neutro", "positivo"])
+
+def compile_sentiment_lexicon(lexicon=None):
+    """
+    Compila cada termo do léxico em um padrão literal, com o peso correspondente.
+    Cada termo é buscado de forma independente, como os testes de substring de analyze_sentiment.
+    """
+    lexicon = SENTIMENT_LEXICON if lexicon is None else lexicon
+    return [(re.compile(re.escape(term.lower())), float(weight)) for term, weight in lexicon.items()]
+
+_COMPILED_LEXICON = compile_sentiment_lexicon()
+
+def _score_chunk_lexicon(texts, compiled):
+    """
+    Pontua um bloco de textos de uma vez: os textos são unidos em uma única string,
+    cada termo é buscado em uma só passada e as ocorrências são atribuídas aos textos
+    com searchsorted; os pesos são somados por texto com bincount.
+    """
+    n = len(texts)
+    # Minúsculas por texto: lower() pode mudar o comprimento (ex.: "İ"), o que deslocaria os offsets.
+    lowered = [text.lower() for text in texts]
+    blob = "\x00".join(lowered)
+    lengths = np.fromiter((len(t) + 1 for t in lowered), dtype=np.int64, count=n)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    scores = np.zeros(n)
+    has_positive = np.zeros(n, dtype=bool)
+    has_negative = np.zeros(n, dtype=bool)
+    for pattern, weight in compiled:
+        positions = np.fromiter((m.start() for m in pattern.finditer(blob)), dtype=np.int64)
+        if not len(positions):
+            continue
+        counts = np.bincount(np.searchsorted(starts, positions, side="right") - 1, minlength=n)
+        scores += weight * counts
+        if weight > 0:
+            has_positive |= counts > 0
+        elif weight < 0:
+            has_negative |= counts > 0
+    # Mesma precedência de analyze_sentiment: qualquer termo positivo vence.
+    label_index = np.where(has_positive, 2, np.where(has_negative, 0, 1))
+    return scores, label_index
+
+def _score_chunk_model(texts, model):
+    """
+    Pontua com um modelo no formato do pipeline do Hugging Face
+    (lista de textos -> lista de {"label", "score"}).
+    """
+    outputs = model(list(texts))
+    labels = np.array([str(o["label"]).upper() for o in outputs])
+    confidence = np.array([float(o["score"]) for o in outputs])
+    positive = np.char.startswith(labels, "POS") | (labels == "LABEL_1")
+    negative = np.char.startswith(labels, "NEG") | (labels == "LABEL_0")
+    scores = np.where(positive, confidence, np.where(negative, -confidence, 0.0))
+    label_index = np.where(positive, 2, np.where(negative, 0, 1))
+    return scores, label_index
+
+def iter_sentiment_batches(texts, model=None, lexicon=None, chunk_size=10000):
+    """
+    Versão em streaming de analyze_sentiment_batch: consome qualquer iterável de textos
+    em blocos de chunk_size e gera (scores, labels) para cada bloco.
+    """
+    compiled = _COMPILED_LEXICON if lexicon is None else compile_sentiment_lexicon(lexicon)
+    iterator = iter(texts)
+    while True:
+        chunk = [text or "" for text in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+        if model is not None:
+            scores, label_index = _score_chunk_model(chunk, model)
+        else:
+            scores, label_index = _score_chunk_lexicon(chunk, compiled)
+        yield scores, SENTIMENT_LABELS[label_index]
+
+def analyze_sentiment_batch(texts, model=None, lexicon=None, chunk_size=10000):
+    """
+    Analisa o sentimento de muitos textos (lista ou qualquer iterável) de uma vez.
+    Retorna (scores, labels): scores é um array float com a soma dos pesos do léxico
+    (ou a confiança com sinal do modelo) e labels um array com "positivo", "negativo"
+    ou "neutro". Sem modelo, os rótulos coincidem com os de analyze_sentiment.
+    model: opcional, chamável no formato do pipeline do Hugging Face.
+    """
+    parts = list(iter_sentiment_batches(texts, model=model, lexicon=lexicon, chunk_size=chunk_size))
+    if not parts:
+        return np.zeros(0), np.array([], dtype=SENTIMENT_LABELS.dtype)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
 def human_like_delay(min_seconds=1, max_seconds=5):
     """
     Adiciona um atraso aleatório para simular comportamento humano.
@@ -192,11 +291,225 @@ def get_youtube_channel_videos(api_key, channel_id):
         print(f"Erro ao obter vídeos do YouTube: {e}")
         return None
 
+# --- Leituras assíncronas (cliente compartilhado com pool, timeouts e novas tentativas) ---
+# Mesmos endpoints e parâmetros das funções acima, via social_http.SocialHTTPClient.
+# Retornam o JSON ou None em caso de erro, como as versões síncronas.
+
+async def _get_json_async(platform, url, params=None, headers=None, client=None, error_message="Erro na leitura"):
+    from social_http import SocialAPIError, get_social_client
+
+    client = client or get_social_client()
+    try:
+        return await client.get_json(platform, url, params=params, headers=headers)
+    except (SocialAPIError, ValueError) as e:
+        print(f"{error_message}: {e}")
+        return None
+
+async def get_facebook_page_posts_async(access_token, page_id, client=None):
+    url = f"https://graph.facebook.com/v19.0/{page_id}/posts"
+    params = {
+        "access_token": access_token,
+        "fields": "id,message,created_time,comments.summary(true),likes.summary(true)"
+    }
+    return await _get_json_async("facebook", url, params=params, client=client,
+                                 error_message="Erro ao obter posts do Facebook")
+
+async def get_twitter_user_tweets_async(bearer_token, user_id, client=None):
+    url = f"https://api.twitter.com/2/users/{user_id}/tweets"
+    headers = {"Authorization": f"Bearer {bearer_token}"}
+    params = {"tweet.fields": "created_at,public_metrics,lang"}
+    return await _get_json_async("twitter", url, params=params, headers=headers, client=client,
+                                 error_message="Erro ao obter tweets do Twitter/X")
+
+async def get_instagram_user_media_async(access_token, instagram_business_account_id, client=None):
+    url = f"https://graph.facebook.com/v19.0/{instagram_business_account_id}/media"
+    params = {
+        "access_token": access_token,
+        "fields": "id,caption,media_type,media_url,permalink,thumbnail_url,timestamp,username,comments_count,like_count"
+    }
+    return await _get_json_async("instagram", url, params=params, client=client,
+                                 error_message="Erro ao obter mídias do Instagram")
+
+async def get_tiktok_user_info_async(access_token, client=None):
+    url = "https://open.tiktokapis.com/v2/user/info/"
+    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+    params = {"fields": "open_id,union_id,avatar_url,display_name"}
+    return await _get_json_async("tiktok", url, params=params, headers=headers, client=client,
+                                 error_message="Erro ao obter informações do usuário TikTok")
+
+async def get_youtube_channel_videos_async(api_key, channel_id, client=None):
+    url = "https://www.googleapis.com/youtube/v3/search"
+    params = {
+        "key": api_key,
+        "channelId": channel_id,
+        "part": "snippet,id",
+        "order": "date",
+        "type": "video"
+    }
+    return await _get_json_async("youtube", url, params=params, client=client,
+                                 error_message="Erro ao obter vídeos do YouTube")
+
+# --- Paginação por cursor em streaming (geradores assíncronos) ---
+# Seguem paging.next (Graph API) e nextPageToken (YouTube), buscando a próxima página
+# enquanto o chamador processa a atual. No máximo `prefetch` páginas ficam em memória
+# além da atual, qualquer que seja o tamanho do histórico da conta.
+
+def _parse_date(value):
+    """
+    Converte datas ISO 8601 das APIs ("...+0000", "...Z") e datetimes ingênuos para UTC.
+    """
+    if isinstance(value, datetime):
+        data = value
+    else:
+        data = datetime.fromisoformat(str(value))
+    return data if data.tzinfo else data.replace(tzinfo=timezone.utc)
+
+_END_OF_PAGES = object()
+
+async def _paginate(fetch_page, page_items, next_cursor, item_date=None, max_items=None,
+                    max_pages=None, since=None, prefetch=1):
+    """
+    Núcleo dos geradores paginados. fetch_page(cursor) retorna o JSON de uma página
+    (cursor None = primeira); a busca roda em uma tarefa que se mantém até `prefetch`
+    páginas à frente do consumidor. Para em max_items, max_pages ou no primeiro item
+    anterior a `since` (as APIs retornam do mais recente para o mais antigo). Um erro
+    de fetch_page é levantado para o consumidor depois das páginas já buscadas,
+    nunca tratado como fim dos dados.
+    """
+    since = _parse_date(since) if since is not None else None
+    queue = asyncio.Queue(maxsize=max(1, prefetch))
+
+    async def producer():
+        cursor, pages = None, 0
+        try:
+            while max_pages is None or pages < max_pages:
+                page = await fetch_page(cursor)
+                pages += 1
+                if not page:
+                    break
+                await queue.put(page)
+                cursor = next_cursor(page)
+                if not cursor:
+                    break
+        except asyncio.CancelledError:
+            # O consumidor parou antes: ninguém mais lê a fila.
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_END_OF_PAGES)
+
+    task = asyncio.create_task(producer())
+    delivered = 0
+    try:
+        while True:
+            page = await queue.get()
+            if page is _END_OF_PAGES:
+                return
+            if isinstance(page, Exception):
+                raise page
+            for item in page_items(page):
+                if since is not None and item_date and _parse_date(item_date(item)) < since:
+                    return
+                yield item
+                delivered += 1
+                if max_items is not None and delivered >= max_items:
+                    return
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+def _graph_next_cursor(page):
+    return (page.get("paging") or {}).get("next")
+
+async def _fetch_page(platform, url, params, client, headers=None):
+    # Ao contrário de _get_json_async, levanta SocialAPIError: uma página que falhou
+    # não pode parecer a última.
+    from social_http import get_social_client
+
+    return await (client or get_social_client()).get_json(platform, url, params=params, headers=headers)
+
+async def _fetch_graph_page(platform, url, params, cursor, client):
+    # paging.next já traz todos os parâmetros (inclusive o token e o cursor "after").
+    return await _fetch_page(platform, cursor or url, None if cursor else params, client)
+
+def iter_facebook_page_posts(access_token, page_id, max_items=None, since=None, max_pages=None,
+                             page_size=25, prefetch=1, client=None):
+    """
+    Todos os posts da página, do mais recente ao mais antigo, como gerador assíncrono.
+    since: datetime ou string ISO; também é enviado como `since` para a Graph API filtrar no servidor.
+    """
+    url = f"https://graph.facebook.com/v19.0/{page_id}/posts"
+    params = {
+        "access_token": access_token,
+        "fields": "id,message,created_time,comments.summary(true),likes.summary(true)",
+        "limit": page_size,
+    }
+    if since is not None:
+        params["since"] = int(_parse_date(since).timestamp())
+    return _paginate(
+        lambda cursor: _fetch_graph_page("facebook", url, params, cursor, client),
+        lambda page: page.get("data", []), _graph_next_cursor, lambda item: item["created_time"],
+        max_items=max_items, max_pages=max_pages, since=since, prefetch=prefetch,
+    )
+
+def iter_instagram_user_media(access_token, instagram_business_account_id, max_items=None, since=None,
+                              max_pages=None, page_size=25, prefetch=1, client=None):
+    """
+    Todas as mídias da conta do Instagram, da mais recente à mais antiga, como gerador assíncrono.
+    """
+    url = f"https://graph.facebook.com/v19.0/{instagram_business_account_id}/media"
+    params = {
+        "access_token": access_token,
+        "fields": "id,caption,media_type,media_url,permalink,thumbnail_url,timestamp,username,comments_count,like_count",
+        "limit": page_size,
+    }
+    if since is not None:
+        params["since"] = int(_parse_date(since).timestamp())
+    return _paginate(
+        lambda cursor: _fetch_graph_page("instagram", url, params, cursor, client),
+        lambda page: page.get("data", []), _graph_next_cursor, lambda item: item["timestamp"],
+        max_items=max_items, max_pages=max_pages, since=since, prefetch=prefetch,
+    )
+
+def iter_youtube_channel_videos(api_key, channel_id, max_items=None, since=None, max_pages=None,
+                                page_size=50, prefetch=1, client=None):
+    """
+    Todos os vídeos do canal, do mais recente ao mais antigo, seguindo nextPageToken.
+    since também é enviado como `publishedAfter`.
+    """
+    url = "https://www.googleapis.com/youtube/v3/search"
+    params = {
+        "key": api_key,
+        "channelId": channel_id,
+        "part": "snippet,id",
+        "order": "date",
+        "type": "video",
+        "maxResults": page_size,
+    }
+    if since is not None:
+        params["publishedAfter"] = _parse_date(since).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    async def fetch(cursor):
+        page_params = {**params, "pageToken": cursor} if cursor else params
+        return await _fetch_page("youtube", url, page_params, client)
+
+    return _paginate(
+        fetch, lambda page: page.get("items", []), lambda page: page.get("nextPageToken"),
+        lambda item: item["snippet"]["publishedAt"],
+        max_items=max_items, max_pages=max_pages, since=since, prefetch=prefetch,
+    )
+
 # --- Exemplo de uso (substitua com seus tokens e IDs reais) ---
 if __name__ == "__main__":
     print("\n--- Testando Funções de Suporte ---")
-    print(f"Texto gerado: {generate_human_like_text("Qual a sua opinião sobre IA?")}")
+    print(f"Texto gerado: {generate_human_like_text('Qual a sua opinião sobre IA?')}")
     print(f"Sentimento de 'Adorei o resultado!': {analyze_sentiment('Adorei o resultado!')}")
+    scores, labels = analyze_sentiment_batch(["Serviço excelente", "Atendimento péssimo", "Chegou hoje"])
+    print(f"Sentimento em lote: {list(zip(labels.tolist(), scores.tolist()))}")
     human_like_delay(1, 2)
 
     # --- Exemplo de Fluxo de Interação para Maestria Universal (Conceitual) ---
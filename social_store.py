@@ -0,0 +1,339 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import social_media_apis
+
+# Esquema comum das publicações de todas as plataformas (nome, tipo SQLite).
+# O JSON original fica à parte, em `brutos`, e só é lido quando pedido.
+COLUMNS = [
+    ("id", "TEXT NOT NULL"),
+    ("plataforma", "TEXT NOT NULL"),
+    ("tipo", "TEXT NOT NULL"),
+    ("autor", "TEXT"),
+    ("publicado_em", "INTEGER NOT NULL"),  # segundos desde a época, UTC
+    ("dia", "TEXT NOT NULL"),  # AAAA-MM-DD (UTC)
+    ("texto", "TEXT"),
+    ("url", "TEXT"),
+    ("curtidas", "INTEGER NOT NULL DEFAULT 0"),
+    ("comentarios", "INTEGER NOT NULL DEFAULT 0"),
+    ("compartilhamentos", "INTEGER NOT NULL DEFAULT 0"),
+    ("visualizacoes", "INTEGER NOT NULL DEFAULT 0"),
+    ("engajamento", "INTEGER NOT NULL DEFAULT 0"),  # curtidas + comentários + compartilhamentos
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+METRICS = ("curtidas", "comentarios", "compartilhamentos", "visualizacoes", "engajamento")
+GROUPINGS = ("plataforma", "tipo", "autor", "dia")
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _total(summary):
+    # Campos como reactions/comments da Graph API: {"summary": {"total_count": N}}.
+    return _int(((summary or {}).get("summary") or {}).get("total_count"))
+
+
+def _facebook(item, author):
+    return {
+        "id": item["id"], "tipo": "post", "autor": (item.get("from") or {}).get("id") or author,
+        "publicado_em": item["created_time"], "texto": item.get("message"), "url": item.get("permalink_url"),
+        "curtidas": _total(item.get("reactions")) or _int(item.get("like_count")),
+        "comentarios": _total(item.get("comments")) or _int(item.get("comments_count")),
+        "compartilhamentos": _int((item.get("shares") or {}).get("count")),
+    }
+
+
+def _instagram(item, author):
+    return {
+        "id": item["id"], "tipo": (item.get("media_type") or "media").lower(),
+        "autor": item.get("username") or (item.get("owner") or {}).get("id") or author,
+        "publicado_em": item["timestamp"], "texto": item.get("caption"), "url": item.get("permalink"),
+        "curtidas": _int(item.get("like_count")), "comentarios": _int(item.get("comments_count")),
+        "visualizacoes": _int(item.get("video_views") or item.get("plays")),
+    }
+
+
+def _twitter(item, author):
+    metrics = item.get("public_metrics") or {}
+    return {
+        "id": item["id"], "tipo": "tweet", "autor": item.get("author_id") or author,
+        "publicado_em": item["created_at"], "texto": item.get("text"),
+        "url": f"https://x.com/i/web/status/{item['id']}",
+        "curtidas": _int(metrics.get("like_count")), "comentarios": _int(metrics.get("reply_count")),
+        "compartilhamentos": _int(metrics.get("retweet_count")) + _int(metrics.get("quote_count")),
+        "visualizacoes": _int(metrics.get("impression_count")),
+    }
+
+
+def _youtube(item, author):
+    # Aceita itens de search.list ({"id": {"videoId"}}), playlistItems.list
+    # (contentDetails.videoId) e videos.list ({"id": "...", "statistics"}).
+    snippet = item.get("snippet") or {}
+    details = item.get("contentDetails") or {}
+    video_id = item["id"]["videoId"] if isinstance(item.get("id"), dict) else details.get("videoId") or item["id"]
+    stats = item.get("statistics") or {}
+    return {
+        "id": video_id, "tipo": "video", "autor": snippet.get("channelId") or author,
+        "publicado_em": details.get("videoPublishedAt") or snippet["publishedAt"], "texto": snippet.get("title"),
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "curtidas": _int(stats.get("likeCount")), "comentarios": _int(stats.get("commentCount")),
+        "visualizacoes": _int(stats.get("viewCount")),
+    }
+
+
+NORMALIZERS = {"facebook": _facebook, "instagram": _instagram, "twitter": _twitter, "youtube": _youtube}
+
+
+def normalize(platform, item, author=None):
+    """
+    Converte um item cru da API da plataforma para o esquema comum (COLUNAS).
+    `author` é usado quando o item não traz o seu (ex.: posts lidos de uma página).
+    """
+    row = {"curtidas": 0, "comentarios": 0, "compartilhamentos": 0, "visualizacoes": 0,
+           **NORMALIZERS[platform](item, author), "plataforma": platform}
+    data = social_media_apis._parse_date(row["publicado_em"]).astimezone(timezone.utc)
+    row["publicado_em"] = int(data.timestamp())
+    row["dia"] = data.date().isoformat()
+    row["engajamento"] = row["curtidas"] + row["comentarios"] + row["compartilhamentos"]
+    return row
+
+
+def _epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return int((value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp())
+    return int(social_media_apis._parse_date(value).timestamp())
+
+
+class SocialStore:
+    """
+    Armazém local (SQLite) das publicações lidas das redes sociais, no esquema comum.
+
+    As linhas são particionadas por plataforma e mês: cada partição é uma tabela própria
+    (`pub_<plataforma>_<AAAAMM>`), registrada no catálogo `particoes` com o intervalo de
+    datas que contém. Consultas só abrem as partições da plataforma e do período pedidos
+    e leem apenas as colunas necessárias; índices por data, autor e engajamento atendem
+    os filtros sem varrer a tabela. O JSON original fica na tabela `brutos` e só é
+    desserializado por raw().
+    """
+
+    def __init__(self, path="social_store.sqlite3", keep_raw=True):
+        self.path = path
+        self.keep_raw = keep_raw
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS particoes ("
+            " tabela TEXT PRIMARY KEY, plataforma TEXT NOT NULL, mes TEXT NOT NULL,"
+            " inicio INTEGER NOT NULL, fim INTEGER NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS brutos ("
+            " plataforma TEXT NOT NULL, id TEXT NOT NULL, dados TEXT NOT NULL, PRIMARY KEY (plataforma, id))"
+            " WITHOUT ROWID")
+        # Partições que este processo já sabe existir; o catálogo (com os intervalos) é a
+        # fonte de verdade, compartilhada com outras instâncias sobre o mesmo arquivo.
+        self._partitions = {table for table, in self._conn.execute("SELECT tabela FROM particoes")}
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("SOCIAL_STORE_PATH", "social_store.sqlite3"),
+                   keep_raw=os.getenv("SOCIAL_STORE_RAW", "true").lower() != "false")
+
+    # --- Partições ---
+
+    @staticmethod
+    def partition_name(platform, day):
+        return f"pub_{re.sub(r'[^a-z0-9]', '_', platform.lower())}_{day[:4]}{day[5:7]}"
+
+    def _create_partition(self, table, platform, day):
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in COLUMNS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns}, PRIMARY KEY (id))")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_data ON {table} (publicado_em)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_autor ON {table} (autor, publicado_em)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_engajamento ON {table} (engajamento)")
+        self._conn.execute("INSERT OR IGNORE INTO particoes (tabela, plataforma, mes, inicio, fim)"
+                           " VALUES (?, ?, ?, ?, ?)", (table, platform, day[:7], 2 ** 62, -2 ** 62))
+
+    def partitions(self, platforms=None, since=None, until=None):
+        """
+        Tabelas de partição que podem conter linhas das plataformas e do intervalo dados.
+        """
+        if isinstance(platforms, str):
+            platforms = [platforms]
+        since, until = _epoch(since), _epoch(until)
+        with self._lock:
+            rows = self._conn.execute("SELECT tabela, plataforma, inicio, fim FROM particoes ORDER BY mes").fetchall()
+        return [table for table, platform, start, end in rows
+                if (not platforms or platform in platforms)
+                and (since is None or end >= since)
+                and (until is None or start < until)]
+
+    # --- Ingestão ---
+
+    def ingest(self, platform, items, author=None):
+        """
+        Normaliza e grava os itens (upsert por id); retorna quantas linhas foram gravadas.
+        Tudo entra em uma transação, agrupado por partição.
+        """
+        by_partition = {}
+        raw_rows = []
+        for item in items:
+            row = normalize(platform, item, author)
+            by_partition.setdefault(self.partition_name(platform, row["dia"]), []).append(row)
+            if self.keep_raw:
+                raw_rows.append((platform, row["id"], json.dumps(item, ensure_ascii=False)))
+        if not by_partition:
+            return 0
+        placeholders = ", ".join("?" for _ in COLUMN_NAMES)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in COLUMN_NAMES if name != "id")
+        with self._lock:
+            # IMMEDIATE: outra instância sobre o mesmo arquivo espera em vez de falhar no meio.
+            self._conn.execute("BEGIN IMMEDIATE")
+            created = []
+            try:
+                for table, rows in by_partition.items():
+                    if table not in self._partitions:
+                        self._create_partition(table, platform, rows[0]["dia"])
+                        created.append(table)
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(COLUMN_NAMES)}) VALUES ({placeholders})"
+                        f" ON CONFLICT (id) DO UPDATE SET {updates}",
+                        [tuple(row[name] for name in COLUMN_NAMES) for row in rows])
+                    self._conn.execute("UPDATE particoes SET inicio = MIN(inicio, ?), fim = MAX(fim, ?)"
+                                       " WHERE tabela = ?",
+                                       (min(row["publicado_em"] for row in rows),
+                                        max(row["publicado_em"] for row in rows), table))
+                if raw_rows:
+                    self._conn.executemany("INSERT OR REPLACE INTO brutos (plataforma, id, dados) VALUES (?, ?, ?)",
+                                           raw_rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._partitions.update(created)
+        return sum(len(rows) for rows in by_partition.values())
+
+    async def ingest_async(self, platform, items, author=None, batch_size=500):
+        """
+        Consome um iterável assíncrono (ex.: iter_facebook_page_posts ou SocialSync)
+        gravando em lotes de `batch_size` itens fora do event loop; retorna o total gravado.
+        """
+        total = 0
+        pending = []
+        async for item in items:
+            pending.append(item)
+            if len(pending) >= batch_size:
+                total += await asyncio.to_thread(self.ingest, platform, pending, author)
+                pending = []
+        if pending:
+            total += await asyncio.to_thread(self.ingest, platform, pending, author)
+        return total
+
+    # --- Consultas ---
+
+    @staticmethod
+    def _where(author, since, until, min_engagement):
+        conditions, params = [], []
+        if author is not None:
+            conditions.append("autor = ?")
+            params.append(author)
+        if since is not None:
+            conditions.append("publicado_em >= ?")
+            params.append(_epoch(since))
+        if until is not None:
+            conditions.append("publicado_em < ?")
+            params.append(_epoch(until))
+        if min_engagement is not None:
+            conditions.append("engajamento >= ?")
+            params.append(min_engagement)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def _union(self, columns, platforms, author, since, until, min_engagement):
+        tables = self.partitions(platforms, since, until)
+        if not tables:
+            return None, []
+        where, params = self._where(author, since, until, min_engagement)
+        sql = " UNION ALL ".join(f"SELECT {', '.join(columns)} FROM {table}{where}" for table in tables)
+        return sql, params * len(tables)
+
+    def query(self, columns=("plataforma", "id", "autor", "publicado_em", "engajamento"), platforms=None,
+              author=None, since=None, until=None, min_engagement=None, order_by="publicado_em",
+              descending=True, limit=None):
+        """
+        Linhas (dicts com só as `columns` pedidas) filtradas por plataforma, autor,
+        intervalo [since, until) e engajamento mínimo. Datas aceitam ISO, datetime ou época.
+        """
+        columns = list(columns)
+        for name in columns + ([order_by] if order_by else []):
+            if name not in COLUMN_NAMES:
+                raise ValueError(f"Coluna desconhecida: {name}")
+        selected = columns + ([order_by] if order_by and order_by not in columns else [])
+        sql, params = self._union(selected, platforms, author, since, until, min_engagement)
+        if sql is None:
+            return []
+        sql = f"SELECT {', '.join(columns)} FROM ({sql})"
+        if order_by:
+            sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def most_engaged(self, n=10, **filters):
+        return self.query(columns=("plataforma", "id", "autor", "publicado_em", "texto", "url", "engajamento"),
+                          order_by="engajamento", limit=n, **filters)
+
+    def aggregate(self, by="autor", metric="engajamento", platforms=None, author=None, since=None, until=None,
+                  min_engagement=None, limit=None):
+        """
+        Por grupo (`by`: plataforma, tipo, autor ou dia): publicações, soma e média da
+        métrica, em ordem decrescente da soma.
+        """
+        if by not in GROUPINGS:
+            raise ValueError(f"Agrupamento não suportado: {by}")
+        if metric not in METRICS:
+            raise ValueError(f"Métrica não suportada: {metric}")
+        sql, params = self._union(sorted({by, metric}), platforms, author, since, until, min_engagement)
+        if sql is None:
+            return []
+        sql = (f"SELECT {by}, COUNT(*), SUM({metric}), AVG({metric}) FROM ({sql})"
+               f" GROUP BY {by} ORDER BY SUM({metric}) DESC")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{by: group, "publicacoes": n, "total": total, "media": mean} for group, n, total, mean in rows]
+
+    def count(self, platforms=None, **filters):
+        sql, params = self._union(["id"], platforms, filters.get("author"), filters.get("since"),
+                                  filters.get("until"), filters.get("min_engagement"))
+        if sql is None:
+            return 0
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    def raw(self, platform, item_id):
+        """
+        O JSON original do item, como veio da API (None se não guardado).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT dados FROM brutos WHERE plataforma = ? AND id = ?",
+                                     (platform, item_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,269 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import timezone
+
+import numpy as np
+
+import social_media_apis
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom escalável para IDs já vistos.
+
+    Cada camada é dimensionada para `capacity` itens com taxa de falso positivo
+    `fp_rate`; quando enche, uma nova camada (com o dobro da capacidade e taxa menor)
+    é aberta, de modo que a taxa total fica limitada por ~2 * fp_rate. Um falso
+    positivo descarta um item novo; por isso o padrão é bem baixo (1e-6).
+    """
+
+    def __init__(self, capacity=100_000, fp_rate=1e-6):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.layers = []  # (bits: np.ndarray[uint8], m, k, capacity, n)
+        self._add_layer()
+
+    def _add_layer(self):
+        level = len(self.layers)
+        capacity = self.capacity * 2 ** level
+        rate = self.fp_rate / 2 ** (level + 1)
+        m = max(64, int(math.ceil(-capacity * math.log(rate) / math.log(2) ** 2)))
+        k = max(1, int(round(m / capacity * math.log(2))))
+        self.layers.append([np.zeros((m + 7) // 8, dtype=np.uint8), m, k, capacity, 0])
+
+    @staticmethod
+    def _hashes(item):
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    @staticmethod
+    def _positions(h1, h2, m, k):
+        # Hashing duplo (Kirsch-Mitzenmacher): k posições a partir de dois hashes.
+        return [(h1 + i * h2) % m for i in range(k)]
+
+    def __contains__(self, item):
+        h1, h2 = self._hashes(item)
+        for bits, m, k, _, _ in self.layers:
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(h1, h2, m, k)):
+                return True
+        return False
+
+    def add(self, item):
+        """
+        Adiciona o item; retorna False se ele (provavelmente) já estava no filtro.
+        """
+        if item in self:
+            return False
+        layer = self.layers[-1]
+        if layer[4] >= layer[3]:
+            self._add_layer()
+            layer = self.layers[-1]
+        bits, m, k = layer[0], layer[1], layer[2]
+        h1, h2 = self._hashes(item)
+        for p in self._positions(h1, h2, m, k):
+            bits[p >> 3] |= 1 << (p & 7)
+        layer[4] += 1
+        return True
+
+    def __len__(self):
+        return sum(layer[4] for layer in self.layers)
+
+    @property
+    def bytes(self):
+        return sum(layer[0].nbytes for layer in self.layers)
+
+    def serialize(self):
+        header = np.array([self.capacity, len(self.layers)] + [c[4] for c in self.layers], dtype=np.int64)
+        return np.float64(self.fp_rate).tobytes() + header.tobytes() + b"".join(c[0].tobytes() for c in self.layers)
+
+    @classmethod
+    def deserialize(cls, data):
+        fp_rate = float(np.frombuffer(data[:8], dtype=np.float64)[0])
+        capacity, n_layers = np.frombuffer(data[8:24], dtype=np.int64)
+        counts = np.frombuffer(data[24:24 + 8 * int(n_layers)], dtype=np.int64)
+        bloom_filter = cls(int(capacity), fp_rate)
+        bloom_filter.layers = []
+        offset = 24 + 8 * int(n_layers)
+        for count in counts:
+            bloom_filter._add_layer()
+            layer = bloom_filter.layers[-1]
+            size = layer[0].nbytes
+            layer[0] = np.frombuffer(data[offset:offset + size], dtype=np.uint8).copy()
+            layer[4] = int(count)
+            offset += size
+        return bloom_filter
+
+
+class SocialSync:
+    """
+    Sincronização incremental das leituras sociais.
+
+    Para cada (plataforma, recurso) guarda uma marca d'água (a data ou o ID mais recente
+    já processado) e um filtro de Bloom dos IDs vistos, em um arquivo SQLite próprio.
+    Cada sincronização pede à API só o que é mais novo que a marca (`since`,
+    `publishedAfter`, `since_id`) e descarta os itens já vistos antes de entregá-los.
+
+    Um item só é marcado como visto depois que o consumidor o processa (quando o
+    gerador é retomado), e a marca d'água só avança quando a fonte chega ao fim sem
+    erro e sem corte por max_items/max_pages; uma sincronização interrompida ou que
+    falhou (o erro da leitura é levantado para o consumidor) retoma de onde a marca
+    estava, e o filtro evita reprocessar o que já tinha sido entregue.
+    """
+
+    def __init__(self, path="social_sync.sqlite3", filter_capacity=100_000, fp_rate=1e-6):
+        self.path = path
+        self.filter_capacity = filter_capacity
+        self.fp_rate = fp_rate
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS marcas_dagua ("
+            " plataforma TEXT NOT NULL, recurso TEXT NOT NULL, valor TEXT, atualizado_em REAL NOT NULL,"
+            " PRIMARY KEY (plataforma, recurso))")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS filtros_dedup ("
+            " plataforma TEXT NOT NULL, recurso TEXT NOT NULL, filtro BLOB NOT NULL,"
+            " PRIMARY KEY (plataforma, recurso))")
+        self._filters = {}
+        self.metrics = {"entregues": 0, "duplicados": 0, "sincronizacoes": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("SOCIAL_SYNC_PATH", "social_sync.sqlite3"))
+
+    # --- Marcas d'água e filtros ---
+
+    def watermark(self, platform, resource):
+        with self._lock:
+            row = self._conn.execute("SELECT valor FROM marcas_dagua WHERE plataforma = ? AND recurso = ?",
+                                     (platform, resource)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, platform, resource, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO marcas_dagua (plataforma, recurso, valor, atualizado_em) VALUES (?, ?, ?, ?)",
+                (platform, resource, value, time.time()))
+
+    def bloom_filter(self, platform, resource):
+        key = (platform, resource)
+        if key not in self._filters:
+            with self._lock:
+                row = self._conn.execute("SELECT filtro FROM filtros_dedup WHERE plataforma = ? AND recurso = ?",
+                                         key).fetchone()
+            self._filters[key] = (BloomFilter.deserialize(row[0]) if row
+                                  else BloomFilter(self.filter_capacity, self.fp_rate))
+        return self._filters[key]
+
+    def save_filter(self, platform, resource):
+        data = self.bloom_filter(platform, resource).serialize()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO filtros_dedup (plataforma, recurso, filtro) VALUES (?, ?, ?)",
+                               (platform, resource, data))
+
+    # --- Sincronização genérica ---
+
+    async def sync(self, platform, resource, source, item_id_of, item_watermark, newest=max, complete=True):
+        """
+        Gerador assíncrono com os itens novos de `source(watermark)`.
+        item_watermark extrai a data/ID usada como marca d'água; newest escolhe
+        a maior entre duas marcas (max funciona para datas ISO em UTC e IDs de mesmo tamanho).
+        Com complete=False (a fonte foi limitada e pode não trazer tudo desde a marca)
+        a marca d'água não avança.
+        """
+        watermark = self.watermark(platform, resource)
+        bloom_filter = self.bloom_filter(platform, resource)
+        new_watermark = watermark
+        finished = False
+        self.metrics["sincronizacoes"] += 1
+        try:
+            async for item in source(watermark):
+                item_id = item_id_of(item)
+                if item_id in bloom_filter:
+                    self.metrics["duplicados"] += 1
+                else:
+                    yield item
+                    bloom_filter.add(item_id)
+                    self.metrics["entregues"] += 1
+                # Itens já vistos (entregues por uma sincronização interrompida) também contam para a marca.
+                value = item_watermark(item)
+                new_watermark = value if new_watermark is None else newest(new_watermark, value)
+            finished = complete
+        finally:
+            self.save_filter(platform, resource)
+            if finished and new_watermark != watermark:
+                self.set_watermark(platform, resource, new_watermark)
+
+    # --- Recursos suportados ---
+
+    def facebook_page_posts(self, access_token, page_id, client=None, **kwargs):
+        return self.sync(
+            "facebook", f"page:{page_id}:posts",
+            lambda watermark: social_media_apis.iter_facebook_page_posts(access_token, page_id, since=watermark,
+                                                                         client=client, **kwargs),
+            lambda item: item["id"], lambda item: _iso_utc(item["created_time"]), complete=_is_complete(kwargs))
+
+    def instagram_user_media(self, access_token, instagram_business_account_id, client=None, **kwargs):
+        return self.sync(
+            "instagram", f"user:{instagram_business_account_id}:media",
+            lambda watermark: social_media_apis.iter_instagram_user_media(access_token, instagram_business_account_id,
+                                                                          since=watermark, client=client, **kwargs),
+            lambda item: item["id"], lambda item: _iso_utc(item["timestamp"]), complete=_is_complete(kwargs))
+
+    def youtube_channel_videos(self, api_key, channel_id, client=None, **kwargs):
+        return self.sync(
+            "youtube", f"channel:{channel_id}:videos",
+            lambda watermark: social_media_apis.iter_youtube_channel_videos(api_key, channel_id, since=watermark,
+                                                                            client=client, **kwargs),
+            lambda item: item["id"]["videoId"], lambda item: _iso_utc(item["snippet"]["publishedAt"]),
+            complete=_is_complete(kwargs))
+
+    def twitter_user_tweets(self, bearer_token, user_id, client=None, **kwargs):
+        # IDs do Twitter/X são crescentes: a marca d'água é o maior ID, enviado como since_id.
+        return self.sync(
+            "twitter", f"user:{user_id}:tweets",
+            lambda watermark: iter_twitter_user_tweets(bearer_token, user_id, since_id=watermark, client=client,
+                                                       **kwargs),
+            lambda item: item["id"], lambda item: item["id"], newest=lambda a, b: max(a, b, key=int),
+            complete=_is_complete(kwargs))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _is_complete(kwargs):
+    # Com max_items/max_pages a leitura pode parar antes de alcançar a marca d'água.
+    return kwargs.get("max_items") is None and kwargs.get("max_pages") is None
+
+
+def _iso_utc(value):
+    # Normaliza para comparar marcas como strings: "2025-01-01T00:00:00+00:00".
+    return social_media_apis._parse_date(value).astimezone(timezone.utc).isoformat()
+
+
+def iter_twitter_user_tweets(bearer_token, user_id, since_id=None, max_items=None, max_pages=None,
+                             page_size=100, prefetch=1, client=None):
+    """
+    Tweets do usuário, do mais recente ao mais antigo, seguindo meta.next_token;
+    com since_id, só os posteriores a ele (filtrado pela API).
+    """
+    url = f"https://api.twitter.com/2/users/{user_id}/tweets"
+    headers = {"Authorization": f"Bearer {bearer_token}"}
+    params = {"tweet.fields": "created_at,public_metrics,lang", "max_results": page_size}
+    if since_id:
+        params["since_id"] = since_id
+
+    async def fetch(cursor):
+        page_params = {**params, "pagination_token": cursor} if cursor else params
+        return await social_media_apis._fetch_page("twitter", url, page_params, client, headers=headers)
+
+    return social_media_apis._paginate(
+        fetch, lambda page: page.get("data", []), lambda page: (page.get("meta") or {}).get("next_token"),
+        max_items=max_items, max_pages=max_pages, prefetch=prefetch,
+    )
@@ -0,0 +1,104 @@
+"""Shared fixtures: the local fake servers from ``benchmarks/`` on free ports."""
+import asyncio
+import copy
+import socket
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agent.llm_gateway import GeminiProvider, LLMGateway, OpenAIProvider  # noqa: E402
+from benchmarks import bench_llm_gateway, fake_llm_server, mock_social_server  # noqa: E402
+from benchmarks.bench_social_http import LocalTransport, start_server  # noqa: E402
+from social_http import SocialHTTPClient  # noqa: E402
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def llm_port():
+    port = _free_port()
+    server, thread = bench_llm_gateway.start_server(port)
+    yield port
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def fake_llm():
+    saved = copy.deepcopy(fake_llm_server.config)
+    yield fake_llm_server.config
+    fake_llm_server.config.clear()
+    fake_llm_server.config.update(saved)
+
+
+@pytest.fixture
+def run_gateway(llm_port, fake_llm):
+    """Runs ``scenario(gateway)`` against the fake server with an OpenAI -> Gemini gateway."""
+
+    def run(scenario, timeout=5.0, openai_tpm=None):
+        async def main():
+            client = LLMGateway.make_client()
+            openai = OpenAIProvider(client, "test", "gpt-fake", f"http://127.0.0.1:{llm_port}/v1",
+                                    tokens_per_minute=openai_tpm)
+            gemini = GeminiProvider(client, "test", "gemini-fake", f"http://127.0.0.1:{llm_port}/v1beta")
+            gateway = LLMGateway([openai, gemini], client=client, timeout=timeout)
+            try:
+                return await asyncio.wait_for(scenario(gateway), 20)
+            finally:
+                await gateway.aclose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+class FailingTransport(LocalTransport):
+    """Answers ``response`` (a 503 by default) to requests matching ``fails``; the rest reach the mock."""
+
+    def __init__(self, port, fails, response=None):
+        super().__init__(port)
+        self.fails = fails
+        self.response = response or (lambda request: httpx.Response(503, json={"error": "unavailable"}))
+
+    async def handle_async_request(self, request):
+        if self.fails(request):
+            return self.response(request)
+        return await super().handle_async_request(request)
+
+
+@pytest.fixture(scope="session")
+def mock_port():
+    port = _free_port()
+    server, thread = start_server(port)
+    yield port
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def mock_config():
+    saved = dict(mock_social_server.config)
+    mock_social_server.config["items"] = 120
+    yield mock_social_server.config
+    mock_social_server.config.clear()
+    mock_social_server.config.update(saved)
+
+
+@pytest.fixture
+def make_client(mock_port, mock_config):
+    """SocialHTTPClient against the mock social server; ``fails`` routes matching requests to FailingTransport."""
+
+    def make(fails=None, response=None, **options):
+        transport = FailingTransport(mock_port, fails, response) if fails else LocalTransport(mock_port)
+        options.setdefault("max_retries", 0)
+        return SocialHTTPClient(transport=transport, backoff_base=0.01, **options)
+
+    return make
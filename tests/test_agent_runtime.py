@@ -0,0 +1,69 @@
+"""``AgentRuntime``: a failing task must not take its worker down with it."""
+import asyncio
+
+import pytest
+
+from agent_runtime import AgentRuntime, TaskCancelled
+
+
+async def echo(value):
+    return value
+
+
+def raise_value_error():
+    raise ValueError("sync")
+
+
+def run_with_runtime(scenario):
+    async def run():
+        # One worker: if it died, the last task of each scenario would never run.
+        async with AgentRuntime(num_workers=1) as runtime:
+            return await asyncio.wait_for(scenario(runtime), 5), runtime.stats()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("submit, error", [
+    (lambda runtime: runtime.submit(echo), TypeError),
+    (lambda runtime: runtime.submit(echo, 1, unknown=2), TypeError),
+    (lambda runtime: runtime.submit(raise_value_error, executor="loop"), ValueError),
+    (lambda runtime: runtime.submit(len, [1], executor="loop"), TypeError),
+], ids=["missing-argument", "unknown-keyword", "sync-raises-on-loop", "sync-returns-on-loop"])
+def test_worker_survives_failed_task(submit, error):
+    async def scenario(runtime):
+        task = submit(runtime)
+        with pytest.raises(error):
+            await task
+        return task.state, await runtime.submit(echo, 3)
+
+    (state, result), stats = run_with_runtime(scenario)
+    assert state == "falhou"
+    assert result == 3
+    assert stats["falhas"] == 1 and stats["concluidas"] == 1
+
+
+def test_timeout_fails_task_and_worker_continues():
+    async def scenario(runtime):
+        task = runtime.submit(asyncio.sleep, 10, timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await task
+        return task.state, await runtime.submit(echo, "ok")
+
+    (state, result), _ = run_with_runtime(scenario)
+    assert state == "falhou"
+    assert result == "ok"
+
+
+def test_cancelled_task_frees_the_worker():
+    async def scenario(runtime):
+        task = runtime.submit(asyncio.sleep, 10)
+        await asyncio.sleep(0.05)
+        assert runtime.cancel(task.id)
+        with pytest.raises(TaskCancelled):
+            await task
+        return task.state, await runtime.submit(echo, 4)
+
+    (state, result), stats = run_with_runtime(scenario)
+    assert state == "cancelada"
+    assert result == 4
+    assert stats["canceladas"] == 1
@@ -0,0 +1,83 @@
+"""``GraphBatcher`` against the mock batch endpoint, including failures of the batch POST itself."""
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks import mock_social_server
+from graph_batch import GraphBatcher
+from social_http import SocialAPIError
+
+FIELDS = "id,message,like_count"
+
+
+def _is_batch(request):
+    return request.method == "POST"
+
+
+def _gather(batcher, count):
+    # wait_for: a future left unresolved would otherwise hang the test.
+    return asyncio.wait_for(
+        asyncio.gather(*(batcher.get(f"page_{i}", {"fields": FIELDS}) for i in range(count)), return_exceptions=True),
+        5)
+
+
+def test_batched_reads_match_objects(make_client):
+    async def run():
+        async with make_client() as client:
+            batcher = GraphBatcher("token", client=client)
+            return await _gather(batcher, 60), batcher.metrics
+
+    results, metrics = asyncio.run(run())
+    assert results == [mock_social_server._graph_object(f"page_{i}", FIELDS) for i in range(60)]
+    assert metrics["lotes"] == 2
+
+
+def test_transient_subrequest_failures_are_retried(make_client, mock_config):
+    mock_config["batch_fail_rate"] = 0.3
+
+    async def run():
+        async with make_client() as client:
+            batcher = GraphBatcher("token", client=client, max_attempts=20, backoff_base=0.01)
+            return await _gather(batcher, 50), batcher.metrics
+
+    results, metrics = asyncio.run(run())
+    assert not [r for r in results if isinstance(r, Exception)]
+    assert metrics["repetidas"] > 0 and metrics["falhas"] == 0
+
+
+def test_rejected_batch_fails_every_future(make_client):
+    # More than 50 sub-requests: the mock answers the POST with a 400.
+    async def run():
+        async with make_client() as client:
+            batcher = GraphBatcher("token", client=client, max_batch_size=60)
+            return await _gather(batcher, 60), batcher.metrics
+
+    results, metrics = asyncio.run(run())
+    assert all(isinstance(r, SocialAPIError) and r.status == 400 for r in results)
+    assert metrics["falhas"] == 60
+
+
+@pytest.mark.parametrize("response", [
+    lambda request: httpx.Response(200, json={"error": {"message": "not a list"}}),
+    lambda request: httpx.Response(200, content=b"<html>"),
+], ids=["not-a-list", "not-json"])
+def test_unexpected_batch_response_fails_every_future(make_client, response):
+    async def run():
+        async with make_client(fails=_is_batch, response=response) as client:
+            return await _gather(GraphBatcher("token", client=client), 10)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, SocialAPIError) for r in results)
+
+
+def test_unexpected_client_error_fails_every_future(make_client):
+    def explode(request):
+        raise RuntimeError("boom")
+
+    async def run():
+        async with make_client(fails=_is_batch, response=explode) as client:
+            return await _gather(GraphBatcher("token", client=client), 10)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, SocialAPIError) and "boom" in str(r) for r in results)
@@ -0,0 +1,204 @@
+"""``LLMGateway`` and the ``/llm/complete`` endpoint against ``benchmarks/fake_llm_server.py``."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from agent.llm_gateway import LLMError, LLMRequest
+from benchmarks import fake_llm_server
+
+
+def _upstream_calls(before):
+    return {name: count - before[name] for name, count in fake_llm_server.calls.items()}
+
+
+# --- Coalescing ---
+
+def test_identical_requests_are_coalesced(run_gateway):
+    async def scenario(gateway):
+        before = dict(fake_llm_server.calls)
+        responses = await asyncio.gather(*(gateway.complete(LLMRequest(prompt="same")) for _ in range(20)))
+        return responses, _upstream_calls(before), gateway.stats()
+
+    responses, calls, stats = run_gateway(scenario)
+    assert {response.text for response in responses} == {"echo: same"}
+    assert calls["openai"] == 1
+    assert stats["coalesced"] == 19 and stats["in_flight"] == 0
+
+
+def test_cancelled_first_caller_does_not_cancel_followers(run_gateway, fake_llm):
+    fake_llm["latency"] = 0.3
+
+    async def scenario(gateway):
+        before = dict(fake_llm_server.calls)
+        first = asyncio.create_task(gateway.complete(LLMRequest(prompt="shared")))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.create_task(gateway.complete(LLMRequest(prompt="shared"))) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        first.cancel()
+        responses = await asyncio.gather(*followers)
+        return first.cancelled(), responses, _upstream_calls(before)
+
+    cancelled, responses, calls = run_gateway(scenario)
+    assert cancelled
+    assert [response.text for response in responses] == ["echo: shared"] * 3
+    # One follower reran the request; the other two waited for it.
+    assert calls["openai"] == 2
+
+
+def test_errors_reach_coalesced_followers(run_gateway, fake_llm):
+    fake_llm["fail"].update(openai=1.0, gemini=1.0)
+
+    async def scenario(gateway):
+        return await asyncio.gather(*(gateway.complete(LLMRequest(prompt="bad")) for _ in range(5)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(result, LLMError) for result in run_gateway(scenario))
+
+
+# --- Fallback ---
+
+def test_falls_back_on_http_error(run_gateway, fake_llm):
+    fake_llm["fail"]["openai"] = 1.0
+
+    async def scenario(gateway):
+        return await gateway.complete(LLMRequest(prompt="hello")), gateway.fallbacks
+
+    response, fallbacks = run_gateway(scenario)
+    assert response.provider == "gemini" and response.text == "echo: hello"
+    assert fallbacks == 1
+
+
+def test_falls_back_on_timeout(run_gateway, fake_llm):
+    fake_llm["stall"]["openai"] = 1
+
+    async def scenario(gateway):
+        start = time.perf_counter()
+        response = await gateway.complete(LLMRequest(prompt="hello"))
+        return response, time.perf_counter() - start
+
+    response, elapsed = run_gateway(scenario, timeout=0.3)
+    assert response.provider == "gemini"
+    assert elapsed < 2
+
+
+def test_all_providers_failing_raises(run_gateway, fake_llm):
+    fake_llm["fail"].update(openai=1.0, gemini=1.0)
+
+    async def scenario(gateway):
+        with pytest.raises(LLMError, match="all LLM providers failed"):
+            await gateway.complete(LLMRequest(prompt="hello"))
+
+    run_gateway(scenario)
+
+
+def test_unknown_provider_raises(run_gateway):
+    async def scenario(gateway):
+        with pytest.raises(LLMError, match="unknown LLM provider"):
+            await gateway.complete(LLMRequest(prompt="hello"), provider="nope")
+
+    run_gateway(scenario)
+
+
+# --- Token budget ---
+
+def test_token_budget_is_per_provider(run_gateway, fake_llm):
+    # The first request leaves 300 of OpenAI's 60,000 tokens per minute; the second
+    # needs 600, so it waits ~0.3 s for the refill. Gemini has no budget.
+    fake_llm["latency"] = 0.05
+
+    async def timed(gateway, provider):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(gateway.complete(LLMRequest(prompt=provider, max_tokens=tokens),
+                                                            provider=provider)
+                                           for tokens in (59_700 - len(provider) // 4, 600)))
+        return {response.provider for response in responses}, time.perf_counter() - start
+
+    async def scenario(gateway):
+        return await timed(gateway, "openai"), await timed(gateway, "gemini")
+
+    (openai_served, openai_elapsed), (gemini_served, gemini_elapsed) = run_gateway(scenario, openai_tpm=60_000)
+    assert openai_served == {"openai"} and gemini_served == {"gemini"}
+    assert openai_elapsed >= 0.25
+    assert gemini_elapsed < 0.25
+
+
+def test_token_budget_settles_to_actual_usage(run_gateway):
+    async def scenario(gateway):
+        response = await gateway.complete(LLMRequest(prompt="count my tokens", max_tokens=500))
+        return response, gateway.providers["openai"].stats()
+
+    response, stats = run_gateway(scenario, openai_tpm=6000)
+    used = response.prompt_tokens + response.completion_tokens
+    assert stats["tokens"] == used
+    # The 500-token estimate was returned to the bucket, less what was actually used.
+    assert 6000 - used - 5 <= stats["tokens_available"] <= 6000
+
+
+# --- Streaming ---
+
+async def _stream(gateway, prompt, provider=None):
+    return [chunk async for chunk in gateway.stream(LLMRequest(prompt=prompt), provider=provider)]
+
+
+@pytest.mark.parametrize("provider", ["openai", "gemini"])
+def test_stream_yields_chunks(run_gateway, provider):
+    async def scenario(gateway):
+        return await _stream(gateway, "one two three", provider)
+
+    chunks = run_gateway(scenario)
+    assert len(chunks) == 4
+    assert "".join(chunks) == "echo: one two three "
+
+
+@pytest.mark.parametrize("failure", ["fail", "stall"])
+def test_stream_falls_back_before_first_chunk(run_gateway, fake_llm, failure):
+    # Every request fails, or waits 1 s before answering (longer than the 0.3 s timeout).
+    fake_llm[failure]["openai"] = 1
+
+    async def scenario(gateway):
+        return await _stream(gateway, "fallback"), gateway.fallbacks
+
+    chunks, fallbacks = run_gateway(scenario, timeout=0.3)
+    assert "".join(chunks) == "echo: fallback "
+    assert fallbacks == 1
+
+
+def test_stream_with_every_provider_failing_raises(run_gateway, fake_llm):
+    fake_llm["fail"].update(openai=1.0, gemini=1.0)
+
+    async def scenario(gateway):
+        with pytest.raises(LLMError):
+            await _stream(gateway, "hello")
+
+    run_gateway(scenario)
+
+
+# --- Endpoint ---
+
+@pytest.fixture
+def agent_app():
+    from agent.agent_core import app, registry
+
+    yield app, registry["llm"]
+    registry["llm"].reset()
+
+
+@pytest.mark.parametrize("body, fail, status, text", [
+    ({"prompt": "streamed"}, 0.0, 200, "echo: streamed "),
+    ({"prompt": "streamed", "provider": "nope"}, 0.0, 502, "unknown LLM provider"),
+    ({"prompt": "streamed"}, 1.0, 502, "all LLM providers failed"),
+], ids=["ok", "unknown-provider", "all-failing"])
+def test_streamed_endpoint_status(run_gateway, fake_llm, agent_app, body, fail, status, text):
+    app, llm = agent_app
+    fake_llm["fail"].update(openai=fail, gemini=fail)
+
+    async def scenario(gateway):
+        llm.state, llm.value = "ready", gateway
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://agent") as client:
+            return await client.post("/llm/complete", json={**body, "stream": True})
+
+    response = run_gateway(scenario)
+    assert response.status_code == status
+    assert text in response.text
@@ -0,0 +1,64 @@
+"""Streaming pagination (``social_media_apis._paginate``) against the mock Graph API."""
+import asyncio
+
+import pytest
+
+from social_http import SocialAPIError
+from social_media_apis import iter_facebook_page_posts
+
+
+def _other_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+def test_reads_every_page(make_client):
+    async def run():
+        async with make_client() as client:
+            return [post["id"] async for post in iter_facebook_page_posts("token", "page", client=client)]
+
+    ids = asyncio.run(run())
+    assert len(ids) == 120
+    assert ids[0] == "page_119" and ids[-1] == "page_0"
+
+
+def test_max_items_stops_without_pending_tasks(make_client):
+    async def run():
+        async with make_client() as client:
+            posts = [post async for post in iter_facebook_page_posts("token", "page", max_items=30, client=client)]
+            await asyncio.sleep(0)
+            return posts, _other_tasks()
+
+    posts, pending = asyncio.run(run())
+    assert len(posts) == 30
+    assert pending == []
+
+
+def test_producer_error_reaches_consumer(make_client):
+    # The third page fails: the 50 items already fetched are delivered, then the error
+    # is raised instead of ending the iteration as if there were no more pages.
+    async def run():
+        delivered = []
+        async with make_client(fails=lambda request: request.url.params.get("after") == "50") as client:
+            with pytest.raises(SocialAPIError) as error:
+                async for post in iter_facebook_page_posts("token", "page", client=client):
+                    delivered.append(post)
+            await asyncio.sleep(0)
+            return delivered, error.value, _other_tasks()
+
+    delivered, error, pending = asyncio.run(run())
+    assert len(delivered) == 50
+    assert error.status == 503
+    assert pending == []
+
+
+def test_closing_early_cancels_the_producer(make_client):
+    async def run():
+        async with make_client() as client:
+            posts = iter_facebook_page_posts("token", "page", prefetch=3, client=client)
+            async for _ in posts:
+                break
+            await posts.aclose()
+            await asyncio.sleep(0)
+            return _other_tasks()
+
+    assert asyncio.run(run()) == []
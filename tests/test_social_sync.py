@@ -0,0 +1,61 @@
+"""Watermarks and the dedup filter of ``SocialSync`` when a sync fails half way."""
+import asyncio
+
+import pytest
+
+from social_http import SocialAPIError
+from social_sync import SocialSync, _iso_utc
+
+
+@pytest.fixture
+def sync(tmp_path):
+    sync = SocialSync(str(tmp_path / "sync.sqlite3"))
+    yield sync
+    sync.close()
+
+
+async def _collect(posts, delivered):
+    async for post in posts:
+        delivered.append(post["id"])
+
+
+def test_watermark_unchanged_after_failed_sync(sync, make_client):
+    async def run():
+        delivered = []
+        async with make_client(fails=lambda request: request.url.params.get("after") == "50") as client:
+            with pytest.raises(SocialAPIError):
+                await _collect(sync.facebook_page_posts("token", "page", client=client), delivered)
+        return delivered
+
+    delivered = asyncio.run(run())
+    assert len(delivered) == 50
+    assert sync.watermark("facebook", "page:page:posts") is None
+
+
+def test_resumed_sync_skips_delivered_items_and_advances(sync, make_client):
+    async def run():
+        first, second = [], []
+        async with make_client(fails=lambda request: request.url.params.get("after") == "50") as client:
+            with pytest.raises(SocialAPIError):
+                await _collect(sync.facebook_page_posts("token", "page", client=client), first)
+        async with make_client() as client:
+            await _collect(sync.facebook_page_posts("token", "page", client=client), second)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert not set(first) & set(second)
+    assert len(first) + len(second) == 120
+    assert sync.metrics["duplicados"] == 50
+    newest = "2025-01-05T23:00:00+0000"  # item 119 of the mock, one hour per item
+    assert sync.watermark("facebook", "page:page:posts") == _iso_utc(newest)
+
+
+def test_limited_sync_does_not_advance_watermark(sync, make_client):
+    async def run():
+        delivered = []
+        async with make_client() as client:
+            await _collect(sync.facebook_page_posts("token", "page", max_items=10, client=client), delivered)
+        return delivered
+
+    assert len(asyncio.run(run())) == 10
+    assert sync.watermark("facebook", "page:page:posts") is None
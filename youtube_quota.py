@@ -0,0 +1,238 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import social_media_apis
+from social_http import SocialAPIError, get_social_client
+
+try:
+    _PACIFIC = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:  # sem base de fusos (tzdata) no sistema
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+# Custo em unidades de cota de cada método da YouTube Data API v3.
+COSTS = {
+    "search.list": 100,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+}
+
+DEFAULT_DAILY_QUOTA = 10_000
+
+API_URL = "https://www.googleapis.com/youtube/v3"
+
+
+class QuotaExhausted(Exception):
+    """
+    A chamada não cabe no que resta da cota do dia (e o chamador não quis esperar o reset).
+    """
+
+
+def _quota_day(now=None):
+    # A cota do YouTube é renovada à meia-noite no horário do Pacífico.
+    return datetime.fromtimestamp(now or time.time(), _PACIFIC).date().isoformat()
+
+
+def _seconds_until_reset(now=None):
+    current = datetime.fromtimestamp(now or time.time(), _PACIFIC)
+    tomorrow = (current + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - current).total_seconds()
+
+
+class QuotaLedger:
+    """
+    Livro-razão local da cota da YouTube Data API.
+
+    Cada chamada reserva suas unidades antes de sair; o uso por dia (no fuso do Pacífico)
+    e por método fica em SQLite, então processos e reinícios compartilham o mesmo saldo.
+    `reserve` deixa unidades de fora para chamadas prioritárias. Quando não há saldo,
+    a chamada é recusada (QuotaExhausted) ou agendada para depois do reset.
+    """
+
+    def __init__(self, path="youtube_quota.sqlite3", daily_quota=DEFAULT_DAILY_QUOTA, reserve=0):
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uso_cota ("
+            " dia TEXT NOT NULL, metodo TEXT NOT NULL, chamadas INTEGER NOT NULL, unidades INTEGER NOT NULL,"
+            " PRIMARY KEY (dia, metodo))")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS playlists_uploads (channel_id TEXT PRIMARY KEY, playlist_id TEXT NOT NULL)")
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("YOUTUBE_QUOTA_PATH", "youtube_quota.sqlite3"),
+                   daily_quota=int(os.getenv("YOUTUBE_DAILY_QUOTA", str(DEFAULT_DAILY_QUOTA))),
+                   reserve=int(os.getenv("YOUTUBE_QUOTA_RESERVE", "0")))
+
+    def used(self, day=None):
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(unidades), 0) FROM uso_cota WHERE dia = ?",
+                                     (day or _quota_day(),)).fetchone()
+        return row[0]
+
+    def remaining(self):
+        return max(0, self.daily_quota - self.used())
+
+    def try_acquire(self, method, priority=False):
+        """
+        Debita o custo do método se couber no saldo (fora da reserva, salvo se prioritária).
+        """
+        cost = COSTS[method]
+        limit = self.daily_quota - (0 if priority else self.reserve)
+        day = _quota_day()
+        with self._lock:
+            used = self._conn.execute("SELECT COALESCE(SUM(unidades), 0) FROM uso_cota WHERE dia = ?",
+                                      (day,)).fetchone()[0]
+            if used + cost > limit:
+                return False
+            self._conn.execute(
+                "INSERT INTO uso_cota (dia, metodo, chamadas, unidades) VALUES (?, ?, 1, ?)"
+                " ON CONFLICT (dia, metodo) DO UPDATE SET chamadas = chamadas + 1, unidades = unidades + excluded.unidades",
+                (day, method, cost))
+        return True
+
+    async def acquire(self, method, wait=False, priority=False):
+        """
+        Reserva a cota da chamada; sem saldo, levanta QuotaExhausted ou, com wait, dorme até o reset.
+        """
+        while not self.try_acquire(method, priority):
+            if not wait:
+                raise QuotaExhausted(f"{method} custa {COSTS[method]} unidades; restam {self.remaining()} "
+                                     f"de {self.daily_quota} (reserva {self.reserve})")
+            await asyncio.sleep(_seconds_until_reset() + 1)
+
+    def refund(self, method):
+        """
+        Devolve o custo de uma chamada reservada que não foi cobrada (respondida com 304).
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE uso_cota SET chamadas = MAX(chamadas - 1, 0), unidades = MAX(unidades - ?, 0)"
+                " WHERE dia = ? AND metodo = ?", (COSTS[method], _quota_day(), method))
+
+    def exhaust(self):
+        """
+        A API respondeu quotaExceeded: o saldo local é zerado até o próximo reset.
+        """
+        day = _quota_day()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO uso_cota (dia, metodo, chamadas, unidades) VALUES (?, 'quotaExceeded', 0, ?)"
+                " ON CONFLICT (dia, metodo) DO UPDATE SET unidades = excluded.unidades",
+                (day, self.daily_quota))
+
+    def report(self, day=None):
+        with self._lock:
+            rows = self._conn.execute("SELECT metodo, chamadas, unidades FROM uso_cota WHERE dia = ?",
+                                      (day or _quota_day(),)).fetchall()
+        return {"dia": day or _quota_day(), "cota_diaria": self.daily_quota, "restante": self.remaining(),
+                "metodos": {m: {"chamadas": c, "unidades": u} for m, c, u in rows}}
+
+    # --- Cache da playlist de uploads ---
+
+    def playlist_uploads(self, channel_id):
+        with self._lock:
+            row = self._conn.execute("SELECT playlist_id FROM playlists_uploads WHERE channel_id = ?",
+                                     (channel_id,)).fetchone()
+        return row[0] if row else None
+
+    def store_playlist_uploads(self, channel_id, playlist_id):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO playlists_uploads (channel_id, playlist_id) VALUES (?, ?)",
+                               (channel_id, playlist_id))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class YouTubeReader:
+    """
+    Leitura de vídeos de canais pelo caminho barato da API: a playlist de uploads do canal
+    (channels.list, 1 unidade, resolvida uma vez e guardada) é paginada com
+    playlistItems.list (1 unidade por página de 50) e os detalhes vêm de videos.list com
+    50 IDs por chamada (1 unidade). Listar os últimos 50 vídeos com detalhes custa 2
+    unidades, contra 100 por página de search.list.
+    """
+
+    def __init__(self, api_key, ledger=None, client=None, wait_for_reset=False):
+        self.api_key = api_key
+        self.ledger = ledger or QuotaLedger.from_env()
+        self.client = client
+        self.wait_for_reset = wait_for_reset
+
+    async def _call(self, method, resource, params, priority=False):
+        # A cota só é reservada se a requisição for mesmo sair (não para respostas do
+        # cache dentro do TTL) e é estornada quando a revalidação volta 304.
+        client = self.client or get_social_client()
+        try:
+            data, source = await client.get_json_with_source(
+                "youtube", f"{API_URL}/{resource}", params={"key": self.api_key, **params},
+                before_request=lambda: self.ledger.acquire(method, wait=self.wait_for_reset,
+                                                           priority=priority))
+        except SocialAPIError as e:
+            if e.status == 403 and "quotaExceeded" in str(e):
+                self.ledger.exhaust()
+                raise QuotaExhausted(f"YouTube respondeu quotaExceeded: {e}") from e
+            raise
+        if source == "revalidado":
+            self.ledger.refund(method)
+        return data
+
+    async def playlist_uploads(self, channel_id):
+        playlist_id = self.ledger.playlist_uploads(channel_id)
+        if playlist_id:
+            return playlist_id
+        data = await self._call("channels.list", "channels", {"part": "contentDetails", "id": channel_id},
+                                priority=True)
+        items = data.get("items") or []
+        if not items:
+            raise SocialAPIError("youtube", f"canal {channel_id} não encontrado")
+        playlist_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        self.ledger.store_playlist_uploads(channel_id, playlist_id)
+        return playlist_id
+
+    async def iter_videos(self, channel_id, max_items=None, since=None, max_pages=None, prefetch=1):
+        """
+        Itens da playlist de uploads, do mais recente ao mais antigo (gerador assíncrono).
+        Levanta QuotaExhausted se a cota acabar no meio da leitura.
+        """
+        playlist_id = await self.playlist_uploads(channel_id)
+        params = {"part": "snippet,contentDetails", "playlistId": playlist_id, "maxResults": 50}
+
+        async def fetch(cursor):
+            return await self._call("playlistItems.list", "playlistItems",
+                                    {**params, "pageToken": cursor} if cursor else params)
+
+        async for item in social_media_apis._paginate(
+                fetch, lambda page: page.get("items", []), lambda page: page.get("nextPageToken"),
+                lambda item: item["contentDetails"].get("videoPublishedAt") or item["snippet"]["publishedAt"],
+                max_items=max_items, max_pages=max_pages, since=since, prefetch=prefetch):
+            yield item
+
+    async def video_details(self, video_ids, part="snippet,statistics,contentDetails"):
+        """
+        Detalhes dos vídeos, 50 IDs por chamada de videos.list, na ordem pedida (None se não existir).
+        """
+        video_ids = list(video_ids)
+        chunks = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*(self._call("videos.list", "videos", {"part": part, "id": ",".join(b)})
+                                           for b in chunks))
+        by_id = {item["id"]: item for response in responses for item in response.get("items", [])}
+        return [by_id.get(video_id) for video_id in video_ids]
+
+    async def recent_videos(self, channel_id, max_items=50, since=None):
+        """
+        Os vídeos mais recentes do canal com estatísticas e duração.
+        """
+        ids = [item["contentDetails"]["videoId"]
+               async for item in self.iter_videos(channel_id, max_items=max_items, since=since)]
+        return [video for video in await self.video_details(ids) if video is not None]